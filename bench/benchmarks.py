@@ -0,0 +1,226 @@
+"""
+Benchmarks of the quaternion, projection and render hot paths, swept over vertex counts.
+
+Run from the repository root:
+    python -m bench.benchmarks --output results.json
+    python -m bench.benchmarks --compare baseline.json
+
+Argument checks are off unless QUATERNION_VALIDATE=1, so the release path is what gets measured.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from typing import Callable, Dict, List
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+import pygame
+
+import src.config as config
+import src.interpolation as i
+import src.kernels as k
+import src.mesh as m
+import src.quaternion as q
+import src.simulation as sim
+import src.transformations as t
+from src.camera import Camera
+
+# Vertex counts the benchmarks are swept over.
+SIZES = (8, 100, 1000, 10000, 100000, 1000000, 10000000)
+
+# Size of the surface draw_wireframe draws on.
+SCREEN_SIZE = 800
+
+
+def _vertices(n: int, dtype) -> np.ndarray:
+    return np.random.default_rng(0).uniform(-100., 100., (n, 3)).astype(dtype)
+
+
+def _quaternion(dtype) -> np.ndarray:
+    return q.rotation_quaternion(0.7, np.array([1., 2., 3.], dtype=dtype))
+
+
+def bench_quaternion_multiplication(n: int, dtype) -> Callable[[], None]:
+    rng = np.random.default_rng(0)
+    quaternions, others = rng.normal(size=(2, n, 4)).astype(dtype)
+    out = np.empty_like(quaternions)
+    return lambda: q.quaternion_multiplication(quaternions, others, out)
+
+
+def bench_qvq_inverse(n: int, dtype) -> Callable[[], None]:
+    quaternion = _quaternion(dtype)
+    vertices = q.vector_to_quaternion(_vertices(n, dtype))
+    return lambda: q.qvq_inverse(quaternion, vertices)
+
+
+def bench_quaternion_rotation(n: int, dtype) -> Callable[[], None]:
+    quaternion = _quaternion(dtype)
+    vertices = _vertices(n, dtype)
+    out = np.empty_like(vertices)
+    return lambda: t.quaternion_rotation(quaternion, vertices, out=out)
+
+
+def bench_perspective_projection(n: int, dtype) -> Callable[[], None]:
+    camera_location = np.array([400., 400., -100.], dtype=dtype)
+    vertices = _vertices(n, dtype) + np.array([0., 0., 300.], dtype=dtype)
+    return lambda: sim.perspective_projection(camera_location, vertices)
+
+
+def bench_transform_project(n: int, dtype) -> Callable[[], None]:
+    matrix = q.rotation_matrix(_quaternion(dtype))
+    center = np.array([0., 0., 300.], dtype=dtype)
+    camera = Camera(np.array([400., 400., -100.], dtype=dtype), 0, SCREEN_SIZE, dtype)
+    vertices = _vertices(n, dtype)
+    out = np.empty((n, 2), dtype=dtype)
+    return lambda: k.transform_project(vertices, matrix, center, camera.matrix, out)
+
+
+def bench_linear_interpolation(n: int, dtype) -> Callable[[], None]:
+    keyframes = np.array([[0., 0., 0.], [100., 200., 300.]], dtype=dtype)
+    return lambda: i.linear_interpolation(keyframes, n)
+
+
+def bench_draw_wireframe(n: int, dtype) -> Callable[[], None]:
+    # A grid of quads of about n vertices spread over the surface, drawn with precomputed strips.
+    side = max(2, int(round(np.sqrt(n))))
+    x, y = np.meshgrid(np.linspace(0., SCREEN_SIZE - 1, side), np.linspace(0., SCREEN_SIZE - 1, side))
+    points = np.column_stack((x.ravel(), y.ravel())).astype(dtype)
+    corners = (np.arange(side - 1)[:, None] * side + np.arange(side - 1)).ravel()
+    faces = np.column_stack((corners, corners + 1, corners + side + 1, corners + side))
+    strips = m.edge_strips(m.unique_edges(faces)[0])
+    surface = pygame.Surface((SCREEN_SIZE, SCREEN_SIZE))
+    return lambda: sim.draw_wireframe(surface, points, faces, strips)
+
+
+# Benchmarks by name, with the largest vertex count each is run at.
+BENCHMARKS = {"quaternion_multiplication": (bench_quaternion_multiplication, 10000000),
+              "qvq_inverse": (bench_qvq_inverse, 10000000),
+              "quaternion_rotation": (bench_quaternion_rotation, 10000000),
+              "perspective_projection": (bench_perspective_projection, 10000000),
+              "transform_project": (bench_transform_project, 10000000),
+              "linear_interpolation": (bench_linear_interpolation, 10000000),
+              "draw_wireframe": (bench_draw_wireframe, 1000000)}
+
+
+def measure(function: Callable[[], None], min_time: float, repeats: int) -> Dict:
+    """
+    Time a function like timeit: calls are looped until a loop takes at least 'min_time', and loops are repeated.
+    :param function: function to time.
+    :param min_time: minimum duration of a loop in seconds.
+    :param repeats: number of loops timed.
+    :return: dictionary of the best and median seconds per call, and the number of calls per loop.
+    """
+    function()
+
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops *= max(2, min(10, int(min_time / max(elapsed, 1e-9)) + 1))
+
+    timings = [elapsed / loops]
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            function()
+        timings.append((time.perf_counter() - start) / loops)
+
+    return {"best": min(timings), "median": float(np.median(timings)), "loops": loops}
+
+
+def run(names: List[str], max_vertices: int, dtype, min_time: float, repeats: int) -> Dict:
+    """
+    Run benchmarks over the vertex counts up to 'max_vertices'.
+    :return: dictionary of the environment the benchmarks ran in and of their results.
+    """
+    results = []
+    for name in names:
+        setup, largest = BENCHMARKS[name]
+        for n in SIZES:
+            if n > min(max_vertices, largest):
+                break
+            result = {"name": name, "vertices": n}
+            result.update(measure(setup(n, dtype), min_time, repeats))
+            result["vertices_per_second"] = n / result["median"]
+            results.append(result)
+            print("{:<28}{:>10}{:>14.3e} s".format(name, n, result["median"]), file=sys.stderr)
+
+    return {"environment": {"python": platform.python_version(),
+                            "numpy": np.__version__,
+                            "pygame": pygame.version.ver,
+                            "machine": platform.machine(),
+                            "processor": platform.processor(),
+                            "backend": k.BACKEND,
+                            "validation": config.validation_enabled(),
+                            "dtype": np.dtype(dtype).name,
+                            "time": time.strftime("%Y-%m-%dT%H:%M:%S")},
+            "results": results}
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[Dict]:
+    """
+    Compare results with a baseline.
+    :param results: results of run.
+    :param baseline: results of an earlier run.
+    :param threshold: relative slowdown of the median time beyond which a benchmark counts as a regression.
+    :return: list of the benchmarks run in both, each with the ratio of its median time to the baseline's and
+    whether it regressed.
+    """
+    previous = {(r["name"], r["vertices"]): r for r in baseline["results"]}
+    comparisons = []
+    for result in results["results"]:
+        key = (result["name"], result["vertices"])
+        if key in previous:
+            ratio = result["median"] / previous[key]["median"]
+            comparisons.append({"name": key[0], "vertices": key[1], "ratio": ratio, "regression": ratio > 1 + threshold})
+
+    return comparisons
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the quaternion, projection and render hot paths.")
+    parser.add_argument("--benchmarks", nargs="+", choices=sorted(BENCHMARKS), default=list(BENCHMARKS),
+                        help="benchmarks to run, all by default")
+    parser.add_argument("--max-vertices", type=int, default=SIZES[-1], help="largest vertex count to run")
+    parser.add_argument("--dtype", choices=("float32", "float64"), default=config.get_dtype().name)
+    parser.add_argument("--min-time", type=float, default=0.1, help="minimum duration of a timed loop in seconds")
+    parser.add_argument("--repeats", type=int, default=5, help="number of timed loops per benchmark")
+    parser.add_argument("--output", help="file to write the JSON results to, standard output by default")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON results to flag regressions against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="relative slowdown beyond which a benchmark counts as a regression")
+    arguments = parser.parse_args()
+
+    results = run(arguments.benchmarks, arguments.max_vertices, np.dtype(arguments.dtype), arguments.min_time,
+                  arguments.repeats)
+
+    if arguments.output is None:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    else:
+        with open(arguments.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if arguments.compare is None:
+        return 0
+
+    with open(arguments.compare) as file:
+        comparisons = compare(results, json.load(file), arguments.threshold)
+
+    for comparison in comparisons:
+        print("{:<28}{:>10}{:>9.2f}x{}".format(comparison["name"], comparison["vertices"], comparison["ratio"],
+                                               "  REGRESSION" if comparison["regression"] else ""), file=sys.stderr)
+
+    return 1 if any(comparison["regression"] for comparison in comparisons) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+from typing import Callable, Iterator, Tuple
+
+import numpy as np
+
+import src.interpolation as i
+import src.quaternion as q
+from src.config import FLOAT_DTYPES
+
+
+def transform_frames(reference_vertices: np.ndarray,
+                     poses: Callable[[np.ndarray], Tuple[np.ndarray, np.ndarray]],
+                     times: np.ndarray,
+                     chunk_size: int = 64,
+                     assume_unit: bool = False) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Lazily generate the vertices of an object posed at a sequence of times. Poses are evaluated and applied a chunk of
+    frames at a time, into one preallocated buffer, so memory stays proportional to chunk_size x v rather than to the
+    number of frames x v.
+    :param reference_vertices: v x 3 object vertices with (0, 0, 0) as center. All orientations are relative to them.
+    :param poses: function that takes a c-numpy-array of times and returns the object's c x 4 numpy array of
+    orientations in quaternions and c x 3 numpy array of centers at those times, e.g. AnimationTrack.evaluate.
+    :param times: f-numpy-array of the times of the frames.
+    :param chunk_size: number of frames transformed at once.
+    :param assume_unit: if True, the orientations 'poses' returns must be unit quaternions, see
+    quaternion.rotation_matrix.
+    :return: iterator of (frame index, v x 3 numpy array of the object's vertices at that frame). The vertices are a
+    **VIEW** into the buffer, which is overwritten once the next chunk is generated.
+    """
+    assert reference_vertices.dtype in FLOAT_DTYPES
+    assert len(reference_vertices.shape) == 2 and reference_vertices.shape[1] == 3
+    assert len(times.shape) == 1
+    assert 0 < chunk_size
+
+    buffer = np.empty((min(chunk_size, times.shape[0]), reference_vertices.shape[0], 3), dtype=reference_vertices.dtype)
+
+    for start in range(0, times.shape[0], chunk_size):
+        chunk_times = times[start:start + chunk_size]
+        frames = buffer[:chunk_times.shape[0]]
+
+        orientations, centers = poses(chunk_times)
+        np.matmul(reference_vertices, q.rotation_matrix(orientations, assume_unit), out=frames)
+        frames += centers[:, None]
+
+        for j in range(frames.shape[0]):
+            yield start + j, frames[j]
+
+
+def keyframe_poses(orientation_keyframes: np.ndarray,
+                   center_keyframes: np.ndarray) -> Callable[[np.ndarray], Tuple[np.ndarray, np.ndarray]]:
+    """
+    Return a function that interpolates two keyframes, orientations with slerp and centers linearly.
+    :param orientation_keyframes: 2 x 4 numpy array of object orientations of two keyframes in quaternions.
+    :param center_keyframes: 2 x 3 numpy array of object centers of two keyframes.
+    :return: function that takes a c-numpy-array of interpolation parameters in [0, 1] and returns c x 4 numpy array
+    of orientations and c x 3 numpy array of centers.
+    """
+    assert orientation_keyframes.dtype in FLOAT_DTYPES and center_keyframes.dtype == orientation_keyframes.dtype
+    assert orientation_keyframes.shape == (2, 4) and center_keyframes.shape == (2, 3)
+
+    def interpolated_poses(t: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        t = t.astype(center_keyframes.dtype, copy=False)
+        return (i.slerp(orientation_keyframes[0], orientation_keyframes[1], t),
+                center_keyframes[0] + np.outer(t, center_keyframes[1] - center_keyframes[0]))
+
+    return interpolated_poses
+
+
+def keyframe_frames(orientation_keyframes: np.ndarray,
+                    center_keyframes: np.ndarray,
+                    reference_vertices: np.ndarray,
+                    number_of_frames: int,
+                    chunk_size: int = 64) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Lazily generate the vertices of the frames interpolated between two keyframes.
+    :param orientation_keyframes: 2 x 4 numpy array of object orientations of two keyframes in quaternions.
+    :param center_keyframes: 2 x 3 numpy array of object centers of two keyframes.
+    :param reference_vertices: v x 3 object vertices with (0, 0, 0) as center. All orientations are relative to them.
+    :param number_of_frames: number of frames of the animation, both keyframes included.
+    :param chunk_size: number of frames transformed at once.
+    :return: iterator of (frame index, v x 3 numpy array of vertices), see transform_frames.
+    """
+    return transform_frames(reference_vertices,
+                            keyframe_poses(orientation_keyframes, center_keyframes),
+                            np.linspace(0., 1., number_of_frames),
+                            chunk_size,
+                            assume_unit=True)
@@ -0,0 +1,79 @@
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+import src.quaternion as q
+from src.config import FLOAT_DTYPES
+from src.validation import validated
+
+
+def _check_get(cache: "RotationMatrixCache", quaternion: np.ndarray, matrix: Optional[np.ndarray] = None) -> None:
+    assert quaternion.dtype in FLOAT_DTYPES
+    assert quaternion.shape == (4,)
+    assert matrix is None or (matrix.dtype == quaternion.dtype and matrix.shape == (3, 3))
+
+
+class RotationMatrixCache:
+    """
+    Bounded least-recently-used cache from orientation quaternions to their 3 x 3 rotation matrices (see
+    quaternion.rotation_matrix). Quaternions are matched by their exact bytes.
+    """
+
+    def __init__(self, max_size: int = 128, assume_unit: bool = False) -> None:
+        """
+        :param max_size: maximum number of matrices kept. The least recently used one is evicted beyond it.
+        :param assume_unit: if True, only unit quaternions are looked up, see quaternion.rotation_matrix.
+        """
+        assert 0 < max_size
+
+        self.max_size = max_size
+        self.assume_unit = assume_unit
+        self.hits = 0
+        self.misses = 0
+        self._matrices = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._matrices)
+
+    @validated(_check_get)
+    def get(self, quaternion: np.ndarray, matrix: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Return the rotation matrix of a quaternion, building and storing it if it is not cached.
+        :param quaternion: 4-numpy-array of an orientation.
+        :param matrix: 3 x 3 numpy array of the quaternion's rotation matrix, stored instead of building it if it is
+        not cached, e.g. one of many built in a single vectorized call. A copy of it is stored.
+        :return: read-only 3 x 3 numpy array of the rotation matrix.
+        """
+        key = quaternion.tobytes()
+        cached = self._matrices.get(key)
+
+        if cached is not None:
+            self.hits += 1
+            self._matrices.move_to_end(key)
+            return cached
+
+        self.misses += 1
+        matrix = q.rotation_matrix(quaternion, self.assume_unit) if matrix is None else matrix.copy()
+        matrix.flags.writeable = False
+        self._matrices[key] = matrix
+        if len(self._matrices) > self.max_size:
+            self._matrices.popitem(last=False)
+
+        return matrix
+
+    def invalidate(self, quaternion: Optional[np.ndarray] = None) -> None:
+        """
+        Drop a cached matrix, or every cached matrix.
+        :param quaternion: 4-numpy-array of the orientation to drop. If None, the whole cache is cleared.
+        :return: None
+        """
+        if quaternion is None:
+            self._matrices.clear()
+        else:
+            self._matrices.pop(quaternion.tobytes(), None)
+
+    def reset_counters(self) -> None:
+        """Reset the hit and miss counters."""
+        self.hits = 0
+        self.misses = 0
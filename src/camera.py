@@ -0,0 +1,144 @@
+from typing import Optional
+
+import numpy as np
+from numpy.typing import DTypeLike
+
+import src.config as config
+from src.config import FLOAT_DTYPES
+from src.validation import validated
+
+
+def _check_project(camera: "Camera",
+                   vertices: np.ndarray,
+                   out: np.ndarray = None) -> None:
+    assert vertices.dtype == camera.dtype
+    assert len(vertices.shape) == 2 and vertices.shape[1] == 3
+    assert out is None or (out.dtype == camera.dtype and out.shape == (vertices.shape[0], 2))
+
+
+class Camera:
+    """
+    Projects vertices in world frame straight to pygame's screen coordinates. The projection matrix, with pygame's
+    y-flip folded in, is cached until the camera changes, and projections are computed into buffers that are reused
+    from one call to the next.
+    """
+
+    def __init__(self,
+                 location: np.ndarray,
+                 projection_method: int,
+                 screen_height: int,
+                 dtype: Optional[DTypeLike] = None) -> None:
+        """
+        :param location: 3-numpy-array of camera location in world frame.
+        :param projection_method: 0 to use perspective projection, 1 to use orthographic projection.
+        :param screen_height: height of the PyGame window.
+        :param dtype: floating point type of the vertices the camera projects, and of its matrix and buffers. Defaults
+        to config.get_dtype().
+        """
+        self.dtype = config.get_dtype() if dtype is None else np.dtype(dtype)
+        assert self.dtype in FLOAT_DTYPES
+
+        self._location = np.empty(3)
+        self._location.flags.writeable = False
+        self._matrix = None
+        self._homogeneous = np.empty((0, 3), dtype=self.dtype)
+        self._projected = np.empty((0, 2), dtype=self.dtype)
+        self.version = 0
+
+        self.location = location
+        self.projection_method = projection_method
+        self.screen_height = screen_height
+
+    @property
+    def location(self) -> np.ndarray:
+        """Read-only 3-numpy-array of camera location in world frame. Assign to it to move the camera."""
+        return self._location
+
+    @location.setter
+    def location(self, location: np.ndarray) -> None:
+        assert location.dtype in FLOAT_DTYPES
+        assert location.shape == (3,)
+
+        self._location.flags.writeable = True
+        self._location[:] = location
+        self._location.flags.writeable = False
+        self._changed()
+
+    @property
+    def projection_method(self) -> int:
+        """0 to use perspective projection, 1 to use orthographic projection."""
+        return self._projection_method
+
+    @projection_method.setter
+    def projection_method(self, projection_method: int) -> None:
+        assert projection_method == 0 or projection_method == 1
+
+        self._projection_method = projection_method
+        self._changed()
+
+    @property
+    def screen_height(self) -> int:
+        """Height of the PyGame window."""
+        return self._screen_height
+
+    @screen_height.setter
+    def screen_height(self, screen_height: int) -> None:
+        self._screen_height = screen_height
+        self._changed()
+
+    def _changed(self) -> None:
+        self._matrix = None
+        self.version += 1
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """
+        4 x 3 numpy array that maps vertices in homogeneous world coordinates to homogeneous screen coordinates.
+        """
+        if self._matrix is None:
+            if self._projection_method == 0:
+                x, y, z = self._location
+                matrix = np.array([[-z, 0, 0],
+                                   [0, -z, 0],
+                                   [x, y, 1],
+                                   [0, 0, -z]])
+            else:
+                matrix = np.array([[1., 0, 0],
+                                   [0, 1, 0],
+                                   [0, 0, 0],
+                                   [0, 0, 1]])
+
+            # y_screen = screen_height - y / w = (screen_height * w - y) / w
+            matrix[:, 1] = self._screen_height * matrix[:, 2] - matrix[:, 1]
+            matrix = matrix.astype(self.dtype)
+            matrix.flags.writeable = False
+            self._matrix = matrix
+
+        return self._matrix
+
+    @validated(_check_project)
+    def project(self,
+                vertices: np.ndarray,
+                out: np.ndarray = None) -> np.ndarray:
+        """
+        Project vertices onto the screen.
+        :param vertices: n x 3 numpy array of vertices in world frame.
+        :param out: optional n x 2 numpy array where the screen coordinates are stored.
+        :return: n x 2 numpy array of vertices in pygame's coordinate system. If 'out' is not given, this is a **VIEW**
+        into the camera's buffer, which is overwritten by the next projection.
+        """
+        n = vertices.shape[0]
+        if self._homogeneous.shape[0] < n:
+            self._homogeneous = np.empty((n, 3), dtype=self.dtype)
+            self._projected = np.empty((n, 2), dtype=self.dtype)
+
+        if out is None:
+            out = self._projected[:n]
+
+        matrix = self.matrix
+        homogeneous = self._homogeneous[:n]
+        np.matmul(vertices, matrix[:3], out=homogeneous)
+        homogeneous += matrix[3]
+        np.divide(homogeneous[:, :2], homogeneous[:, 2:], out=out)
+
+        return out
@@ -0,0 +1,77 @@
+import os
+
+import numpy as np
+from numpy.typing import DTypeLike
+
+# Floating point types arrays may have. Functions keep the type of their inputs, so float32 inputs give float32
+# results, at half the memory and bandwidth of float64.
+FLOAT_DTYPES = (np.float32, np.float64)
+
+# Floating point type of the arrays the simulation creates itself, e.g. meshes, poses and camera buffers.
+_dtype = np.dtype(os.environ.get("QUATERNION_DTYPE", "float64"))
+assert _dtype in FLOAT_DTYPES
+
+
+def get_dtype() -> np.dtype:
+    """Return the floating point type of the arrays the simulation creates."""
+    return _dtype
+
+
+def set_dtype(dtype: DTypeLike) -> None:
+    """
+    Set the floating point type of the arrays the simulation creates. Only affects arrays created afterwards.
+    :param dtype: np.float32 or np.float64.
+    :return: None
+    """
+    global _dtype
+
+    dtype = np.dtype(dtype)
+    assert dtype in FLOAT_DTYPES
+
+    _dtype = dtype
+
+
+# Whether functions decorated with validation.validated check their arguments. The checks cost a few microseconds per
+# call, which adds up on the per-frame path, so they are off unless QUATERNION_VALIDATE=1, as the tests set it.
+_validate = os.environ.get("QUATERNION_VALIDATE", "0") == "1"
+
+
+def validation_enabled() -> bool:
+    """Return whether functions check their arguments."""
+    return _validate
+
+
+def set_validation(enabled: bool) -> None:
+    """
+    Turn argument checks on or off. Functions decorated while validation was off never check their arguments, so
+    checks are only added by QUATERNION_VALIDATE=1 at import, and this only turns them off and on again.
+    :param enabled: whether functions check their arguments.
+    :return: None
+    """
+    global _validate
+
+    _validate = enabled
+
+
+# Backend of the kernels in src.kernels: "numba" to JIT-compile them, "numpy" to use plain NumPy, or "auto" to use
+# numba if it is installed. Read once, when src.kernels is imported.
+BACKEND = os.environ.get("QUATERNION_BACKEND", "auto")
+assert BACKEND in ("auto", "numba", "numpy")
+
+# Path of an OBJ or PLY mesh the simulation shows instead of its cuboid, if any.
+MESH = os.environ.get("QUATERNION_MESH")
+
+# Path of the track file the simulation records the controlled object's poses to, if any, see recording.TrackRecorder.
+RECORDING = os.environ.get("QUATERNION_RECORDING")
+
+# Per-stage frame timing of the simulation, see timing.FrameTimer: off if unset, on if "1", and otherwise the path of
+# the .csv or .json file it is logged to. F3 toggles its overlay.
+TIMING = os.environ.get("QUATERNION_TIMING")
+
+# Whether the simulation culls back faces and faces off the screen before drawing, see culling.Culler: on if "1".
+CULLING = os.environ.get("QUATERNION_CULLING", "0") == "1"
+
+# How the simulation draws objects: "wireframe" draws their edges, "filled" their flat shaded faces with occlusion, see
+# raster.Rasterizer.
+RENDERING = os.environ.get("QUATERNION_RENDERING", "wireframe")
+assert RENDERING in ("wireframe", "filled")
@@ -1,27 +1,31 @@
 import numpy as np
 
+from src.config import FLOAT_DTYPES
+from src.validation import validated
 
+
+def _check_vertices(vertices: np.ndarray) -> None:
+    assert len(vertices.shape) == 2
+    assert vertices.dtype in FLOAT_DTYPES
+
+
+@validated(_check_vertices)
 def cartesian_to_homogeneous(vertices: np.ndarray) -> np.ndarray:
     """
     Turn vertices from cartesian to homogeneous representation.
     :param vertices: n x d matrix of vertices in cartesian coordinate
     :return: n x (d + 1) matrix of vertices in homogeneous coordinate
     """
-    assert len(vertices.shape) == 2
-    assert vertices.dtype == np.float64
-
-    return np.concatenate((vertices, np.ones((vertices.shape[0], 1))), axis=1)
+    return np.concatenate((vertices, np.ones((vertices.shape[0], 1), dtype=vertices.dtype)), axis=1)
 
 
+@validated(_check_vertices)
 def homogeneous_to_cartesian(vertices: np.ndarray) -> np.ndarray:
     """
     Turn vertices from homogeneous representation to cartesian representation.
     :param vertices: n x d matrix of vertices in homogeneous coordinate
     :return: n x (d - 1) matrix of vertices in cartesian coordinate
     """
-    assert len(vertices.shape) == 2
-    assert vertices.dtype == np.float64
-
     return vertices[:, 0:-1] / vertices[:, -1][:, None]
 
 
@@ -40,6 +44,15 @@ def cartesian_to_pygame(coordinates: np.ndarray, screen_height: int) -> np.ndarr
     return result
 
 
+def _check_local_coordinates(result: np.ndarray,
+                             vertices: np.ndarray,
+                             origin: np.ndarray) -> None:
+    assert result.dtype in FLOAT_DTYPES and vertices.dtype == result.dtype and origin.dtype == result.dtype
+    assert len(vertices.shape) <= 2 and vertices.shape[-1] == 3
+    assert result.shape == vertices.shape
+
+
+@validated(_check_local_coordinates)
 def local_coordinates(result: np.ndarray,
                       vertices: np.ndarray,
                       origin: np.ndarray) -> None:
@@ -50,8 +63,4 @@ def local_coordinates(result: np.ndarray,
     :param origin: 3-numpy-array of origin of local frame.
     :return: None
     """
-    assert result.dtype == np.float64 and vertices.dtype == np.float64 and origin.dtype == np.float64
-    assert len(vertices.shape) <= 2 and vertices.shape[-1] == 3
-    assert result.shape == vertices.shape
-
     result[:] = vertices - origin
\ No newline at end of file
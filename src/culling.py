@@ -0,0 +1,152 @@
+from typing import List
+
+import numpy as np
+
+import src.mesh as m
+from src.camera import Camera
+from src.scene import Scene
+
+
+def face_normals(vertices: np.ndarray, faces: np.ndarray) -> np.ndarray:
+    """
+    Return the normals of faces, i.e. the cross products of their first two sides. They are not normalized, and point
+    the way the winding of the faces makes them, inward or outward.
+    :param vertices: v x 3 numpy array of vertices.
+    :param faces: f x k numpy array of face indices, k >= 3.
+    :return: f x 3 numpy array of normals.
+    """
+    first = vertices[faces[:, 0]]
+    u = vertices[faces[:, 1]] - first
+    v = vertices[faces[:, 2]] - first
+
+    # Written out, as np.cross is slow on many short vectors.
+    return np.stack((u[:, 1] * v[:, 2] - u[:, 2] * v[:, 1],
+                     u[:, 2] * v[:, 0] - u[:, 0] * v[:, 2],
+                     u[:, 0] * v[:, 1] - u[:, 1] * v[:, 0]), axis=-1)
+
+
+def outward_sign(vertices: np.ndarray, faces: np.ndarray) -> int:
+    """
+    Return whether the normals of a closed mesh (see face_normals) point outward, from the sign of its volume.
+    :param vertices: v x 3 numpy array of vertices.
+    :param faces: f x k numpy array of face indices, k >= 3.
+    :return: 1 if the normals point outward, -1 if they point inward.
+    """
+    # Every face is split into a fan of triangles around its first vertex, each adding a signed tetrahedron.
+    first = vertices[faces[:, 0]]
+    volume = sum(np.einsum('ij,ij->', first, np.cross(vertices[faces[:, j]], vertices[faces[:, j + 1]]))
+                 for j in range(1, faces.shape[1] - 1))
+
+    return 1 if volume >= 0 else -1
+
+
+class Culler:
+    """
+    Drops the faces that cannot be seen before drawing: back faces, which point away from the camera, and faces whose
+    projected bounds lie outside the screen. The edge strips of the mesh are kept, and only cut into the runs of edges
+    of the remaining faces, so culling costs a few vectorized passes over the faces and edges per frame.
+    """
+
+    def __init__(self,
+                 faces: np.ndarray,
+                 strips: List[np.ndarray],
+                 signs: np.ndarray,
+                 screen_width: int,
+                 screen_height: int) -> None:
+        """
+        :param faces: f x k numpy array of face indices, k >= 3.
+        :param strips: edge strips of 'faces', see mesh.edge_strips.
+        :param signs: f-numpy-array of 1 for the faces whose normals (see face_normals) point outward, and -1 for those
+        whose normals point inward, see outward_sign.
+        :param screen_width: width of the screen.
+        :param screen_height: height of the screen.
+        """
+        assert len(faces.shape) == 2 and 3 <= faces.shape[1]
+        assert signs.shape == (faces.shape[0],)
+
+        self.faces = faces
+        self.signs = signs
+        # Indices of the faces' j-th vertices in row j, so the faces' bounds reduce over contiguous rows.
+        self._corners = np.ascontiguousarray(faces.T)
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+
+        edges, self.face_edges = m.unique_edges(faces)
+        number_of_edges = edges.shape[0]
+
+        # The strips joined into one path. Segment i runs from path[i] to path[i + 1], and is the edge segment_edges[i],
+        # or the extra edge number_of_edges, never visible, where one strip ends and the next starts.
+        self._path = np.concatenate(strips) if strips else np.empty(0, dtype=np.int64)
+        starts, ends = self._path[:-1], self._path[1:]
+
+        # Edges are sorted, so are their keys, and each segment's edge is found by binary search.
+        base = int(faces.max()) + 1
+        keys = edges[:, 0] * base + edges[:, 1]
+        segment_keys = np.minimum(starts, ends) * base + np.maximum(starts, ends)
+        found = np.minimum(np.searchsorted(keys, segment_keys), number_of_edges - 1)
+        self._segment_edges = np.where(keys[found] == segment_keys, found, number_of_edges)
+        self._segment_edges[np.cumsum([strip.shape[0] for strip in strips[:-1]], dtype=np.int64) - 1] = number_of_edges
+        self._edge_mask = np.zeros(number_of_edges + 1, dtype=bool)
+
+    def visible_faces(self,
+                      vertices: np.ndarray,
+                      points: np.ndarray,
+                      camera: Camera) -> np.ndarray:
+        """
+        Return the faces that face the camera and overlap the screen.
+        :param vertices: v x 3 numpy array of vertices in world frame.
+        :param points: v x 2 numpy array of the vertices in pygame's coordinate system, see Camera.project.
+        :param camera: camera the vertices are projected with.
+        :return: boolean f-numpy-array of the visible faces.
+        """
+        normals = face_normals(vertices, self.faces)
+        if camera.projection_method == 0:
+            facing = np.einsum('ij,ij->i', normals, camera.location - vertices[self.faces[:, 0]])
+        else:
+            # Orthographic projection looks along the z-axis.
+            facing = -normals[:, 2]
+        visible = facing * self.signs > 0
+
+        xs = points[:, 0][self._corners]
+        ys = points[:, 1][self._corners]
+        visible &= ((xs.max(axis=0) >= 0) & (xs.min(axis=0) <= self.screen_width)
+                    & (ys.max(axis=0) >= 0) & (ys.min(axis=0) <= self.screen_height))
+
+        return visible
+
+    def cull(self,
+             vertices: np.ndarray,
+             points: np.ndarray,
+             camera: Camera) -> List[np.ndarray]:
+        """
+        Return the edge strips of the visible faces, see visible_faces.
+        :param vertices: v x 3 numpy array of vertices in world frame.
+        :param points: v x 2 numpy array of the vertices in pygame's coordinate system, see Camera.project.
+        :param camera: camera the vertices are projected with.
+        :return: list of arrays of vertex indices along each strip, runs of the strips passed to the constructor.
+        """
+        self._edge_mask[:] = False
+        self._edge_mask[self.face_edges[self.visible_faces(vertices, points, camera)]] = True
+
+        segments = np.concatenate(([False], self._edge_mask[self._segment_edges], [False]))
+        changes = np.flatnonzero(segments[1:] != segments[:-1])
+
+        # Runs of visible segments start and end at alternate changes; a run of segments i to j - 1 has the vertices
+        # path[i] to path[j].
+        return [self._path[start:end + 1] for start, end in zip(changes[::2].tolist(), changes[1::2].tolist())]
+
+
+def scene_culler(scene: Scene, screen_width: int, screen_height: int) -> Culler:
+    """
+    Return a culler of all objects of a scene, whose meshes are assumed closed to tell their outward normals apart.
+    :param scene: scene to cull.
+    :param screen_width: width of the screen.
+    :param screen_height: height of the screen.
+    :return: culler of the scene's batched vertices, whose strips are the scene's.
+    """
+    offsets = scene.offsets.tolist()
+    signs = [np.full(faces.shape[0],
+                     outward_sign(scene_object.reference_vertices, faces - offset))
+             for scene_object, faces, offset in zip(scene.objects, scene.faces, offsets)]
+
+    return Culler(scene.batched_faces(), scene.strips, np.concatenate(signs), screen_width, screen_height)
@@ -0,0 +1,66 @@
+from typing import Dict, Sequence
+
+import numpy as np
+
+# Default edges of the drift histogram.
+BINS = (0., 1e-15, 1e-12, 1e-9, 1e-6, 1e-3, np.inf)
+
+
+class DriftMonitor:
+    """
+    Tracks how far accumulated orientation quaternions drift from unit norm, i.e. |norm(q) - 1|, and renormalizes them
+    on a fixed cadence, or as soon as the drift exceeds a tolerance.
+    """
+
+    def __init__(self,
+                 renormalize_every: int = 32,
+                 tolerance: float = 1e-9,
+                 bins: Sequence[float] = BINS) -> None:
+        """
+        :param renormalize_every: number of updates between renormalizations.
+        :param tolerance: drift beyond which an orientation is renormalized regardless of the cadence.
+        :param bins: increasing edges of the drift histogram, the last one being inf.
+        """
+        bins = np.array(bins, dtype=float)
+        assert 0 < renormalize_every and 0 <= tolerance
+        assert len(bins.shape) == 1 and 2 <= bins.shape[0] and np.all(np.diff(bins) > 0)
+
+        self.renormalize_every = renormalize_every
+        self.tolerance = tolerance
+        self.bins = bins
+        self.histogram = np.zeros(bins.shape[0] - 1, dtype=np.int64)
+        self.updates = 0
+        self.renormalizations = 0
+        self.max_drift = 0.
+
+    def observe(self, orientation: np.ndarray) -> float:
+        """
+        Record the drift of an orientation.
+        :param orientation: 4-numpy-array of orientation in quaternion.
+        :return: drift of the orientation.
+        """
+        drift = abs(np.sqrt(np.dot(orientation, orientation)) - 1.)
+        self.histogram[min(np.searchsorted(self.bins, drift, side='right') - 1, self.histogram.shape[0] - 1)] += 1
+        self.max_drift = max(self.max_drift, drift)
+
+        return drift
+
+    def update(self, orientation: np.ndarray) -> None:
+        """
+        Record the drift of an orientation that was just updated, and renormalize (mutate) it if it is due.
+        :param orientation: 4-numpy-array of orientation in quaternion.
+        :return: None
+        """
+        self.updates += 1
+        drift = self.observe(orientation)
+
+        if drift > self.tolerance or self.updates % self.renormalize_every == 0:
+            orientation /= np.sqrt(np.dot(orientation, orientation))
+            self.renormalizations += 1
+
+    def summary(self) -> Dict:
+        """Return the counters as a dictionary."""
+        return {"updates": self.updates,
+                "renormalizations": self.renormalizations,
+                "max_drift": self.max_drift,
+                "histogram": dict(zip(self.bins[1:].tolist(), self.histogram.tolist()))}
@@ -0,0 +1,199 @@
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple, Union
+
+import pygame
+import numpy as np
+
+import src.animation as a
+import src.mesh as m
+import src.simulation as sim
+from src.camera import Camera
+
+
+def render_frames(frames: Iterable[Tuple[int, np.ndarray]],
+                  faces: np.ndarray,
+                  camera: Camera,
+                  screen_width: int) -> Iterator[Tuple[int, pygame.Surface]]:
+    """
+    Draw frames onto an offscreen surface, as fast as they are consumed. Neither a display nor pygame.init is needed.
+    :param frames: iterable of (frame index, v x 3 numpy array of vertices), e.g. animation.keyframe_frames.
+    :param faces: f x 4 numpy array of face indices.
+    :param camera: camera that projects the vertices onto the surface. Its screen height is the surface's height.
+    :param screen_width: width of the surface.
+    :return: iterator of (frame index, surface with the frame drawn). The same surface is redrawn for every frame.
+    """
+    surface = pygame.Surface((screen_width, camera.screen_height))
+    strips = m.edge_strips(m.unique_edges(faces)[0])
+
+    for index, vertices in frames:
+        sim.draw_frame(surface, vertices, strips, camera)
+        yield index, surface
+
+
+def copy_pixels(surface: pygame.Surface, rgb: np.ndarray) -> None:
+    """
+    Copy the pixels of a surface into an RGB buffer.
+    :param surface: PyGame surface.
+    :param rgb: height x width x 3 uint8 numpy array where the pixels are stored.
+    :return: None
+    """
+    assert rgb.shape == (surface.get_height(), surface.get_width(), 3)
+
+    pixels = pygame.surfarray.pixels3d(surface)
+    rgb[:] = pixels.swapaxes(0, 1)
+    del pixels
+
+
+def render_keyframe_animation(output: Union[str, np.ndarray],
+                              orientation_keyframes: np.ndarray,
+                              center_keyframes: np.ndarray,
+                              reference_vertices: np.ndarray,
+                              faces: np.ndarray,
+                              camera_location: np.ndarray,
+                              projection_method: int,
+                              screen_width: int,
+                              screen_height: int,
+                              number_of_frames: int = 100) -> Union[np.ndarray, None]:
+    """
+    Interpolate two keyframes and render the animation without a display, writing every frame out as soon as it is
+    drawn.
+    :param output: where to write the frames. One of
+    - number_of_frames x screen_height x screen_width x 3 uint8 numpy array, i.e. a raw RGB buffer,
+    - path ending in '.npy', which is created as a memory-mapped array of the same shape,
+    - path containing a '{}' style field, formatted with the frame index to name an image file per frame, e.g.
+    'frames/{:04d}.png'. The format is taken from the extension, see pygame.image.save.
+    :param orientation_keyframes: 2 x 4 numpy array of object orientations of two keyframes in quaternions.
+    :param center_keyframes: 2 x 3 numpy array of object centers of two keyframes.
+    :param reference_vertices: v x 3 object vertices with (0, 0, 0) as center. All orientations are relative to them.
+    :param faces: 2D numpy array of face indices.
+    :param camera_location: 3-numpy-array of camera location in world frame.
+    :param projection_method: 0 to use perspective projection, 1 to use orthographic projection.
+    :param screen_width: width of the frames.
+    :param screen_height: height of the frames.
+    :param number_of_frames: number of frames of the animation.
+    :return: the RGB buffer or memory-mapped array the frames were written to, None if they were written as images.
+    """
+    assert not (np.any(np.isnan(orientation_keyframes)) or np.any(np.isnan(center_keyframes)))
+
+    shape = (number_of_frames, screen_height, screen_width, 3)
+    if isinstance(output, np.ndarray):
+        assert output.shape == shape and output.dtype == np.uint8
+        rgb = output
+    elif output.endswith('.npy'):
+        rgb = np.lib.format.open_memmap(output, mode='w+', dtype=np.uint8, shape=shape)
+    else:
+        # Without a field, every frame would overwrite the same image file.
+        assert output.format(0) != output.format(1)
+        directory = os.path.dirname(output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        rgb = None
+
+    frames = a.keyframe_frames(orientation_keyframes, center_keyframes, reference_vertices, number_of_frames)
+    for index, surface in render_frames(frames,
+                                        faces,
+                                        Camera(camera_location, projection_method, screen_height,
+                                               reference_vertices.dtype),
+                                        screen_width):
+        if rgb is None:
+            pygame.image.save(surface, output.format(index))
+        else:
+            copy_pixels(surface, rgb[index])
+
+    if isinstance(rgb, np.memmap):
+        rgb.flush()
+
+    return rgb
+
+
+# Meshes attached by a batch worker, see _attach_meshes.
+_meshes = []
+_shared_memories = []
+
+
+def _share(array: np.ndarray) -> Tuple[shared_memory.SharedMemory, Tuple[str, Tuple[int, ...], str]]:
+    """
+    Copy an array into a new block of shared memory.
+    :param array: numpy array.
+    :return: the shared memory, and the (name, shape, dtype) a worker attaches the copy with.
+    """
+    memory = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=memory.buf)[...] = array
+
+    return memory, (memory.name, array.shape, array.dtype.str)
+
+
+def _attach_meshes(descriptors: List[Tuple[Tuple[str, Tuple[int, ...], str], ...]]) -> None:
+    """
+    Attach the shared meshes of a batch once per worker, as read-only arrays over the shared memory.
+    :param descriptors: list of the (name, shape, dtype) of the reference vertices and faces of each mesh, see _share.
+    :return: None
+    """
+    for mesh in descriptors:
+        arrays = []
+        for name, shape, dtype in mesh:
+            memory = shared_memory.SharedMemory(name=name)
+            array = np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+            array.flags.writeable = False
+            _shared_memories.append(memory)
+            arrays.append(array)
+        _meshes.append(tuple(arrays))
+
+
+def _render_job(job: Dict) -> str:
+    """Render a job of render_batch in a worker, with its mesh replaced by the index of the shared mesh."""
+    reference_vertices, faces = _meshes[job.pop("mesh")]
+    render_keyframe_animation(reference_vertices=reference_vertices, faces=faces, **job)
+
+    return job["output"]
+
+
+def render_batch(jobs: Sequence[Dict], processes: Union[int, None] = None) -> List[str]:
+    """
+    Render many independent keyframe animations across a pool of processes. Every distinct mesh is copied once into
+    shared memory, which the workers map instead of receiving a pickled copy with each job, and each job writes its
+    frames to its own output file.
+    :param jobs: dictionaries of the arguments of render_keyframe_animation, i.e. 'output', 'orientation_keyframes',
+    'center_keyframes', 'reference_vertices', 'faces', 'camera_location', 'projection_method', 'screen_width',
+    'screen_height' and optionally 'number_of_frames'. 'output' must be a path, a '.npy' file or '{}' style image file
+    names, distinct from the other jobs'. Jobs whose 'reference_vertices' and 'faces' are the same arrays share a mesh.
+    :param processes: number of worker processes. Defaults to the number of CPUs.
+    :return: list of the outputs of the jobs, in order, once they are all written.
+    """
+    outputs = [job["output"] for job in jobs]
+    assert all(isinstance(output, str) for output in outputs)
+    assert len(set(outputs)) == len(outputs)
+
+    meshes = {}
+    memories = []
+    descriptors = []
+    payloads = []
+    try:
+        for job in jobs:
+            key = (id(job["reference_vertices"]), id(job["faces"]))
+            if key not in meshes:
+                meshes[key] = len(descriptors)
+                shared = [_share(np.ascontiguousarray(job[name])) for name in ("reference_vertices", "faces")]
+                memories.extend(memory for memory, _ in shared)
+                descriptors.append(tuple(descriptor for _, descriptor in shared))
+
+            payload = {name: value for name, value in job.items() if name not in ("reference_vertices", "faces")}
+            payload["mesh"] = meshes[key]
+            payloads.append(payload)
+
+        if processes is None:
+            processes = os.cpu_count() or 1
+        processes = max(1, min(processes, len(payloads)))
+
+        if payloads:
+            with multiprocessing.Pool(processes, _attach_meshes, (descriptors,)) as pool:
+                # One job per task, so that jobs of uneven length balance across the workers.
+                pool.map(_render_job, payloads, chunksize=1)
+    finally:
+        for memory in memories:
+            memory.close()
+            memory.unlink()
+
+    return outputs
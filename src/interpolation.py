@@ -1,5 +1,9 @@
 import numpy as np
 
+import src.quaternion as q
+from src.config import FLOAT_DTYPES
+from src.validation import validated
+
 
 def linear_interpolation(keyframes: np.ndarray,
                          num: int) -> np.ndarray:
@@ -9,13 +13,205 @@ def linear_interpolation(keyframes: np.ndarray,
     :param num: number of values generated between two keyframes (inclusive).
     :return: k-numpy-array of generated values.
     """
-    assert keyframes.dtype == np.float64
+    assert keyframes.dtype in FLOAT_DTYPES
     assert len(keyframes.shape) == 2 and keyframes.shape[0] == 2
     assert 0 <= num
 
     return (np.linspace([0, 1],
                         [1, 1],
-                        num=num)
+                        num=num,
+                        dtype=keyframes.dtype)
             @ np.array([[-1, 1],
-                        [1, 0]])
+                        [1, 0]], dtype=keyframes.dtype)
             @ keyframes)
+
+
+def _check_interpolation(q0: np.ndarray,
+                         q1: np.ndarray,
+                         t: np.ndarray,
+                         *args, **kwargs) -> None:
+    assert q0.dtype in FLOAT_DTYPES and q1.dtype == q0.dtype
+    assert q0.shape == (4,) and q1.shape == (4,) and len(t.shape) == 1
+
+
+@validated(_check_interpolation)
+def nlerp(q0: np.ndarray,
+          q1: np.ndarray,
+          t: np.ndarray) -> np.ndarray:
+    """
+    Normalized linear interpolation of two quaternions along the shortest path.
+    :param q0: 4-numpy-array of the quaternion at t = 0.
+    :param q1: 4-numpy-array of the quaternion at t = 1.
+    :param t: n-numpy-array of interpolation parameters in [0, 1].
+    :return: n x 4 numpy array of interpolated unit quaternions.
+    """
+    t = t.astype(q0.dtype, copy=False)
+    if np.dot(q0, q1) < 0:
+        q1 = -q1
+
+    result = np.outer(1 - t, q0)
+    result += np.outer(t, q1)
+    result /= np.linalg.norm(result, axis=-1)[:, None]
+
+    return result
+
+
+@validated(_check_interpolation)
+def slerp(q0: np.ndarray,
+          q1: np.ndarray,
+          t: np.ndarray,
+          nlerp_threshold: float = 0.9995) -> np.ndarray:
+    """
+    Spherical linear interpolation of two quaternions along the shortest path, i.e. at constant angular speed.
+    :param q0: 4-numpy-array of the quaternion at t = 0.
+    :param q1: 4-numpy-array of the quaternion at t = 1.
+    :param t: n-numpy-array of interpolation parameters in [0, 1].
+    :param nlerp_threshold: if the cosine of the angle between the normalized q0 and q1 exceeds it, the angle is small
+    enough for nlerp to be used instead, which is cheaper and avoids dividing by a vanishing sine.
+    :return: n x 4 numpy array of interpolated unit quaternions.
+    """
+    t = t.astype(q0.dtype, copy=False)
+    q0 = q0 / np.linalg.norm(q0)
+    q1 = q1 / np.linalg.norm(q1)
+
+    cosine = np.dot(q0, q1)
+    if cosine < 0:
+        q1 = -q1
+        cosine = -cosine
+
+    if cosine > nlerp_threshold:
+        return nlerp(q0, q1, t)
+
+    angle = np.arccos(cosine)
+    sine = np.sin(angle)
+
+    result = np.outer(np.sin((1 - t) * angle) / sine, q0)
+    result += np.outer(np.sin(t * angle) / sine, q1)
+
+    return result
+
+
+def _check_pairwise_slerp(q0: np.ndarray,
+                          q1: np.ndarray,
+                          t: np.ndarray,
+                          nlerp_threshold: float = 0.9995) -> None:
+    assert q0.dtype in FLOAT_DTYPES and q1.dtype == q0.dtype
+    assert q0.shape == q1.shape and len(q0.shape) == 2 and q0.shape[1] == 4
+    assert t.shape == (q0.shape[0],)
+
+
+@validated(_check_pairwise_slerp)
+def pairwise_slerp(q0: np.ndarray,
+                   q1: np.ndarray,
+                   t: np.ndarray,
+                   nlerp_threshold: float = 0.9995) -> np.ndarray:
+    """
+    Spherical linear interpolation of pairs of unit quaternions, each with its own interpolation parameter. Unlike
+    slerp, the hemispheres of the pairs are left as they are.
+    :param q0: n x 4 numpy array of unit quaternions at t = 0.
+    :param q1: n x 4 numpy array of unit quaternions at t = 1.
+    :param t: n-numpy-array of interpolation parameters in [0, 1].
+    :param nlerp_threshold: pairs whose cosine exceeds it are interpolated with nlerp instead.
+    :return: n x 4 numpy array of interpolated unit quaternions.
+    """
+    t = t.astype(q0.dtype, copy=False)
+    cosines = np.clip(np.sum(q0 * q1, axis=-1), -1., 1.)
+    angles = np.arccos(cosines)
+    sines = np.sin(angles)
+    small = cosines > nlerp_threshold
+    sines[small] = 1.
+
+    weights0 = np.where(small, 1 - t, np.sin((1 - t) * angles) / sines)
+    weights1 = np.where(small, t, np.sin(t * angles) / sines)
+
+    result = weights0[:, None] * q0 + weights1[:, None] * q1
+    result[small] /= np.linalg.norm(result[small], axis=-1)[:, None]
+
+    return result
+
+
+def squad_controls(quaternions: np.ndarray) -> np.ndarray:
+    """
+    Return the SQUAD control quaternions of a sequence of keyframe orientations.
+    :param quaternions: n x 4 numpy array of unit quaternions, each in the same hemisphere as the one before it.
+    :return: n x 4 numpy array of control quaternions. The first and last are the first and last keyframes.
+    """
+    assert quaternions.dtype in FLOAT_DTYPES
+    assert len(quaternions.shape) == 2 and quaternions.shape[1] == 4
+
+    result = quaternions.copy()
+    if quaternions.shape[0] < 3:
+        return result
+
+    inverses = q.quaternion_inverse(quaternions[1:-1])
+    logs = (q.quaternion_log(q.quaternion_multiplication(inverses, quaternions[2:]))
+            + q.quaternion_log(q.quaternion_multiplication(inverses, quaternions[:-2])))
+    result[1:-1] = q.quaternion_multiplication(quaternions[1:-1], q.quaternion_exp(-logs / 4))
+
+    return result
+
+
+def squad(q0: np.ndarray,
+          q1: np.ndarray,
+          s0: np.ndarray,
+          s1: np.ndarray,
+          t: np.ndarray) -> np.ndarray:
+    """
+    Spherical quadrangle interpolation between pairs of keyframe orientations.
+    :param q0: n x 4 numpy array of unit quaternions at t = 0.
+    :param q1: n x 4 numpy array of unit quaternions at t = 1.
+    :param s0: n x 4 numpy array of the control quaternions of q0 (see squad_controls).
+    :param s1: n x 4 numpy array of the control quaternions of q1.
+    :param t: n-numpy-array of interpolation parameters in [0, 1].
+    :return: n x 4 numpy array of interpolated unit quaternions.
+    """
+    return pairwise_slerp(pairwise_slerp(q0, q1, t),
+                          pairwise_slerp(s0, s1, t),
+                          2 * t * (1 - t))
+
+
+def catmull_rom_tangents(times: np.ndarray,
+                         points: np.ndarray) -> np.ndarray:
+    """
+    Return the Catmull-Rom tangents of a sequence of keyframe points, i.e. the central differences with respect to
+    time, and one-sided differences at both ends.
+    :param times: n-numpy-array of strictly increasing keyframe times, n >= 2.
+    :param points: n x d numpy array of keyframe points.
+    :return: n x d numpy array of tangents.
+    """
+    assert times.dtype in FLOAT_DTYPES and points.dtype in FLOAT_DTYPES
+    assert len(times.shape) == 1 and 2 <= times.shape[0] and points.shape[0] == times.shape[0]
+
+    result = np.empty_like(points)
+    result[1:-1] = (points[2:] - points[:-2]) / (times[2:] - times[:-2])[:, None]
+    result[0] = (points[1] - points[0]) / (times[1] - times[0])
+    result[-1] = (points[-1] - points[-2]) / (times[-1] - times[-2])
+
+    return result
+
+
+def hermite(p0: np.ndarray,
+            p1: np.ndarray,
+            m0: np.ndarray,
+            m1: np.ndarray,
+            durations: np.ndarray,
+            t: np.ndarray) -> np.ndarray:
+    """
+    Cubic Hermite interpolation between pairs of points.
+    :param p0: n x d numpy array of points at t = 0.
+    :param p1: n x d numpy array of points at t = 1.
+    :param m0: n x d numpy array of tangents, with respect to time, at p0.
+    :param m1: n x d numpy array of tangents, with respect to time, at p1.
+    :param durations: n-numpy-array of the time between p0 and p1.
+    :param t: n-numpy-array of interpolation parameters in [0, 1].
+    :return: n x d numpy array of interpolated points.
+    """
+    t = t.astype(p0.dtype, copy=False)
+    durations = durations.astype(p0.dtype, copy=False)
+    t2 = t * t
+    t3 = t2 * t
+
+    return (((2 * t3 - 3 * t2 + 1)[:, None] * p0)
+            + ((t3 - 2 * t2 + t) * durations)[:, None] * m0
+            + ((-2 * t3 + 3 * t2)[:, None] * p1)
+            + ((t3 - t2) * durations)[:, None] * m1)
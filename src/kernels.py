@@ -0,0 +1,418 @@
+from typing import Optional
+
+import numpy as np
+
+import src.config as config
+from src.config import FLOAT_DTYPES
+from src.quaternion import quaternion_multiplication
+from src.validation import validated
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+assert config.BACKEND != "numba" or numba is not None, "QUATERNION_BACKEND=numba but numba is not installed"
+
+# Backend the kernels run on, "numba" or "numpy".
+BACKEND = "numba" if numba is not None and config.BACKEND != "numpy" else "numpy"
+
+# quaternion_multiplication without its argument checks, which hamilton_product's own checks cover.
+_quaternion_multiplication = getattr(quaternion_multiplication, "unchecked", quaternion_multiplication)
+
+
+def _hamilton_product_loop(q: np.ndarray, p: np.ndarray, out: np.ndarray) -> None:
+    q = q.reshape(-1, 4)
+    p = p.reshape(-1, 4)
+    out = out.reshape(-1, 4)
+
+    for i in range(q.shape[0]):
+        q0, q1, q2, q3 = q[i, 0], q[i, 1], q[i, 2], q[i, 3]
+        p0, p1, p2, p3 = p[i, 0], p[i, 1], p[i, 2], p[i, 3]
+
+        out[i, 0] = q0 * p0 - q1 * p1 - q2 * p2 - q3 * p3
+        out[i, 1] = q0 * p1 + q1 * p0 + q2 * p3 - q3 * p2
+        out[i, 2] = q0 * p2 - q1 * p3 + q2 * p0 + q3 * p1
+        out[i, 3] = q0 * p3 + q1 * p2 - q2 * p1 + q3 * p0
+
+
+def _affine_project_loop(vertices: np.ndarray, matrix: np.ndarray, offset: np.ndarray, out: np.ndarray) -> None:
+    for i in range(vertices.shape[0]):
+        x, y, z = vertices[i, 0], vertices[i, 1], vertices[i, 2]
+        w = x * matrix[0, 2] + y * matrix[1, 2] + z * matrix[2, 2] + offset[2]
+
+        out[i, 0] = (x * matrix[0, 0] + y * matrix[1, 0] + z * matrix[2, 0] + offset[0]) / w
+        out[i, 1] = (x * matrix[0, 1] + y * matrix[1, 1] + z * matrix[2, 1] + offset[1]) / w
+
+
+def _batched_affine_loop(vertices: np.ndarray,
+                         offsets: np.ndarray,
+                         matrices: np.ndarray,
+                         translations: np.ndarray,
+                         objects: np.ndarray,
+                         out: np.ndarray) -> None:
+    for o in objects:
+        for i in range(offsets[o], offsets[o + 1]):
+            x, y, z = vertices[i, 0], vertices[i, 1], vertices[i, 2]
+            for j in range(3):
+                out[i, j] = x * matrices[o, 0, j] + y * matrices[o, 1, j] + z * matrices[o, 2, j] + translations[o, j]
+
+
+def _batched_affine_project_loop(vertices: np.ndarray,
+                                 offsets: np.ndarray,
+                                 matrices: np.ndarray,
+                                 translations: np.ndarray,
+                                 out: np.ndarray) -> None:
+    for o in range(offsets.shape[0] - 1):
+        m, t = matrices[o], translations[o]
+        for i in range(offsets[o], offsets[o + 1]):
+            x, y, z = vertices[i, 0], vertices[i, 1], vertices[i, 2]
+            w = x * m[0, 2] + y * m[1, 2] + z * m[2, 2] + t[2]
+
+            out[i, 0] = (x * m[0, 0] + y * m[1, 0] + z * m[2, 0] + t[0]) / w
+            out[i, 1] = (x * m[0, 1] + y * m[1, 1] + z * m[2, 1] + t[1]) / w
+
+
+def _ply_record_starts_loop(data: np.ndarray,
+                            offset: int,
+                            count_sizes: np.ndarray,
+                            item_sizes: np.ndarray,
+                            big_endian: bool,
+                            starts: np.ndarray) -> int:
+    position = offset
+    for r in range(starts.shape[0]):
+        starts[r] = position
+        for p in range(count_sizes.shape[0]):
+            if position + count_sizes[p] > data.shape[0]:
+                return r
+            items = 0
+            for j in range(count_sizes[p]):
+                if big_endian:
+                    items = items * 256 + data[position + j]
+                else:
+                    items += data[position + j] << (8 * j)
+            # Scalar properties have no count, and are a single item.
+            position += count_sizes[p] + (items if count_sizes[p] > 0 else 1) * item_sizes[p]
+
+    return starts.shape[0] if position <= data.shape[0] else starts.shape[0] - 1
+
+
+def _fill_triangles_loop(pixels: np.ndarray,
+                         depth: np.ndarray,
+                         width: int,
+                         xs: np.ndarray,
+                         ys: np.ndarray,
+                         depths: np.ndarray,
+                         triangles: np.ndarray,
+                         triangle_faces: np.ndarray,
+                         face_colors: np.ndarray,
+                         bounds: np.ndarray) -> None:
+    screen_width, screen_height = pixels.shape[0], pixels.shape[1]
+    for t in range(triangles.shape[0]):
+        i0, i1, i2 = triangles[t, 0], triangles[t, 1], triangles[t, 2]
+
+        # Rows and columns of the pixel centers within the bounding box, clipped to the screen.
+        top = max(np.ceil(min(ys[i0], ys[i1], ys[i2]) - 0.5), 0.)
+        bottom = min(np.floor(max(ys[i0], ys[i1], ys[i2]) - 0.5), screen_height - 1.)
+        left = max(np.ceil(min(xs[i0], xs[i1], xs[i2]) - 0.5), 0.)
+        right = min(np.floor(max(xs[i0], xs[i1], xs[i2]) - 0.5), screen_width - 1.)
+        if not (top <= bottom and left <= right):
+            continue
+
+        # Corners relative to the bounding box, and the barycentric coordinates and depth as affine functions of the
+        # pixel coordinates relative to it, as in raster.Rasterizer.draw.
+        x0, x1, x2 = xs[i0] - left, xs[i1] - left, xs[i2] - left
+        y0, y1, y2 = ys[i0] - top, ys[i1] - top, ys[i2] - top
+        area = (x1 - x0) * (y2 - y0) - (x2 - x0) * (y1 - y0)
+        if not area != 0:
+            continue
+        inverse = 1 / area
+        a0, b0, c0 = (y1 - y2) * inverse, (x2 - x1) * inverse, (x1 * y2 - x2 * y1) * inverse
+        a1, b1, c1 = (y2 - y0) * inverse, (x0 - x2) * inverse, (x2 * y0 - x0 * y2) * inverse
+        a2, b2, c2 = -a0 - a1, -b0 - b1, 1 - c0 - c1
+        d0, d1, d2 = depths[i0], depths[i1], depths[i2]
+        step = a0 * d0 + a1 * d1 + a2 * d2
+        rise = b0 * d0 + b1 * d1 + b2 * d2
+        base = c0 * d0 + c1 * d1 + c2 * d2
+
+        top, left, extent = int(top), int(left), right - left
+        face = triangle_faces[t]
+        for row in range(int(bottom) - top + 1):
+            center = row + 0.5
+            low = 0.5
+            high = extent + 0.5
+            # Along a row, a barycentric coordinate a * x + k is positive right of -k / a if a > 0, left of it if
+            # a < 0, and everywhere or nowhere if a = 0.
+            for a, k in ((a0, b0 * center + c0), (a1, b1 * center + c1), (a2, b2 * center + c2)):
+                if a > 0:
+                    low = max(low, -k / a)
+                elif a < 0:
+                    high = min(high, -k / a)
+                elif k < 0:
+                    high = -np.inf
+            if not low <= high:
+                continue
+
+            y = top + row
+            first = int(np.ceil(low - 0.5))
+            start = step * (first + 0.5) + rise * center + base
+            for column in range(first, int(np.floor(high - 0.5)) + 1):
+                x = left + column
+                value = np.float32(start + step * (column - first))
+                if value <= depth[y * width + x]:
+                    depth[y * width + x] = value
+                    pixels[x, y, 0] = face_colors[face, 0]
+                    pixels[x, y, 1] = face_colors[face, 1]
+                    pixels[x, y, 2] = face_colors[face, 2]
+
+        bounds[0] = min(bounds[0], left)
+        bounds[1] = min(bounds[1], top)
+        bounds[2] = max(bounds[2], int(right))
+        bounds[3] = max(bounds[3], int(bottom))
+
+
+if BACKEND == "numba":
+    _hamilton_product = numba.njit(cache=True)(_hamilton_product_loop)
+    _affine_project = numba.njit(cache=True)(_affine_project_loop)
+    _batched_affine = numba.njit(cache=True)(_batched_affine_loop)
+    _batched_affine_project = numba.njit(cache=True)(_batched_affine_project_loop)
+    _fill_triangles = numba.njit(cache=True)(_fill_triangles_loop)
+    _ply_record_starts = numba.njit(cache=True)(_ply_record_starts_loop)
+
+
+def _check_hamilton_product(q: np.ndarray,
+                            p: np.ndarray,
+                            out: Optional[np.ndarray] = None) -> None:
+    assert q.dtype in FLOAT_DTYPES and p.dtype == q.dtype
+    assert q.shape[-1] == 4 and p.shape == q.shape
+    assert out is None or (out.dtype == q.dtype and out.shape == q.shape)
+
+
+@validated(_check_hamilton_product)
+def hamilton_product(q: np.ndarray,
+                     p: np.ndarray,
+                     out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Multiply quaternions pairwise, i.e. the Hamilton products q * p, like quaternion.quaternion_multiplication but
+    without broadcasting.
+    :param q: ... x 4 numpy array of quaternions.
+    :param p: numpy array of quaternions of the shape of q.
+    :param out: optional numpy array of the shape of q where the products are stored. It must not share memory with q
+    or p.
+    :return: numpy array of the products, i.e. 'out' if it is given.
+    """
+    if BACKEND == "numpy":
+        return _quaternion_multiplication(q, p, out)
+
+    if out is None:
+        out = np.empty_like(q)
+    # The kernel flattens its arguments into rows of quaternions, which needs them contiguous, so a strided 'out' gets
+    # the products through a contiguous copy.
+    result = out if out.flags.c_contiguous else np.empty_like(q)
+    _hamilton_product(np.ascontiguousarray(q), np.ascontiguousarray(p), result)
+    if result is not out:
+        out[...] = result
+
+    return out
+
+
+def _check_transform_project(reference_vertices: np.ndarray,
+                             rotation: np.ndarray,
+                             center: np.ndarray,
+                             camera_matrix: np.ndarray,
+                             out: Optional[np.ndarray] = None) -> None:
+    assert reference_vertices.dtype in FLOAT_DTYPES
+    assert rotation.dtype == center.dtype == camera_matrix.dtype == reference_vertices.dtype
+    assert len(reference_vertices.shape) == 2 and reference_vertices.shape[1] == 3
+    assert rotation.shape == (3, 3) and center.shape == (3,) and camera_matrix.shape == (4, 3)
+    assert out is None or (out.dtype == reference_vertices.dtype and out.shape == (reference_vertices.shape[0], 2))
+
+
+@validated(_check_transform_project)
+def transform_project(reference_vertices: np.ndarray,
+                      rotation: np.ndarray,
+                      center: np.ndarray,
+                      camera_matrix: np.ndarray,
+                      out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Rotate, translate and project vertices onto the screen in a single pass over them, i.e. compute the screen
+    coordinates of reference_vertices @ rotation + center without building the world vertices.
+    :param reference_vertices: v x 3 numpy array of vertices relative to the object's center.
+    :param rotation: 3 x 3 rotation matrix, see quaternion.rotation_matrix.
+    :param center: 3-numpy-array of the object's center in world frame.
+    :param camera_matrix: 4 x 3 projection matrix, see Camera.matrix.
+    :param out: optional v x 2 numpy array where the screen coordinates are stored.
+    :return: v x 2 numpy array of vertices in pygame's coordinate system, i.e. 'out' if it is given.
+    """
+    if out is None:
+        out = np.empty((reference_vertices.shape[0], 2), dtype=reference_vertices.dtype)
+
+    # (v @ R + c) @ M[:3] + M[3] = v @ (R @ M[:3]) + (c @ M[:3] + M[3]), so the pose and the camera fold into a single
+    # affine map before touching the vertices.
+    matrix = rotation @ camera_matrix[:3]
+    offset = center @ camera_matrix[:3] + camera_matrix[3]
+
+    if BACKEND == "numba":
+        _affine_project(np.ascontiguousarray(reference_vertices), matrix, offset, out)
+    else:
+        homogeneous = reference_vertices @ matrix
+        homogeneous += offset
+        np.divide(homogeneous[:, :2], homogeneous[:, 2:], out=out)
+
+    return out
+
+
+def _check_batched_transform(reference_vertices: np.ndarray,
+                             offsets: np.ndarray,
+                             rotations: np.ndarray,
+                             centers: np.ndarray,
+                             objects: np.ndarray,
+                             out: np.ndarray) -> None:
+    assert reference_vertices.dtype in FLOAT_DTYPES
+    assert rotations.dtype == centers.dtype == out.dtype == reference_vertices.dtype
+    assert len(reference_vertices.shape) == 2 and reference_vertices.shape[1] == 3
+    assert len(offsets.shape) == 1 and offsets[-1] <= reference_vertices.shape[0]
+    assert rotations.shape == (offsets.shape[0] - 1, 3, 3) and centers.shape == (offsets.shape[0] - 1, 3)
+    assert len(objects.shape) == 1 and out.shape == reference_vertices.shape
+
+
+@validated(_check_batched_transform)
+def batched_transform(reference_vertices: np.ndarray,
+                      offsets: np.ndarray,
+                      rotations: np.ndarray,
+                      centers: np.ndarray,
+                      objects: np.ndarray,
+                      out: np.ndarray) -> np.ndarray:
+    """
+    Rotate and translate the vertices of some objects of a batch, i.e. rows offsets[o] to offsets[o + 1] of 'out'
+    become those of reference_vertices @ rotations[o] + centers[o] for every object o in 'objects'.
+    :param reference_vertices: v x 3 numpy array of the batched vertices, each relative to its object's center.
+    :param offsets: (n + 1)-numpy-array of the objects' first rows, and the number of vertices last.
+    :param rotations: n x 3 x 3 numpy array of rotation matrices, see quaternion.rotation_matrix.
+    :param centers: n x 3 numpy array of the objects' centers in world frame.
+    :param objects: numpy array of the indices of the objects to transform.
+    :param out: v x 3 numpy array where the vertices are stored. Rows of the other objects are left as they are.
+    :return: 'out'
+    """
+    if BACKEND == "numba":
+        _batched_affine(np.ascontiguousarray(reference_vertices), offsets, rotations, centers, objects, out)
+    else:
+        for o in objects.tolist():
+            rows = out[offsets[o]:offsets[o + 1]]
+            np.matmul(reference_vertices[offsets[o]:offsets[o + 1]], rotations[o], out=rows)
+            rows += centers[o]
+
+    return out
+
+
+def _check_batched_transform_project(reference_vertices: np.ndarray,
+                                     offsets: np.ndarray,
+                                     rotations: np.ndarray,
+                                     centers: np.ndarray,
+                                     camera_matrix: np.ndarray,
+                                     out: Optional[np.ndarray] = None) -> None:
+    assert reference_vertices.dtype in FLOAT_DTYPES
+    assert rotations.dtype == centers.dtype == camera_matrix.dtype == reference_vertices.dtype
+    assert len(reference_vertices.shape) == 2 and reference_vertices.shape[1] == 3
+    assert len(offsets.shape) == 1 and offsets[-1] <= reference_vertices.shape[0]
+    assert rotations.shape == (offsets.shape[0] - 1, 3, 3) and centers.shape == (offsets.shape[0] - 1, 3)
+    assert camera_matrix.shape == (4, 3)
+    assert out is None or (out.dtype == reference_vertices.dtype and out.shape == (reference_vertices.shape[0], 2))
+
+
+@validated(_check_batched_transform_project)
+def batched_transform_project(reference_vertices: np.ndarray,
+                              offsets: np.ndarray,
+                              rotations: np.ndarray,
+                              centers: np.ndarray,
+                              camera_matrix: np.ndarray,
+                              out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    transform_project for a batch of objects in a single call, each object's vertices rotated and translated by its
+    own pose.
+    :param reference_vertices: v x 3 numpy array of the batched vertices, each relative to its object's center.
+    :param offsets: (n + 1)-numpy-array of the objects' first rows, and the number of vertices last.
+    :param rotations: n x 3 x 3 numpy array of rotation matrices, see quaternion.rotation_matrix.
+    :param centers: n x 3 numpy array of the objects' centers in world frame.
+    :param camera_matrix: 4 x 3 projection matrix, see Camera.matrix.
+    :param out: optional v x 2 numpy array where the screen coordinates are stored.
+    :return: v x 2 numpy array of vertices in pygame's coordinate system, i.e. 'out' if it is given.
+    """
+    if out is None:
+        out = np.empty((reference_vertices.shape[0], 2), dtype=reference_vertices.dtype)
+
+    # Each object's pose folds into the camera as in transform_project, for all objects at once.
+    matrices = rotations @ camera_matrix[:3]
+    translations = centers @ camera_matrix[:3] + camera_matrix[3]
+
+    if BACKEND == "numba":
+        _batched_affine_project(np.ascontiguousarray(reference_vertices), offsets, matrices, translations, out)
+    else:
+        for o in range(offsets.shape[0] - 1):
+            homogeneous = reference_vertices[offsets[o]:offsets[o + 1]] @ matrices[o]
+            homogeneous += translations[o]
+            np.divide(homogeneous[:, :2], homogeneous[:, 2:], out=out[offsets[o]:offsets[o + 1]])
+
+    return out
+
+
+def fill_triangles(pixels: np.ndarray,
+                   depth: np.ndarray,
+                   width: int,
+                   xs: np.ndarray,
+                   ys: np.ndarray,
+                   depths: np.ndarray,
+                   triangles: np.ndarray,
+                   triangle_faces: np.ndarray,
+                   face_colors: np.ndarray) -> np.ndarray:
+    """
+    Rasterize triangles through a depth buffer, one triangle and row span at a time, see raster.Rasterizer. Only
+    available on the numba backend, as the numpy backend rasterizes whole passes of triangles at once instead.
+    :param pixels: width x height x 3 numpy array of a surface's pixels, see pygame.surfarray.pixels3d.
+    :param depth: float32 numpy array of the depth buffer, where pixel (x, y) is depth[y * width + x].
+    :param width: number of columns of the depth buffer, at least the surface's width.
+    :param xs: v-numpy-array of the x-coordinates of the vertices in pygame's coordinate system.
+    :param ys: v-numpy-array of their y-coordinates.
+    :param depths: v-numpy-array of their depths, which are nearer the smaller and interpolated linearly on the screen.
+    :param triangles: t x 3 numpy array of the vertex indices of the triangles.
+    :param triangle_faces: t-numpy-array of the face of each triangle.
+    :param face_colors: f x 3 numpy array of the RGB colors of the faces.
+    :return: numpy array of the first column, first row, last column and last row of the pixels the triangles' bounding
+    boxes cover on the surface, the last ones smaller than the first ones if they cover none.
+    """
+    assert BACKEND == "numba"
+
+    bounds = np.array([pixels.shape[0], pixels.shape[1], -1, -1], dtype=np.int64)
+    _fill_triangles(pixels, depth, width, xs, ys, depths, triangles, triangle_faces, face_colors, bounds)
+
+    return bounds
+
+
+def ply_record_starts(data: np.ndarray,
+                      offset: int,
+                      count: int,
+                      count_sizes: np.ndarray,
+                      item_sizes: np.ndarray,
+                      big_endian: bool) -> np.ndarray:
+    """
+    Find the byte positions of binary PLY records whose sizes vary with the counts of their lists, by walking them one
+    after the other, see mesh.load_ply. Only available on the numba backend, as a sequential walk is too slow in
+    Python, and the numpy backend follows the records in whole-array passes over chunks of the body instead.
+    :param data: numpy array of the bytes of the body.
+    :param offset: byte position of the first record.
+    :param count: number of records.
+    :param count_sizes: numpy array of the sizes of the counts of the records' list properties, in order, and 0 for
+    their scalar properties.
+    :param item_sizes: numpy array of the sizes of the items of the list properties, and of the scalar properties.
+    :param big_endian: whether the counts are big-endian.
+    :return: count-numpy-array of the byte positions of the records.
+    """
+    assert BACKEND == "numba"
+    assert count_sizes.shape == item_sizes.shape
+
+    starts = np.empty(count, dtype=np.int64)
+    found = _ply_record_starts(data, offset, count_sizes.astype(np.int64), item_sizes.astype(np.int64), big_endian,
+                               starts)
+    assert found == count, "the records run past the end of the body"
+
+    return starts
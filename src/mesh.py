@@ -0,0 +1,485 @@
+import os
+import re
+from typing import List, Optional, Tuple
+
+import numpy as np
+from numpy.typing import DTypeLike
+
+import src.config as config
+import src.kernels as k
+from src.config import FLOAT_DTYPES
+
+# Types of the scalar properties of PLY files.
+PLY_TYPES = {b'char': 'i1', b'int8': 'i1', b'uchar': 'u1', b'uint8': 'u1',
+             b'short': 'i2', b'int16': 'i2', b'ushort': 'u2', b'uint16': 'u2',
+             b'int': 'i4', b'int32': 'i4', b'uint': 'u4', b'uint32': 'u4',
+             b'float': 'f4', b'float32': 'f4', b'double': 'f8', b'float64': 'f8'}
+
+# Bytes of a binary PLY body whose records are searched for at once on the numpy backend, see _ply_record_starts. The
+# search takes a few dozen times as much memory.
+PLY_CHUNK = 1 << 18
+
+
+def unique_edges(faces: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return the edges of a mesh, each listed once no matter how many faces share it.
+    :param faces: f x k numpy array of face indices.
+    :return: e x 2 numpy array of the vertex indices of the edges, smaller index first, and f x k numpy array where the
+    j-th entry of a face is the index of the edge from its j-th to its (j + 1)-th vertex.
+    """
+    assert len(faces.shape) == 2 and 2 <= faces.shape[1]
+
+    sides = np.stack((faces, np.roll(faces, -1, axis=1)), axis=-1).reshape(-1, 2)
+    sides.sort(axis=1)
+
+    edges, face_edges = np.unique(sides, axis=0, return_inverse=True)
+
+    return edges, face_edges.reshape(faces.shape)
+
+
+def edge_strips(edges: np.ndarray) -> List[np.ndarray]:
+    """
+    Decompose edges into strips, i.e. polylines that use every edge exactly once, so that a whole strip is drawn with
+    one call. Walks start from vertices of odd degree first, which keeps the number of strips small.
+    :param edges: e x 2 numpy array of the vertex indices of unique edges.
+    :return: list of numpy arrays of the vertex indices along each strip.
+    """
+    assert len(edges.shape) == 2 and edges.shape[1] == 2
+
+    # Faces padded to a common size (see load_obj) have sides from a vertex to itself, which need no drawing.
+    edges = edges[edges[:, 0] != edges[:, 1]]
+
+    if edges.shape[0] == 0:
+        return []
+
+    number_of_vertices = int(edges.max()) + 1
+    number_of_edges = edges.shape[0]
+
+    # Adjacency in compressed sparse row form: the half-edges leaving vertex v are order[offsets[v]:offsets[v + 1]].
+    sources = np.concatenate((edges[:, 0], edges[:, 1]))
+    order = np.argsort(sources, kind='stable')
+    offsets = np.searchsorted(sources[order], np.arange(number_of_vertices + 1))
+    targets = np.concatenate((edges[:, 1], edges[:, 0]))[order].tolist()
+    edge_ids = (order % number_of_edges).tolist()
+
+    degrees = np.diff(offsets)
+    starts = np.concatenate((np.flatnonzero(degrees % 2 == 1), np.flatnonzero(degrees % 2 == 0))).tolist()
+
+    cursors = offsets[:-1].tolist()
+    ends = offsets[1:].tolist()
+    used = [False] * number_of_edges
+    strips = []
+
+    for start in starts:
+        while True:
+            strip = [start]
+            vertex = start
+            while True:
+                cursor = cursors[vertex]
+                while cursor < ends[vertex] and used[edge_ids[cursor]]:
+                    cursor += 1
+                cursors[vertex] = cursor
+                if cursor == ends[vertex]:
+                    break
+                used[edge_ids[cursor]] = True
+                vertex = targets[cursor]
+                strip.append(vertex)
+
+            if len(strip) == 1:
+                break
+            strips.append(np.array(strip))
+
+    return strips
+
+
+def _pad_faces(indices: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """
+    Turn the concatenated vertex indices of polygons into a face array, padding smaller polygons with their last vertex.
+    :param indices: n-numpy-array of the vertex indices of all polygons, one polygon after the other.
+    :param counts: f-numpy-array of the number of vertices of each polygon.
+    :return: f x k numpy array of face indices, where k is the largest polygon size.
+    """
+    if counts.shape[0] == 0:
+        return np.empty((0, 3), dtype=np.int64)
+
+    ends = np.cumsum(counts)
+    columns = np.arange(counts.max())
+    positions = np.minimum(ends[:, None] - counts[:, None] + columns, ends[:, None] - 1)
+
+    return indices[positions]
+
+
+def _lines(data: bytes) -> np.ndarray:
+    """
+    Return the non-empty lines of a text, without '#' comments and surrounding whitespace, and with tabs turned into
+    spaces, as a numpy array of byte strings.
+    """
+    lines = np.char.strip(np.array(re.sub(rb'#[^\r\n]*', b'', data).replace(b'\t', b' ').splitlines(), dtype=bytes))
+    return lines[np.char.str_len(lines) > 0]
+
+
+def _parse_lines(lines: np.ndarray,
+                 keyword: bool = False,
+                 drop: Optional[bytes] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Parse the whitespace separated numbers of lines. The lines are joined into a single text, each starting with a
+    'nan' marker, which numpy parses at once, and the markers tell the lines apart afterwards.
+    :param lines: numpy array of byte strings.
+    :param keyword: whether each line starts with a keyword, e.g. b'v', which is not parsed.
+    :param drop: optional regular expression of the parts of the lines that are not parsed either.
+    :return: numpy array of the numbers of all lines, one line after the other, and numpy array of the number of
+    numbers on each line.
+    """
+    if lines.shape[0] == 0:
+        return np.empty(0), np.empty(0, dtype=np.int64)
+
+    numbers = np.char.partition(lines, b' ')[:, 2] if keyword else lines
+    text = b' '.join(np.char.add(b'nan ', numbers))
+    if drop is not None:
+        text = re.sub(drop, b'', text)
+
+    try:
+        values = np.fromstring(text, sep=' ')
+    except ValueError:
+        values = np.empty(0)
+    starts = np.flatnonzero(np.isnan(values))
+
+    if starts.shape[0] != lines.shape[0]:
+        # Only once the text failed to parse are the lines parsed one at a time, to tell which one is malformed.
+        for line, line_numbers in zip(lines.tolist(), numbers.tolist()):
+            try:
+                line_values = np.fromstring(line_numbers if drop is None else re.sub(drop, b'', line_numbers), sep=' ')
+            except ValueError:
+                line_values = np.array([np.nan])
+            if np.isnan(line_values).any():
+                raise ValueError('malformed line: {!r}'.format(line.decode(errors='replace')))
+
+    counts = np.diff(np.append(starts, values.shape[0])) - 1
+
+    return np.delete(values, starts), counts
+
+
+def load_obj(path: str, dtype: Optional[DTypeLike] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Load the vertices and polygons of a Wavefront OBJ file. Texture coordinates, normals, groups and materials are
+    ignored. Lines are split and parsed with whole-array numpy operations rather than one at a time.
+    :param path: path of the OBJ file.
+    :param dtype: floating point type of the vertices. Defaults to config.get_dtype().
+    :return: v x 3 numpy array of vertices, and f x k numpy array of face indices. Polygons with fewer than k vertices
+    are padded with their last vertex.
+    """
+    dtype = config.get_dtype() if dtype is None else np.dtype(dtype)
+    assert dtype in FLOAT_DTYPES
+
+    with open(path, 'rb') as file:
+        lines = _lines(file.read())
+
+    is_vertex = np.char.startswith(lines, b'v ')
+    is_face = np.char.startswith(lines, b'f ')
+
+    # Vertices may have colors after their coordinates, so only the first three numbers of a line are kept.
+    values, counts = _parse_lines(lines[is_vertex], keyword=True)
+    if np.any(counts < 3):
+        raise ValueError('vertex with fewer than 3 coordinates: {!r}'.format(
+            lines[is_vertex][np.argmax(counts < 3)].decode(errors='replace')))
+    vertices = values[(np.cumsum(counts) - counts)[:, None] + np.arange(3)].astype(dtype)
+
+    # Only vertex indices are kept, not those of texture coordinates and normals after slashes.
+    values, counts = _parse_lines(lines[is_face], keyword=True, drop=rb'/\S*')
+    indices = values.astype(np.int64)
+
+    # Negative indices count back from the last vertex defined before the face.
+    defined = np.repeat(np.cumsum(is_vertex)[is_face], counts)
+    indices = np.where(indices < 0, indices + defined, indices - 1)
+
+    return vertices, _pad_faces(indices, counts)
+
+
+def _ply_header(file) -> Tuple[str, List[Tuple[bytes, int, List[Tuple]]]]:
+    """
+    Read the header of a PLY file.
+    :param file: PLY file opened in binary mode. It is left at the start of the body.
+    :return: format of the body, and list of (name, count, properties) of its elements, where properties are
+    (name, type) for scalar properties and (name, count type, item type) for list properties.
+    """
+    assert file.readline().strip() == b'ply'
+
+    file_format = None
+    elements = []
+    while True:
+        words = file.readline().split()
+        if not words or words[0] in (b'comment', b'obj_info'):
+            continue
+        if words[0] == b'end_header':
+            return file_format, elements
+        if words[0] == b'format':
+            file_format = words[1].decode()
+        elif words[0] == b'element':
+            elements.append((words[1], int(words[2]), []))
+        elif words[0] == b'property' and words[1] == b'list':
+            elements[-1][2].append((words[4], PLY_TYPES[words[2]], PLY_TYPES[words[3]]))
+        elif words[0] == b'property':
+            elements[-1][2].append((words[2], PLY_TYPES[words[1]]))
+
+
+def _ply_indices_property(properties: List[Tuple]) -> bytes:
+    """Return the name of the list property of a PLY face element that holds its vertex indices."""
+    lists = [p[0] for p in properties if len(p) == 3]
+    assert lists
+    names = [name for name in lists if name in (b'vertex_indices', b'vertex_index')]
+
+    return names[0] if names else lists[0]
+
+
+def _list_items(starts: np.ndarray, counts: np.ndarray, step: int) -> np.ndarray:
+    """
+    Return the positions of the items of lists, one list after the other.
+    :param starts: n-numpy-array of the positions of the lists' first items.
+    :param counts: n-numpy-array of the number of items of each list.
+    :param step: distance between consecutive items of a list.
+    :return: numpy array of counts.sum() positions.
+    """
+    firsts = np.cumsum(counts) - counts
+
+    return np.repeat(starts - firsts * step, counts) + np.arange(int(counts.sum())) * step
+
+
+def _read_at(data: np.ndarray, positions: np.ndarray, value_type: np.dtype) -> np.ndarray:
+    """
+    Return the values of a type stored at byte positions of a buffer, which need not be aligned. Positions past the
+    end of the buffer are read at its end.
+    :param data: numpy array of bytes, with at least value_type.itemsize of them.
+    :param positions: numpy array of byte positions.
+    :param value_type: numpy type of the values.
+    :return: numpy array of the values, of the shape of positions.
+    """
+    positions = np.clip(positions, 0, data.shape[0] - value_type.itemsize)
+
+    # One byte of every value at a time, so no index array of all the bytes is built.
+    values = np.empty(positions.shape + (value_type.itemsize,), dtype=np.uint8)
+    for i in range(value_type.itemsize):
+        values[..., i] = data[positions + i]
+
+    return values.view(value_type)[..., 0]
+
+
+def _ply_record_layout(data: np.ndarray,
+                       starts: np.ndarray,
+                       properties: List[Tuple],
+                       order: str) -> Tuple[dict, np.ndarray]:
+    """
+    Walk binary PLY records with list properties, whose sizes vary with the counts of their lists, all at once.
+    :param data: numpy array of the bytes of the body.
+    :param starts: numpy array of the byte positions of the records.
+    :param properties: properties of the records, see _ply_header.
+    :param order: byte order of the body, '<' or '>'.
+    :return: dictionary from property names to (positions, counts, type), where positions are those of the values of
+    scalar properties and of the first items of list properties, and counts are None for scalar properties, and
+    numpy array of the byte positions where the records end.
+    """
+    position = starts
+    fields = {}
+    for p in properties:
+        if len(p) == 2:
+            fields[p[0]] = (position, None, np.dtype(order + p[1]))
+            position = position + fields[p[0]][2].itemsize
+        else:
+            count_type, item_type = np.dtype(order + p[1]), np.dtype(order + p[2])
+            counts = _read_at(data, position, count_type).astype(np.int64)
+            position = position + count_type.itemsize
+            fields[p[0]] = (position, counts, item_type)
+            position = position + counts * item_type.itemsize
+
+    return fields, position
+
+
+def _ply_record_starts(data: np.ndarray,
+                       size: int,
+                       offset: int,
+                       count: int,
+                       properties: List[Tuple],
+                       order: str) -> np.ndarray:
+    """
+    Find the byte positions of binary PLY records with list properties. Each record starts where the previous one ends,
+    so the records are walked one after the other by kernels.ply_record_starts on the numba backend. On the numpy
+    backend, the body is taken in chunks of PLY_CHUNK bytes. The end of a record is computed as if one started at every
+    byte of a chunk, and the chain from the chunk's first record is followed by pointer jumping, doubling its known
+    length with each whole-array pass.
+    :param data: numpy array of the bytes of the body, followed by padding.
+    :param size: number of bytes of the body, without the padding.
+    :param offset: byte position of the first record.
+    :param count: number of records.
+    :param properties: properties of the records, see _ply_header.
+    :param order: byte order of the body, '<' or '>'.
+    :return: count-numpy-array of the byte positions of the records.
+    """
+    # Records whose lists all have the sizes of the first one's are fixed-size and need no walk. If every record
+    # read that way ends where the next one starts, they are where they were assumed to be.
+    record_size = int(_ply_record_layout(data, np.array([offset]), properties, order)[1][0]) - offset
+    starts = offset + np.arange(count) * record_size
+    if offset + count * record_size <= size and np.all(_ply_record_layout(data, starts, properties, order)[1]
+                                                       == starts + record_size):
+        return starts
+
+    if k.BACKEND == "numba":
+        count_sizes = np.array([np.dtype(p[1]).itemsize if len(p) == 3 else 0 for p in properties])
+        item_sizes = np.array([np.dtype(p[-1]).itemsize for p in properties])
+        return k.ply_record_starts(data[:size], offset, count, count_sizes, item_sizes, order == '>')
+
+    chunks = []
+    found = 0
+    while found < count:
+        assert offset < size, "the records run past the end of the body"
+
+        # Positions relative to offset, those past the chunk all mapped to its end.
+        candidates = np.arange(offset, min(offset + PLY_CHUNK, size))
+        ends = _ply_record_layout(data, candidates, properties, order)[1]
+        jumps = np.minimum(np.maximum(ends, candidates + 1) - offset, candidates.shape[0])
+        jumps = np.append(jumps, candidates.shape[0])
+
+        reached = np.zeros(jumps.shape[0], dtype=bool)
+        reached[0] = True
+        length = 1
+        while length < min(count - found, candidates.shape[0]):
+            reached[jumps[reached]] = True
+            jumps = jumps[jumps]
+            length *= 2
+
+        chain = np.flatnonzero(reached[:-1])[:count - found]
+        chunks.append(candidates[chain])
+        found += chain.shape[0]
+        offset = int(ends[chain[-1]])
+
+    return np.concatenate(chunks)
+
+
+def load_ply(path: str, dtype: Optional[DTypeLike] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Load the vertices and polygons of an ASCII or binary PLY file. Elements other than vertices and faces, and
+    properties other than the coordinates and vertex indices, are skipped.
+    :param path: path of the PLY file.
+    :param dtype: floating point type of the vertices. Defaults to config.get_dtype().
+    :return: v x 3 numpy array of vertices, and f x k numpy array of face indices. Polygons with fewer than k vertices
+    are padded with their last vertex.
+    """
+    dtype = config.get_dtype() if dtype is None else np.dtype(dtype)
+    assert dtype in FLOAT_DTYPES
+
+    with open(path, 'rb') as file:
+        file_format, elements = _ply_header(file)
+        body = file.read()
+
+    assert file_format in ('ascii', 'binary_little_endian', 'binary_big_endian')
+
+    vertices = np.empty((0, 3), dtype=dtype)
+    faces = np.empty((0, 3), dtype=np.int64)
+
+    if file_format == 'ascii':
+        lines = _lines(body)
+        start = 0
+        for name, count, properties in elements:
+            element_lines = lines[start:start + count]
+            start += count
+
+            if name == b'vertex':
+                columns = [i for i, p in enumerate(properties) if p[0] in (b'x', b'y', b'z')]
+                values = np.fromstring(b' '.join(element_lines), sep=' ')
+                vertices = values.reshape(count, -1)[:, columns].astype(dtype)
+            elif name == b'face':
+                indices_property = _ply_indices_property(properties)
+                values, counts = _parse_lines(element_lines)
+                # Properties are walked on all lines at once. A list is its number of items, then the items.
+                position = np.cumsum(counts) - counts
+                for p in properties:
+                    if len(p) == 2:
+                        position = position + 1
+                        continue
+                    sizes = values[position].astype(np.int64)
+                    if p[0] == indices_property:
+                        faces = _pad_faces(values[_list_items(position + 1, sizes, 1)].astype(np.int64), sizes)
+                    position = position + 1 + sizes
+
+        return vertices, faces
+
+    order = '<' if file_format == 'binary_little_endian' else '>'
+    # Padded so that values are read at any position of the body, see _read_at.
+    data = np.frombuffer(body + bytes(8), dtype=np.uint8)
+    offset = 0
+    for name, count, properties in elements:
+        if any(len(p) == 3 for p in properties):
+            if count == 0:
+                continue
+            starts = _ply_record_starts(data, len(body), offset, count, properties, order)
+            fields, ends = _ply_record_layout(data, starts, properties, order)
+            offset = int(ends[-1])
+            assert offset <= len(body)
+
+            if name == b'vertex':
+                vertices = np.column_stack([_read_at(data, fields[axis][0], fields[axis][2])
+                                            for axis in (b'x', b'y', b'z')]).astype(dtype)
+            elif name == b'face':
+                positions, counts, item_type = fields[_ply_indices_property(properties)]
+                indices = _read_at(data, _list_items(positions, counts, item_type.itemsize), item_type)
+                faces = _pad_faces(indices.astype(np.int64), counts)
+            continue
+
+        record = np.dtype([(p[0].decode(), order + p[1]) for p in properties])
+        records = np.frombuffer(body, record, count, offset)
+        offset += count * record.itemsize
+        if name == b'vertex':
+            vertices = np.column_stack((records['x'], records['y'], records['z'])).astype(dtype)
+
+    return vertices, faces
+
+
+def load_mesh(path: str, dtype: Optional[DTypeLike] = None, cache: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Load the vertices and polygons of an OBJ or PLY file. With 'cache', they are also saved as .npy files next to the
+    file, and later loads memory-map those instead of parsing the file again, as long as they are newer than it.
+    :param path: path of a .obj or .ply file.
+    :param dtype: floating point type of the vertices. Defaults to config.get_dtype().
+    :param cache: whether to use and write the .npy cache.
+    :return: v x 3 numpy array of vertices, and f x k numpy array of face indices, see load_obj and load_ply. They are
+    read-only memory maps if they come from the cache.
+    """
+    dtype = config.get_dtype() if dtype is None else np.dtype(dtype)
+    extension = os.path.splitext(path)[1].lower()
+    assert extension in ('.obj', '.ply')
+
+    vertices_path = '{}.{}.vertices.npy'.format(path, dtype.name)
+    faces_path = '{}.faces.npy'.format(path)
+
+    if cache and all(os.path.exists(p) and os.path.getmtime(p) >= os.path.getmtime(path)
+                     for p in (vertices_path, faces_path)):
+        return np.load(vertices_path, mmap_mode='r'), np.load(faces_path, mmap_mode='r')
+
+    vertices, faces = (load_obj if extension == '.obj' else load_ply)(path, dtype)
+
+    if cache:
+        # Write to a temporary file first, so an interrupted save never leaves a truncated cache behind. A directory
+        # that cannot be written to, e.g. a read-only one, only costs the cache.
+        try:
+            for array, array_path in ((vertices, vertices_path), (faces, faces_path)):
+                with open(array_path + '.tmp', 'wb') as file:
+                    np.save(file, array)
+                os.replace(array_path + '.tmp', array_path)
+        except OSError:
+            pass
+
+    return vertices, faces
+
+
+def fit_to_box(vertices: np.ndarray, half_size: float) -> np.ndarray:
+    """
+    Center vertices on the origin and scale them to fit a cube, e.g. to draw a loaded mesh at a known size.
+    :param vertices: v x 3 numpy array of vertices.
+    :param half_size: half of the side of the cube.
+    :return: v x 3 numpy array of the centered and scaled vertices, whose bounding box has a largest half side of
+    'half_size'.
+    """
+    assert len(vertices.shape) == 2 and vertices.shape[1] == 3 and 0 < vertices.shape[0]
+
+    low, high = vertices.min(axis=0), vertices.max(axis=0)
+    extent = (high - low).max() / 2
+
+    return ((vertices - (low + high) / 2) * (half_size / extent if extent > 0 else 1)).astype(vertices.dtype)
@@ -1,6 +1,8 @@
 import numpy as np
-from typing import Union
-from numpy.linalg import norm
+from typing import Optional, Union
+
+from src.config import FLOAT_DTYPES
+from src.validation import validated
 
 
 def normalize(vectors: np.ndarray) -> np.ndarray:
@@ -18,56 +20,116 @@ def normalize(vectors: np.ndarray) -> np.ndarray:
     return vectors
 
 
+def _check_quaternion_multiplication(q: np.ndarray,
+                                    p: np.ndarray,
+                                    out: Optional[np.ndarray] = None) -> None:
+    assert q.dtype in FLOAT_DTYPES and p.dtype == q.dtype
+    assert q.shape[-1] == 4 and p.shape[-1] == 4
+    if out is not None:
+        assert out.dtype == q.dtype
+        assert out.shape == np.broadcast_shapes(q.shape, p.shape)
+        assert not np.may_share_memory(out, q) and not np.may_share_memory(out, p)
+
+
+@validated(_check_quaternion_multiplication)
 def quaternion_multiplication(q: np.ndarray,
-                              p: np.ndarray) -> np.ndarray:
+                              p: np.ndarray,
+                              out: Optional[np.ndarray] = None) -> np.ndarray:
     """
-    Multiply two quaternions
-    :param q: 4-numpy-array representing a quaternion.
-    :param p: 4-numpy-array representing a quaternion.
-    :return: 4-numpy-array representing the product.
+    Multiply quaternions, i.e. compute the Hamilton product q * p. Leading dimensions broadcast against each other, so
+    a single call composes any number of quaternion pairs.
+    :param q: ... x 4 numpy array of quaternions.
+    :param p: ... x 4 numpy array of quaternions.
+    :param out: optional ... x 4 numpy array where the product is stored. It must not share memory with q or p.
+    :return: ... x 4 numpy array of the products, i.e. 'out' if it is given.
     """
-    assert q.dtype == np.float64 and p.dtype == np.float64
-    assert q.shape == (4,) and p.shape == (4,)
+    if out is None:
+        out = np.empty(np.broadcast_shapes(q.shape, p.shape), dtype=q.dtype)
 
-    result = np.empty(4)
-    result[0] = q[0] * p[0] - np.dot(q[1:], p[1:])
-    result[1:] = q[0] * p[1:] + p[0] * q[1:] + np.cross(q[1:], p[1:])
+    q0, q1, q2, q3 = q[..., 0], q[..., 1], q[..., 2], q[..., 3]
+    p0, p1, p2, p3 = p[..., 0], p[..., 1], p[..., 2], p[..., 3]
 
-    return result
+    out[..., 0] = q0 * p0 - q1 * p1 - q2 * p2 - q3 * p3
+    out[..., 1] = q0 * p1 + q1 * p0 + q2 * p3 - q3 * p2
+    out[..., 2] = q0 * p2 - q1 * p3 + q2 * p0 + q3 * p1
+    out[..., 3] = q0 * p3 + q1 * p2 - q2 * p1 + q3 * p0
+
+    return out
+
+
+def _check_quaternions(q: np.ndarray, *args, **kwargs) -> None:
+    assert q.dtype in FLOAT_DTYPES
+    assert q.shape[-1] == 4
 
 
+@validated(_check_quaternions)
 def quaternion_inverse(q: np.ndarray) -> np.ndarray:
     """
-    Return the multiplication inverse of a quaternion.
-    :param q: 4-numpy-array representing a quaternion.
-    :return: 4-numpy-array representing the multiplicative inverse of q.
+    Return the multiplication inverse of quaternions.
+    :param q: ... x 4 numpy array of quaternions.
+    :return: ... x 4 numpy array of the multiplicative inverses of q.
+    """
+    result = q / (np.linalg.norm(q, axis=-1) ** 2)[..., None]
+    result[..., 1:] *= -1
+
+    return result
+
+
+@validated(_check_quaternions)
+def quaternion_log(q: np.ndarray) -> np.ndarray:
+    """
+    Return the logarithm of unit quaternions.
+    :param q: ... x 4 numpy array of unit quaternions.
+    :return: ... x 4 numpy array of pure quaternions, i.e. with zero scalar part.
     """
-    assert q.dtype == np.float64
-    assert q.shape == (4,)
+    vector_norms = np.linalg.norm(q[..., 1:], axis=-1)
+    angles = np.arctan2(vector_norms, q[..., 0])
+    scales = np.divide(angles, vector_norms, out=np.zeros_like(angles), where=vector_norms != 0)
 
-    result = q / np.linalg.norm(q) ** 2
-    result[1:] *= -1
+    result = np.zeros_like(q)
+    result[..., 1:] = q[..., 1:] * scales[..., None]
 
     return result
 
 
-def rotation_quaternion(angle: Union[float, np.float64, np.ndarray],
-                        axis: np.ndarray) -> np.ndarray:
+@validated(_check_quaternions)
+def quaternion_exp(q: np.ndarray) -> np.ndarray:
     """
-    Return the quaternion representation of an angle-axis rotation.
-    :param angle: radian angle to rotate
-    :param axis: 3-numpy-array of axis (that crosses the origin) about which to rotate.
-    :return: 4-numpy-array quaternion representation of the rotation about the axis by the angle.
+    Return the exponential of pure quaternions.
+    :param q: ... x 4 numpy array of pure quaternions, i.e. with zero scalar part.
+    :return: ... x 4 numpy array of unit quaternions.
     """
-    assert axis.dtype == np.float64
+    angles = np.linalg.norm(q[..., 1:], axis=-1)
+    scales = np.divide(np.sin(angles), angles, out=np.ones_like(angles), where=angles != 0)
+
+    result = np.empty_like(q)
+    result[..., 0] = np.cos(angles)
+    result[..., 1:] = q[..., 1:] * scales[..., None]
+
+    return result
+
+
+def _check_rotation_quaternion(angle: Union[float, np.floating, np.ndarray],
+                               axis: np.ndarray) -> None:
+    assert axis.dtype in FLOAT_DTYPES
     if len(axis.shape) == 1:
-        assert type(angle) == float or type(angle) == np.float64
+        assert type(angle) == float or type(angle) == np.float64 or type(angle) == np.float32
     elif len(axis.shape) == 2:
         assert type(angle) == float or (len(angle.shape) == 1
                                         and angle.shape[0] == axis.shape[0])
     else:
         assert False
 
+
+@validated(_check_rotation_quaternion)
+def rotation_quaternion(angle: Union[float, np.floating, np.ndarray],
+                        axis: np.ndarray) -> np.ndarray:
+    """
+    Return the quaternion representation of an angle-axis rotation.
+    :param angle: radian angle to rotate
+    :param axis: 3-numpy-array of axis (that crosses the origin) about which to rotate.
+    :return: 4-numpy-array quaternion representation of the rotation about the axis by the angle.
+    """
     axis = normalize(axis)
 
     result = np.insert(axis, 0, np.cos(angle / 2), axis=-1)
@@ -76,53 +138,103 @@ def rotation_quaternion(angle: Union[float, np.float64, np.ndarray],
     return result
 
 
+def _check_vector_to_quaternion(v: np.ndarray) -> None:
+    assert v.dtype in FLOAT_DTYPES
+    assert v.shape[-1] == 3
+
+
+@validated(_check_vector_to_quaternion)
 def vector_to_quaternion(v: np.ndarray) -> np.ndarray:
     """
     Return the quaternion representation of a 3D vector.
-    :param v: 3-numpy-array representing a vector.
-    :return: quaternion representation of v.
+    :param v: ... x 3 numpy array representing vectors.
+    :return: ... x 4 numpy array of quaternion representations of v.
     """
-    assert v.dtype == np.float64
-    assert len(v.shape) <= 2 and v.shape[-1] == 3
+    result = np.empty(v.shape[:-1] + (4,), dtype=v.dtype)
+    result[..., 0] = 0.
+    result[..., 1:] = v
 
-    return np.insert(v, 0, 0.0, axis=-1)
+    return result
+
+
+def _check_quaternion_to_vector(q: np.ndarray) -> None:
+    assert q.dtype in FLOAT_DTYPES
+    assert np.all(q[..., 0] == 0.)
 
 
+@validated(_check_quaternion_to_vector)
 def quaternion_to_vector(q: np.ndarray) -> np.ndarray:
     """
     Return the vector representations of given quaternions, if the representations exist.
     :param q: q x 4 numpy array of quaternions
     :return: q x 3 numpy array of vector representations
     """
-    assert q.dtype == np.float64
-    assert np.all(q[..., 0] == 0.)
-
     return q[..., 1:].copy()
 
 
+@validated(_check_quaternions)
+def rotation_matrix(q: np.ndarray,
+                    assume_unit: bool = False) -> np.ndarray:
+    """
+    Return the matrices of the rotations quaternions represent, i.e. the matrices R such that v @ R is the vector part
+    of q * v * q_inverse for row vectors v.
+    :param q: ... x 4 numpy array of quaternions.
+    :param assume_unit: if True, q must be unit quaternions, and the matrices are built from products of their
+    components only, without computing their norms.
+    :return: ... x 3 x 3 numpy array of rotation matrices.
+    """
+    w, x, y, z = q[..., 0], q[..., 1], q[..., 2], q[..., 3]
+    result = np.empty(q.shape[:-1] + (3, 3), dtype=q.dtype)
+
+    if assume_unit:
+        xx, yy, zz = x * x, y * y, z * z
+        result[..., 0, 0] = 1 - 2 * (yy + zz)
+        result[..., 1, 1] = 1 - 2 * (xx + zz)
+        result[..., 2, 2] = 1 - 2 * (xx + yy)
+    else:
+        squares = q * q
+        ww, xx, yy, zz = squares[..., 0], squares[..., 1], squares[..., 2], squares[..., 3]
+        result[..., 0, 0] = ww + xx - yy - zz
+        result[..., 1, 1] = ww - xx + yy - zz
+        result[..., 2, 2] = ww - xx - yy + zz
+
+    result[..., 0, 1] = 2 * (x * y + w * z)
+    result[..., 0, 2] = 2 * (x * z - w * y)
+    result[..., 1, 0] = 2 * (x * y - w * z)
+    result[..., 1, 2] = 2 * (y * z + w * x)
+    result[..., 2, 0] = 2 * (x * z + w * y)
+    result[..., 2, 1] = 2 * (y * z - w * x)
+
+    if not assume_unit:
+        result /= squares.sum(axis=-1)[..., None, None]
+
+    return result
+
+
+def _check_qvq_inverse(q: np.ndarray,
+                      v: np.ndarray,
+                      assume_unit: bool = False) -> None:
+    assert q.dtype in FLOAT_DTYPES and v.dtype == q.dtype
+    assert len(q.shape) <= 2 and q.shape[-1] == 4 and v.shape[-1] == 4
+    assert len(v.shape) <= 2 or (len(v.shape) == 3 and len(q.shape) == 2 and v.shape[0] == q.shape[0])
+
+
+@validated(_check_qvq_inverse)
 def qvq_inverse(q: np.ndarray,
-                v: np.ndarray) -> np.ndarray:
+                v: np.ndarray,
+                assume_unit: bool = False) -> np.ndarray:
     """
     Compute the chained quaternion multiplication, q * v * q_inverse.
-    :param q: 4-numpy-array representing a quaternion.
-    :param v: v x 4 numpy array of quaternions.
-    :return: v x 4 numpy array of resulting quaternions.
-    """
-    # assert v.dtype == np.float64 and axis.dtype == np.float64
-    # assert v.shape == (3,) and axis.shape == (3,)
-    #
-    # rotation = rotation_quaternion(angle, axis)
-    # return quaternion_multiplication(quaternion_multiplication(rotation,
-    #                                                            vector_to_quaternion(v)),
-    #                                  quaternion_inverse(rotation))[1:]
-    assert v.dtype == np.float64 and q.dtype == np.float64
-    assert q.shape == (4,) and v.shape[-1] == 4
-
-    return v @ (np.array([[norm(q) ** 2, 0, 0, 0],
-                          [0, norm(q[[0, 1]]) ** 2 - norm(q[[2, 3]]) ** 2, 2 * (q[1] * q[2] + q[0] * q[3]),
-                           2 * (q[1] * q[3] - q[0] * q[2])],
-                          [0, 2 * (q[1] * q[2] - q[0] * q[3]), norm(q[[0, 2]]) ** 2 - norm(q[[1, 3]]) ** 2,
-                           2 * (q[2] * q[3] + q[0] * q[1])],
-                          [0, 2 * (q[1] * q[3] + q[0] * q[2]), 2 * (q[2] * q[3] - q[0] * q[1]),
-                           norm(q[[0, 3]]) ** 2 - norm(q[[1, 2]]) ** 2]])
-                / (np.linalg.norm(q) ** 2))
+    :param q: 4-numpy-array representing a quaternion, or k x 4 numpy array of k quaternions.
+    :param v: v x 4 numpy array of quaternions, or k x v x 4 numpy array of k sets of quaternions.
+    :param assume_unit: if True, q must be unit quaternions, see rotation_matrix.
+    :return: v x 4 numpy array of resulting quaternions if 'q' is a single quaternion, otherwise k x v x 4 numpy array
+    where the i-th set is the result of rotating the (i-th set of) 'v' by the i-th quaternion.
+    """
+    vector_part = np.matmul(v[..., 1:], rotation_matrix(q, assume_unit))
+
+    result = np.empty(vector_part.shape[:-1] + (4,), dtype=q.dtype)
+    result[..., 0] = v[..., 0]
+    result[..., 1:] = vector_part
+
+    return result
@@ -0,0 +1,322 @@
+from typing import Tuple, Union
+
+import numpy as np
+import pygame
+
+import src.culling as c
+import src.kernels as k
+from src.camera import Camera
+
+# Color of faces lit head-on, and of the background.
+FACE_COLOR = (90, 140, 220)
+BACKGROUND_COLOR = (255, 255, 255)
+
+# Share of the face color that faces get regardless of the light.
+AMBIENT = 0.25
+
+# Largest number of candidate pixels rasterized at once, which bounds the memory of a pass.
+MAX_PIXELS = 1 << 21
+
+# Side in pixels of the tiles of the depth buffer whose farthest depths tell which triangles are hidden.
+TILE_SIZE = 8
+
+
+def triangulate(faces: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Split faces into fans of triangles around their first vertex. Triangles of padded faces (see mesh.load_obj) that
+    repeat a vertex are dropped.
+    :param faces: f x k numpy array of face indices, k >= 3.
+    :return: t x 3 numpy array of the vertex indices of the triangles, and t-numpy-array of the face of each triangle.
+    """
+    assert len(faces.shape) == 2 and 3 <= faces.shape[1]
+
+    fans = np.stack([np.stack((faces[:, 0], faces[:, j], faces[:, j + 1]), axis=-1)
+                     for j in range(1, faces.shape[1] - 1)], axis=1)
+    triangle_faces = np.repeat(np.arange(faces.shape[0]), faces.shape[1] - 2)
+    triangles = fans.reshape(-1, 3)
+
+    proper = ((triangles[:, 0] != triangles[:, 1])
+              & (triangles[:, 1] != triangles[:, 2])
+              & (triangles[:, 0] != triangles[:, 2]))
+
+    return triangles[proper], triangle_faces[proper]
+
+
+class Rasterizer:
+    """
+    Draws meshes as flat shaded filled faces with correct occlusion. Faces are split into triangles, and every triangle
+    is rasterized at once with numpy: the pixels of the triangles' bounding boxes are tested against their edges, and a
+    depth buffer keeps the nearest triangle of each pixel. The pixels are written straight into the surface through
+    pygame.surfarray, so there is no loop over pixels, nor over triangles. The nearer half of the triangles is drawn
+    first, and triangles of the farther half that lie behind everything drawn around them are skipped. On the numba
+    backend, kernels.fill_triangles walks the triangles one at a time instead.
+    """
+
+    def __init__(self,
+                 faces: np.ndarray,
+                 screen_width: int,
+                 screen_height: int,
+                 color: Tuple[int, int, int] = FACE_COLOR) -> None:
+        """
+        :param faces: f x k numpy array of face indices, k >= 3.
+        :param screen_width: width of the surfaces drawn on.
+        :param screen_height: height of the surfaces drawn on.
+        :param color: RGB color of faces lit head-on.
+        """
+        self.faces = faces
+        self.triangles, self.triangle_faces = triangulate(faces)
+        self.color = np.array(color, dtype=np.float32)
+        # Depth buffer in rows, padded to whole tiles, i.e. pixel (x, y) is depth[y * width + x] where width is the
+        # padded width. Spans run along rows, so their pixels are adjacent. The padding is never drawn on, and never
+        # the farthest depth of a tile.
+        self._columns = -(-screen_width // TILE_SIZE)
+        self._rows = -(-screen_height // TILE_SIZE)
+        self._width = self._columns * TILE_SIZE
+        self.depth = np.full(self._rows * TILE_SIZE * self._width, -np.inf, dtype=np.float32)
+        self._screen_depth = self.depth.reshape(-1, self._width)[:screen_height, :screen_width]
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+
+    def shades(self, vertices: np.ndarray, camera: Camera) -> np.ndarray:
+        """
+        Return the flat shaded colors of the faces, lit from the camera, so faces seen edge-on are the darkest.
+        :param vertices: v x 3 numpy array of vertices in world frame.
+        :param camera: camera the vertices are seen from.
+        :return: f x 3 uint8 numpy array of RGB colors.
+        """
+        first = vertices[self.faces[:, 0]]
+        normals = c.face_normals(vertices, self.faces)
+
+        if camera.projection_method == 0:
+            light = camera.location - first
+        else:
+            # Orthographic projection looks along the z-axis.
+            light = np.broadcast_to(np.array([0., 0., -1.], dtype=vertices.dtype), first.shape)
+
+        # Windings differ between meshes, so the normals' direction is ignored.
+        lengths = np.sqrt(np.einsum('ij,ij->i', normals, normals) * np.einsum('ij,ij->i', light, light))
+        cosines = np.abs(np.einsum('ij,ij->i', normals, light))
+        cosines = np.divide(cosines, lengths, out=np.zeros_like(cosines), where=lengths != 0)
+
+        return ((AMBIENT + (1 - AMBIENT) * cosines)[:, None] * self.color).astype(np.uint8)
+
+    def draw(self,
+             surface: pygame.Surface,
+             vertices: np.ndarray,
+             points: np.ndarray,
+             camera: Camera,
+             visible: Union[np.ndarray, None] = None) -> pygame.Rect:
+        """
+        Fill the background of a surface and draw the faces on it.
+        :param surface: PyGame surface of the screen size, with 24 or 32 bits per pixel.
+        :param vertices: v x 3 numpy array of vertices in world frame.
+        :param points: v x 2 numpy array of the vertices in pygame's coordinate system, see Camera.project.
+        :param camera: camera the vertices are projected with.
+        :param visible: optional boolean f-numpy-array of the faces to draw, e.g. culling.Culler.visible_faces.
+        :return: area of the surface the faces were drawn on.
+        """
+        assert surface.get_size() == (self.screen_width, self.screen_height)
+
+        surface.fill(BACKGROUND_COLOR)
+
+        triangles, triangle_faces = self.triangles, self.triangle_faces
+        if visible is not None:
+            kept = visible[triangle_faces]
+            triangles, triangle_faces = triangles[kept], triangle_faces[kept]
+
+        # Depths are interpolated linearly across the screen, which holds for z under orthographic projection, and
+        # for -1 / w under perspective projection, where w is the distance from the camera along the z-axis.
+        if camera.projection_method == 0:
+            distances = (vertices[:, 2] - camera.location[2]).astype(np.float32)
+            # Triangles reaching behind the camera are dropped rather than clipped.
+            if np.any(distances <= 0):
+                kept = np.all(distances[triangles] > 0, axis=1)
+                triangles, triangle_faces = triangles[kept], triangle_faces[kept]
+            depths = -1 / np.maximum(distances, np.finfo(np.float32).tiny)
+        else:
+            depths = vertices[:, 2].astype(np.float32)
+
+        xs = points[:, 0].astype(np.float32)
+        ys = points[:, 1].astype(np.float32)
+
+        if k.BACKEND == "numba":
+            # The kernel sets each triangle up as it reaches it, and tests each pixel against the depth buffer before
+            # writing it, so hidden triangles cost little.
+            self._screen_depth[:] = np.inf
+            pixels = pygame.surfarray.pixels3d(surface)
+            left, top, right, bottom = k.fill_triangles(pixels, self.depth, self._width, xs, ys, depths, triangles,
+                                                        triangle_faces, self.shades(vertices, camera)).tolist()
+            del pixels
+            if right < left:
+                return pygame.Rect(0, 0, 0, 0)
+
+            return pygame.Rect(left, top, right - left + 1, bottom - top + 1)
+
+        x0, x1, x2 = xs[triangles[:, 0]], xs[triangles[:, 1]], xs[triangles[:, 2]]
+        y0, y1, y2 = ys[triangles[:, 0]], ys[triangles[:, 1]], ys[triangles[:, 2]]
+
+        # Pixels are covered when their centers are, so the rows and columns of the triangles' bounding boxes are those
+        # of the pixel centers within them, clipped to the screen.
+        with np.errstate(invalid='ignore'):
+            bottom = np.minimum(np.floor(np.maximum(np.maximum(y0, y1), y2) - 0.5), self.screen_height - 1)
+            top = np.maximum(np.ceil(np.minimum(np.minimum(y0, y1), y2) - 0.5), 0)
+            right = np.minimum(np.floor(np.maximum(np.maximum(x0, x1), x2) - 0.5), self.screen_width - 1)
+            left = np.maximum(np.ceil(np.minimum(np.minimum(x0, x1), x2) - 0.5), 0)
+            areas = (x1 - x0) * (y2 - y0) - (x2 - x0) * (y1 - y0)
+            kept = (top <= bottom) & (left <= right) & (areas != 0)
+        if not np.any(kept):
+            return pygame.Rect(0, 0, 0, 0)
+
+        top, bottom, left, right = top[kept], bottom[kept], left[kept], right[kept]
+        # Corners relative to the corners of the bounding boxes, which keeps the coefficients below accurate in single
+        # precision far from the screen's origin.
+        x0, x1, x2 = x0[kept] - left, x1[kept] - left, x2[kept] - left
+        y0, y1, y2 = y0[kept] - top, y1[kept] - top, y2[kept] - top
+        areas = areas[kept]
+        top, bottom, left, right = (top.astype(np.int64), bottom.astype(np.int64),
+                                    left.astype(np.int64), right.astype(np.int64))
+        d0, d1, d2 = depths[triangles[kept]].T
+        colors = self.shades(vertices, camera)[triangle_faces[kept]]
+
+        # Barycentric coordinates are affine functions of the pixel coordinates relative to the bounding boxes,
+        # w = a * x + b * y + c, from the edge functions of the sides opposite the corners, divided by the signed area
+        # so either winding is inside where all three are positive. Depths are affine functions too.
+        inverse = 1 / areas
+        a0, b0, c0 = (y1 - y2) * inverse, (x2 - x1) * inverse, (x1 * y2 - x2 * y1) * inverse
+        a1, b1, c1 = (y2 - y0) * inverse, (x0 - x2) * inverse, (x2 * y0 - x0 * y2) * inverse
+        planes = np.stack((a0, b0, c0,
+                           a1, b1, c1,
+                           -a0 - a1, -b0 - b1, 1 - c0 - c1,
+                           a0 * d0 + a1 * d1 - (a0 + a1) * d2,
+                           b0 * d0 + b1 * d1 - (b0 + b1) * d2,
+                           c0 * d0 + c1 * d1 + (1 - c0 - c1) * d2), axis=-1)
+
+        self._screen_depth[:] = np.inf
+        pixels = pygame.surfarray.pixels3d(surface)
+
+        # Depths are nearest at the corners, as they are affine across a triangle.
+        nearest = np.minimum(np.minimum(d0, d1), d2)
+        half = nearest.shape[0] // 2
+        order = np.argpartition(nearest, half) if half > 0 else np.arange(nearest.shape[0])
+
+        for i, selected in enumerate((order[:half], order[half:])):
+            if i == 1:
+                selected = selected[~self._hidden(nearest[selected], top[selected], bottom[selected],
+                                                  left[selected], right[selected])]
+            self._draw_triangles(pixels, planes[selected], colors[selected],
+                                 top[selected], bottom[selected], left[selected], right[selected])
+        del pixels
+
+        return pygame.Rect(int(left.min()), int(top.min()),
+                           int(right.max() - left.min() + 1), int(bottom.max() - top.min() + 1))
+
+    def _hidden(self,
+                nearest: np.ndarray,
+                top: np.ndarray,
+                bottom: np.ndarray,
+                left: np.ndarray,
+                right: np.ndarray) -> np.ndarray:
+        """
+        Return the triangles that lie behind every pixel of the depth buffer in the tiles their bounding boxes touch,
+        which would lose the depth test at all of their pixels. Triangles touching more than two tiles in a direction
+        are kept.
+        :param nearest: t-numpy-array of the nearest depths of the triangles.
+        :param top: t-numpy-array of the first row of pixels of the triangles' bounding boxes.
+        :param bottom: t-numpy-array of their last row.
+        :param left: t-numpy-array of their first column.
+        :param right: t-numpy-array of their last column.
+        :return: boolean t-numpy-array of the hidden triangles.
+        """
+        farthest = (self.depth.reshape(self._rows, TILE_SIZE, self._width).max(axis=1)
+                    .reshape(self._rows, self._columns, TILE_SIZE).max(axis=2))
+
+        first_column, last_column = left // TILE_SIZE, right // TILE_SIZE
+        first_row, last_row = top // TILE_SIZE, bottom // TILE_SIZE
+        behind = np.maximum(np.maximum(farthest[first_row, first_column], farthest[first_row, last_column]),
+                            np.maximum(farthest[last_row, first_column], farthest[last_row, last_column]))
+
+        return (nearest > behind) & (last_column - first_column <= 1) & (last_row - first_row <= 1)
+
+    def _draw_triangles(self,
+                        pixels: np.ndarray,
+                        planes: np.ndarray,
+                        colors: np.ndarray,
+                        top: np.ndarray,
+                        bottom: np.ndarray,
+                        left: np.ndarray,
+                        right: np.ndarray) -> None:
+        """
+        Rasterize triangles in passes of at most MAX_PIXELS pixels of their bounding boxes, a triangle at least. See
+        _rasterize for the parameters.
+        :return: None
+        """
+        boxes = np.cumsum((bottom - top + 1) * (right - left + 1))
+        start = 0
+        while start < boxes.shape[0]:
+            done = boxes[start - 1] if start > 0 else 0
+            end = max(start + 1, int(np.searchsorted(boxes, done + MAX_PIXELS, side='right')))
+            self._rasterize(pixels, planes[start:end], colors[start:end],
+                            top[start:end], bottom[start:end], left[start:end], right[start:end])
+            start = end
+
+    def _rasterize(self,
+                   pixels: np.ndarray,
+                   planes: np.ndarray,
+                   colors: np.ndarray,
+                   top: np.ndarray,
+                   bottom: np.ndarray,
+                   left: np.ndarray,
+                   right: np.ndarray) -> None:
+        """
+        Rasterize triangles into the pixels of a surface, through the depth buffer. Each row of a triangle's bounding
+        box is cut to the span of pixel centers inside the triangle, so only covered pixels are generated.
+        :param pixels: width x height x 3 numpy array of the surface's pixels, see pygame.surfarray.pixels3d.
+        :param planes: t x 12 numpy array of the coefficients (a, b, c) of the three barycentric coordinates and of the
+        depth of the triangles, as affine functions a * x + b * y + c of the pixel coordinates relative to 'left' and
+        'top'.
+        :param colors: t x 3 numpy array of the RGB colors of the triangles.
+        :param top: t-numpy-array of the first row of pixels of the triangles' bounding boxes.
+        :param bottom: t-numpy-array of their last row.
+        :param left: t-numpy-array of their first column.
+        :param right: t-numpy-array of their last column.
+        :return: None
+        """
+        rows = bottom - top + 1
+        triangle = np.repeat(np.arange(rows.shape[0]), rows)
+        row = np.arange(triangle.shape[0]) - np.repeat(np.cumsum(rows) - rows, rows)
+        y = top[triangle] + row
+        plane = planes[triangle]
+        centers = row.astype(np.float32) + np.float32(0.5)
+
+        # Along a row, a barycentric coordinate a * x + k is positive right of -k / a if a > 0, left of it if a < 0, and
+        # everywhere or nowhere if a = 0.
+        low = np.full(triangle.shape[0], 0.5, dtype=np.float32)
+        high = (right - left)[triangle].astype(np.float32) + np.float32(0.5)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for j in range(0, 9, 3):
+                a = plane[:, j]
+                k = plane[:, j + 1] * centers + plane[:, j + 2]
+                bound = -k / a
+                low = np.where(a > 0, np.maximum(low, bound), low)
+                high = np.where(a < 0, np.minimum(high, bound), high)
+                high = np.where((a == 0) & (k < 0), -np.inf, high)
+
+            first = np.ceil(low - np.float32(0.5))
+            lengths = np.floor(high - np.float32(0.5)) - first + 1
+            lengths = np.where(lengths > 0, lengths, 0).astype(np.int64)
+
+        # Depths of the first pixel of each span, and their step from one pixel to the next.
+        steps = plane[:, 9]
+        starts = steps * (first + np.float32(0.5)) + plane[:, 10] * centers + plane[:, 11]
+
+        span = np.repeat(np.arange(lengths.shape[0]), lengths)
+        offsets = np.arange(span.shape[0]) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        x = (first.astype(np.int64) + left[triangle])[span] + offsets
+        y = y[span]
+        depth = (starts[span] + steps[span] * offsets).astype(np.float32)
+
+        # The depth buffer keeps the nearest depth of every pixel, and the pixels that have it are drawn.
+        pixel = y * self._width + x
+        np.minimum.at(self.depth, pixel, depth)
+        nearest = depth <= self.depth[pixel]
+        pixels[x[nearest], y[nearest]] = colors[triangle[span[nearest]]]
@@ -0,0 +1,181 @@
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+from numpy.typing import DTypeLike
+
+import src.config as config
+from src.config import FLOAT_DTYPES
+from src.track import AnimationTrack
+
+# First bytes of a track file: a magic number, the format version, the type code of the poses and padding.
+MAGIC = b'QTRK'
+VERSION = 1
+HEADER_SIZE = 8
+
+
+def record_dtype(dtype: DTypeLike) -> np.dtype:
+    """
+    Return the layout of a track file record: a float64 timestamp followed by an orientation and a center of type
+    'dtype', all little-endian.
+    :param dtype: np.float32 or np.float64.
+    :return: numpy structured type.
+    """
+    dtype = np.dtype(dtype).newbyteorder('<')
+    return np.dtype([('time', '<f8'), ('orientation', dtype, (4,)), ('center', dtype, (3,))])
+
+
+def _read_header(path: str) -> np.dtype:
+    """Return the type of the poses of a track file, checking its header."""
+    with open(path, 'rb') as file:
+        header = file.read(HEADER_SIZE)
+
+    assert len(header) == HEADER_SIZE and header[:4] == MAGIC and header[4] == VERSION, "not a track file"
+
+    return np.dtype(chr(header[5]))
+
+
+class TrackRecorder:
+    """
+    Appends timestamped poses of an object to a track file, a header followed by fixed-width records (see
+    record_dtype). Records are buffered and written in blocks. A pose that does not change is written only when its
+    run ends, so an idle object costs two records however long it stays still.
+    """
+
+    def __init__(self, path: str, dtype: Optional[DTypeLike] = None, buffer_size: int = 256) -> None:
+        """
+        :param path: path of the track file. An existing file is appended to, and must hold poses of type 'dtype'.
+        :param dtype: floating point type of the poses. Defaults to config.get_dtype().
+        :param buffer_size: number of records buffered before they are written.
+        """
+        dtype = config.get_dtype() if dtype is None else np.dtype(dtype)
+        assert dtype in FLOAT_DTYPES
+        assert 0 < buffer_size
+
+        self.path = path
+        self._records = np.zeros(buffer_size, dtype=record_dtype(dtype))
+        self._size = 0
+        self._last = None
+        self._held_time = None
+
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            assert _read_header(path) == dtype
+            # Drop a record cut short by a crash, so later records stay aligned.
+            size = os.path.getsize(path)
+            itemsize = self._records.dtype.itemsize
+            with open(path, 'r+b') as file:
+                file.truncate(size - (size - HEADER_SIZE) % itemsize)
+            last = TrackReader(path).records[-1:]
+            if last.shape[0]:
+                self._last = last[0].copy()
+        else:
+            with open(path, 'wb') as file:
+                file.write(MAGIC + bytes((VERSION, ord(dtype.char), 0, 0)))
+
+        self._file = open(path, 'ab')
+
+    def __enter__(self) -> "TrackRecorder":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def record(self, time: float, orientation: np.ndarray, center: np.ndarray) -> None:
+        """
+        Record the pose of the object at a time. Samples not later than the last one are ignored.
+        :param time: time in seconds.
+        :param orientation: 4-numpy-array of the object's orientation in quaternion.
+        :param center: 3-numpy-array of the object's center.
+        :return: None
+        """
+        if self._last is not None:
+            if time <= (self._last['time'] if self._held_time is None else self._held_time):
+                return
+            if (np.array_equal(self._last['orientation'], orientation)
+                    and np.array_equal(self._last['center'], center)):
+                self._held_time = time
+                return
+            if self._held_time is not None:
+                self._append(self._held_time, self._last['orientation'], self._last['center'])
+
+        self._append(time, orientation, center)
+
+    def _append(self, time: float, orientation: np.ndarray, center: np.ndarray) -> None:
+        record = self._records[self._size]
+        record['time'] = time
+        record['orientation'] = orientation
+        record['center'] = center
+        self._last = record.copy()
+        self._held_time = None
+
+        self._size += 1
+        if self._size == self._records.shape[0]:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered records, and the end of an ongoing idle run, to the file."""
+        if self._held_time is not None:
+            held_time = self._held_time
+            self._append(held_time, self._last['orientation'], self._last['center'])
+            # The run may go on, so keep extending it from the record just written.
+            self._held_time = None
+
+        self._file.write(self._records[:self._size].tobytes())
+        self._file.flush()
+        self._size = 0
+
+    def close(self) -> None:
+        """Flush the records and close the file."""
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+
+class TrackReader:
+    """
+    Memory-maps a track file written by TrackRecorder. Poses are interpolated by building an AnimationTrack over only
+    the records around the requested times, so files of any length are played back in constant memory.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        :param path: path of the track file.
+        """
+        dtype = record_dtype(_read_header(path))
+        count = (os.path.getsize(path) - HEADER_SIZE) // dtype.itemsize
+
+        self.records = np.memmap(path, dtype=dtype, mode='r', offset=HEADER_SIZE, shape=(count,)) if count \
+            else np.empty(0, dtype=dtype)
+
+    def __len__(self) -> int:
+        return self.records.shape[0]
+
+    @property
+    def start(self) -> float:
+        return float(self.records['time'][0])
+
+    @property
+    def end(self) -> float:
+        return float(self.records['time'][-1])
+
+    def evaluate(self, sample_times: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Interpolate the recorded poses at sample times, like AnimationTrack.evaluate over the whole file.
+        :param sample_times: m-numpy-array of increasing times. Those outside the recording are clamped to its ends.
+        :return: m x 4 numpy array of orientations, and m x 3 numpy array of centers.
+        """
+        assert 2 <= len(self) and len(sample_times.shape) == 1 and 0 < sample_times.shape[0]
+
+        # The control quaternions and tangents at a keyframe depend on its neighbours, so the records one beyond the
+        # segments of the sample times on either side are included too.
+        times = self.records['time']
+        first = np.searchsorted(times, sample_times[0], side='right') - 2
+        last = np.searchsorted(times, sample_times[-1], side='right') + 2
+        first, last = max(min(first, len(self) - 2), 0), min(max(last, 2), len(self))
+
+        window = self.records[first:last]
+        track = AnimationTrack(np.array(window['time']),
+                               np.array(window['orientation']),
+                               np.array(window['center']))
+
+        return track.evaluate(sample_times)
@@ -0,0 +1,304 @@
+from typing import Optional, Tuple, Union
+
+import numpy as np
+from numpy.typing import DTypeLike
+
+import src.config as config
+import src.kernels as k
+import src.mesh as m
+import src.quaternion as q
+import src.transformations as t
+from src.cache import RotationMatrixCache
+from src.camera import Camera
+from src.config import FLOAT_DTYPES
+
+
+class SceneObject:
+    """
+    An object posed in the world, i.e. its vertices relative to its center, its orientation and its center. World
+    vertices are computed from the pose on demand, and only recomputed once the pose changes.
+    """
+
+    def __init__(self,
+                 reference_vertices: np.ndarray,
+                 orientation: np.ndarray,
+                 center: np.ndarray,
+                 cache: Union[RotationMatrixCache, None] = None) -> None:
+        """
+        :param reference_vertices: v x 3 object vertices with (0, 0, 0) as center. All orientations are relative to
+        them.
+        :param orientation: 4-numpy-array of the object's orientation in quaternion. Kept, not copied, so the pose can
+        be changed by mutating it in place.
+        :param center: 3-numpy-array of the object's center in world frame. Kept, not copied, like 'orientation'.
+        :param cache: cache of rotation matrices to look orientations up in.
+        """
+        assert (reference_vertices.dtype in FLOAT_DTYPES
+                and orientation.dtype == reference_vertices.dtype
+                and center.dtype == reference_vertices.dtype)
+        assert len(reference_vertices.shape) == 2 and reference_vertices.shape[1] == 3
+        assert orientation.shape == (4,) and center.shape == (3,)
+
+        self.reference_vertices = reference_vertices
+        self.orientation = orientation
+        self.center = center
+        self.cache = RotationMatrixCache(max_size=8) if cache is None else cache
+
+        # Allocated by the first world_vertices and project calls, as objects of a Scene use its batched arrays instead.
+        self._world_vertices = None
+        self._points = None
+        self._pose = np.full(7, np.nan, dtype=reference_vertices.dtype)
+
+    def pose_changed(self) -> bool:
+        """Return True if the pose changed since the world vertices were last computed."""
+        return not (np.array_equal(self._pose[:4], self.orientation)
+                    and np.array_equal(self._pose[4:], self.center))
+
+    def world_vertices(self) -> np.ndarray:
+        """
+        Return the object's vertices in world frame.
+        :return: v x 3 numpy array of vertices. It is the object's buffer, so it must not be mutated, and it is
+        overwritten once the pose changes.
+        """
+        if self._world_vertices is None:
+            self._world_vertices = np.empty_like(self.reference_vertices)
+        if self.pose_changed():
+            t.quaternion_rotation(self.orientation, self.reference_vertices, self.cache, out=self._world_vertices)
+            self._world_vertices += self.center
+            self._pose[:4] = self.orientation
+            self._pose[4:] = self.center
+
+        return self._world_vertices
+
+    def project(self, camera: Camera) -> np.ndarray:
+        """
+        Return the object's vertices in pygame's coordinate system. They are rotated, translated and projected in a
+        single pass, see kernels.transform_project, so the world vertices are not computed.
+        :param camera: camera to project the vertices with. It must have the type of the object's vertices.
+        :return: v x 2 numpy array of screen coordinates. It is the object's buffer, overwritten by the next projection.
+        """
+        if self._points is None:
+            self._points = np.empty((self.reference_vertices.shape[0], 2), dtype=self.reference_vertices.dtype)
+
+        return k.transform_project(self.reference_vertices,
+                                   self.cache.get(self.orientation),
+                                   self.center,
+                                   camera.matrix,
+                                   out=self._points)
+
+
+def _grow(buffer: np.ndarray, size: int) -> np.ndarray:
+    """
+    Return a buffer of at least 'size' rows that starts with the rows of another. Its capacity doubles when it is
+    exceeded, so filling a buffer one row at a time copies every row a constant number of times on average.
+    :param buffer: numpy array to grow.
+    :param size: number of rows needed.
+    :return: 'buffer' if it is large enough, else a larger numpy array of its type whose first rows are a copy of it.
+    """
+    if size <= buffer.shape[0]:
+        return buffer
+
+    grown = np.empty((max(size, 2 * buffer.shape[0]),) + buffer.shape[1:], dtype=buffer.dtype)
+    grown[:buffer.shape[0]] = buffer
+
+    return grown
+
+
+class Scene:
+    """
+    Objects posed relative to their parents, i.e. an object's orientation and center are in its parent's frame, and
+    those of root objects are in world frame. World poses are composed down the parent chains and kept until a local
+    pose changes, when only the subtree below the changed object is recomputed. The vertices and edge strips of all
+    objects are batched into single arrays, so the whole scene is projected and drawn in one pass. World vertices are
+    only computed when asked for, as projecting the scene goes from the world poses to the screen in one pass. The
+    arrays grow geometrically as objects are added, so building a scene of n objects takes O(n) time.
+    """
+
+    def __init__(self, dtype: Optional[DTypeLike] = None) -> None:
+        """
+        :param dtype: floating point type of the objects' arrays. Defaults to config.get_dtype().
+        """
+        self.dtype = config.get_dtype() if dtype is None else np.dtype(dtype)
+        assert self.dtype in FLOAT_DTYPES
+
+        self.objects = []
+        self.parents = []
+        self.strips = []
+        self.faces = []
+
+        # Orientations and centers of the objects, in turn, gathered into _poses by a single concatenation.
+        self._pose_arrays = []
+        self._poses = np.empty(0, dtype=self.dtype)
+        self._parents = np.empty(0, dtype=np.int64)
+        self._depths = np.empty(0, dtype=np.int64)
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._local_poses = np.empty((0, 7), dtype=self.dtype)
+        self._world_orientations = np.empty((0, 4), dtype=self.dtype)
+        self._world_centers = np.empty((0, 3), dtype=self.dtype)
+        self._world_matrices = np.empty((0, 3, 3), dtype=self.dtype)
+        self._reference_vertices = np.empty((0, 3), dtype=self.dtype)
+        self._world_vertices = np.empty((0, 3), dtype=self.dtype)
+        self._stale = np.empty(0, dtype=bool)
+        self._points = np.empty((0, 2), dtype=self.dtype)
+
+    def __len__(self) -> int:
+        return len(self.objects)
+
+    @property
+    def offsets(self) -> np.ndarray:
+        """(n + 1)-numpy-array of the objects' first rows in the batched vertices, and the number of vertices last."""
+        return self._offsets[:len(self.objects) + 1]
+
+    def add(self,
+            scene_object: SceneObject,
+            faces: np.ndarray,
+            parent: Optional[int] = None) -> int:
+        """
+        Add an object to the scene.
+        :param scene_object: object whose orientation and center are relative to its parent. They are kept, not
+        copied, so the object is moved by mutating them in place. Its reference vertices are copied into the batched
+        vertices.
+        :param faces: f x k numpy array of the object's face indices.
+        :param parent: index of the parent object, as returned by add, or None for a root object.
+        :return: index of the object.
+        """
+        assert scene_object.reference_vertices.dtype == self.dtype
+        assert parent is None or 0 <= parent < len(self.objects)
+
+        index = len(self.objects)
+        offset = int(self._offsets[index])
+        end = offset + scene_object.reference_vertices.shape[0]
+        self.objects.append(scene_object)
+        self.parents.append(-1 if parent is None else parent)
+        self.strips.extend(strip + offset for strip in m.edge_strips(m.unique_edges(faces)[0]))
+        self.faces.append(faces + offset)
+        self._pose_arrays.extend((scene_object.orientation, scene_object.center))
+
+        self._poses = _grow(self._poses, 7 * (index + 1))
+        self._parents = _grow(self._parents, index + 1)
+        self._depths = _grow(self._depths, index + 1)
+        self._offsets = _grow(self._offsets, index + 2)
+        self._local_poses = _grow(self._local_poses, index + 1)
+        self._world_orientations = _grow(self._world_orientations, index + 1)
+        self._world_centers = _grow(self._world_centers, index + 1)
+        self._world_matrices = _grow(self._world_matrices, index + 1)
+        self._stale = _grow(self._stale, index + 1)
+        self._reference_vertices = _grow(self._reference_vertices, end)
+        self._world_vertices = _grow(self._world_vertices, end)
+        self._points = _grow(self._points, end)
+
+        self._parents[index] = self.parents[-1]
+        self._depths[index] = 0 if parent is None else self._depths[parent] + 1
+        self._offsets[index + 1] = end
+        self._reference_vertices[offset:end] = scene_object.reference_vertices
+        # NaN never equals anything, so the new object counts as moved on the next update.
+        self._local_poses[index] = np.nan
+        self._stale[index] = False
+
+        return index
+
+    def batched_faces(self) -> np.ndarray:
+        """
+        Return the faces of all objects as indices into the batched vertices, see world_vertices. Faces of fewer
+        vertices than the largest are padded with their last vertex, which adds sides from a vertex to itself only.
+        :return: f x k numpy array of face indices.
+        """
+        size = max(faces.shape[1] for faces in self.faces)
+
+        return np.concatenate([np.pad(faces, ((0, 0), (0, size - faces.shape[1])), mode='edge')
+                               for faces in self.faces])
+
+    def update(self) -> np.ndarray:
+        """
+        Recompute the world poses of the objects whose local pose, or that of an ancestor, changed since the last
+        update. Rotation matrices are looked up in each object's cache by its world orientation.
+        :return: boolean numpy array of the objects that moved.
+        """
+        n = len(self.objects)
+        poses = self._poses[:7 * n].reshape(n, 7)
+        if n:
+            np.concatenate(self._pose_arrays, out=self._poses[:7 * n])
+        local_poses = self._local_poses[:n]
+        moved = np.any(poses != local_poses, axis=1)
+        if not moved.any():
+            return moved
+        local_poses[moved] = poses[moved]
+
+        parents, depths = self._parents[:n], self._depths[:n]
+        # A child is one level below its parent, so each level is composed from the world poses of the level above it
+        # in one vectorized step.
+        for depth in range(int(depths.max()) + 1):
+            level = np.flatnonzero(depths == depth)
+            if depth > 0:
+                moved[level] |= moved[parents[level]]
+            level = level[moved[level]]
+            if level.shape[0] == 0:
+                continue
+
+            if depth == 0:
+                self._world_orientations[level] = local_poses[level, :4]
+                self._world_centers[level] = local_poses[level, 4:]
+            else:
+                above = parents[level]
+                self._world_orientations[level] = k.hamilton_product(self._world_orientations[above],
+                                                                     local_poses[level, :4])
+                self._world_centers[level] = (np.matmul(local_poses[level, None, 4:],
+                                                        self._world_matrices[above])[:, 0]
+                                              + self._world_centers[above])
+
+            # The level's matrices are built in one call, and each object's cache keeps them or returns its own.
+            orientations = self._world_orientations[level]
+            matrices = q.rotation_matrix(orientations)
+            self._world_matrices[level] = [self.objects[i].cache.get(orientation, matrix)
+                                           for i, orientation, matrix in zip(level.tolist(), orientations, matrices)]
+
+        self._stale[:n] |= moved
+
+        return moved
+
+    def world_pose(self, index: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return the pose of an object in world frame.
+        :param index: index of the object.
+        :return: 4-numpy-array of the world orientation in quaternion, and 3-numpy-array of the world center.
+        """
+        self.update()
+
+        return self._world_orientations[index].copy(), self._world_centers[index].copy()
+
+    def world_vertices(self) -> np.ndarray:
+        """
+        Return the vertices of all objects in world frame, those of the i-th object being rows offsets[i] to
+        offsets[i + 1].
+        :return: v x 3 numpy array of vertices. It is the scene's buffer, so it must not be mutated.
+        """
+        self.update()
+
+        n = len(self.objects)
+        stale = np.flatnonzero(self._stale[:n])
+        if stale.shape[0]:
+            k.batched_transform(self._reference_vertices, self.offsets, self._world_matrices[:n],
+                                self._world_centers[:n], stale, self._world_vertices)
+            self._stale[:] = False
+
+        return self._world_vertices[:self._offsets[n]]
+
+    def project(self, camera: Camera) -> np.ndarray:
+        """
+        Return the vertices of all objects in pygame's coordinate system. They are rotated, translated and projected
+        in a single pass, see kernels.batched_transform_project, so the world vertices are not computed on the numba
+        backend.
+        :param camera: camera to project the vertices with. It must have the scene's type.
+        :return: v x 2 numpy array of screen coordinates, see Camera.project. It is the scene's buffer, overwritten by
+        the next projection.
+        """
+        self.update()
+
+        n = len(self.objects)
+        end = self._offsets[n]
+        if k.BACKEND == "numpy":
+            # Without numba the kernel loops over the objects, while the world vertices are only recomputed for the
+            # objects that moved, so projecting them is faster.
+            return camera.project(self.world_vertices(), out=self._points[:end])
+
+        return k.batched_transform_project(self._reference_vertices[:end], self.offsets, self._world_matrices[:n],
+                                           self._world_centers[:n], camera.matrix, out=self._points[:end])
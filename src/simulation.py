@@ -1,13 +1,26 @@
 import sys
-from typing import Tuple, Union, Dict, Callable
+import time
+from typing import Tuple, Union, Dict, Callable, List
 
 import pygame
 import numpy as np
 
 import src.coordinates as coc
-import src.transformations as t
 import src.quaternion as q
-import src.interpolation as i
+import src.animation as a
+import src.kernels as k
+import src.mesh as m
+from src.camera import Camera
+from src.scene import Scene, SceneObject
+from src.cache import RotationMatrixCache
+from src.culling import scene_culler
+from src.raster import Rasterizer
+from src.drift import DriftMonitor
+from src.recording import TrackReader, TrackRecorder
+from src.timing import FrameTimer
+import src.config as config
+from src.config import FLOAT_DTYPES
+from src.validation import validated
 
 
 def animate_between_keyframes(screen: pygame.Surface,
@@ -18,7 +31,9 @@ def animate_between_keyframes(screen: pygame.Surface,
                               reference_vertices: np.ndarray,
                               faces: np.ndarray,
                               fps: int = 30,
-                              number_of_frames: int = 100) -> bool:
+                              number_of_frames: int = 100,
+                              timer: Union[FrameTimer, None] = None,
+                              rasterizer: Union[Rasterizer, None] = None) -> bool:
     """
     Interpolate two keyframes and play animation.
     :param screen: PyGame display window.
@@ -32,13 +47,16 @@ def animate_between_keyframes(screen: pygame.Surface,
     :param faces: 2D numpy array of face indices.
     :param fps: number of frames per second of the animation.
     :param number_of_frames: number of frames of the animation.
+    :param timer: timer of the stages of the frames. Not one whose frame is open, as the animation starts its own.
+    :param rasterizer: rasterizer of 'faces' to draw the frames filled with, see render_filled. If None, they are
+    drawn as wireframes.
     :return: True if the animation was successfully created and played. False otherwise.
     """
     assert projection_method == 0 or projection_method == 1
-    assert (orientation_keyframes.dtype == np.float64
-            and center_keyframes.dtype == np.float64
-            and camera_location.dtype == np.float64
-            and reference_vertices.dtype == np.float64
+    assert (reference_vertices.dtype in FLOAT_DTYPES
+            and orientation_keyframes.dtype == reference_vertices.dtype
+            and center_keyframes.dtype == reference_vertices.dtype
+            and camera_location.dtype in FLOAT_DTYPES
             and faces.dtype == np.int64)
     assert (camera_location.shape == (3,)
             and orientation_keyframes.shape == (2, 4)
@@ -49,22 +67,40 @@ def animate_between_keyframes(screen: pygame.Surface,
     if np.any(np.isnan(orientation_keyframes)) or np.any(np.isnan(center_keyframes)):
         return False
 
-    interpolated_quaternions = i.linear_interpolation(orientation_keyframes,
-                                                      number_of_frames)
-    interpolated_centers = i.linear_interpolation(center_keyframes,
-                                                  number_of_frames)
+    strips = m.edge_strips(m.unique_edges(faces)[0])
+    camera = Camera(camera_location, projection_method, screen.get_height(), reference_vertices.dtype)
+
+    timer = FrameTimer(enabled=False) if timer is None else timer
 
     clock = pygame.time.Clock()
-    for j in range(number_of_frames):
-        render(screen,
-               t.quaternion_rotation(interpolated_quaternions[j], reference_vertices) + interpolated_centers[j],
-               faces, projection(projection_method, camera_location))
+    timer.start_frame()
+    for _, vertices in a.keyframe_frames(orientation_keyframes,
+                                         center_keyframes,
+                                         reference_vertices,
+                                         number_of_frames):
+        timer.mark("transform")
+        points = camera.project(vertices)
+        timer.mark("project")
+        if rasterizer is None:
+            render(screen, points, strips, timer=timer)
+        else:
+            render_filled(screen, rasterizer, vertices, points, camera, timer=timer)
+        timer.end_frame()
 
         clock.tick(fps)
+        timer.start_frame()
 
     return True
 
 
+def _check_update_orientation(orientation: np.ndarray,
+                              angle: float,
+                              axis: np.ndarray) -> None:
+    assert orientation.dtype in FLOAT_DTYPES and axis.dtype == orientation.dtype
+    assert orientation.shape == (4,) and axis.shape == (3,)
+
+
+@validated(_check_update_orientation)
 def update_orientation(orientation: np.ndarray,
                        angle: float,
                        axis: np.ndarray) -> np.ndarray:
@@ -75,11 +111,8 @@ def update_orientation(orientation: np.ndarray,
     :param axis: 3-numpy-array of axis of rotation.
     :return: 4-numpy-array of orientation in quaternion after rotation
     """
-    assert orientation.dtype == np.float64 and axis.dtype == np.float64
-    assert orientation.shape == (4,) and axis.shape == (3,)
-
-    return q.quaternion_multiplication(q.rotation_quaternion(angle, axis),
-                                       orientation)
+    return k.hamilton_product(q.rotation_quaternion(angle, axis),
+                              orientation)
 
 
 def record_keyframes(orientation: np.ndarray,
@@ -94,10 +127,10 @@ def record_keyframes(orientation: np.ndarray,
     :param center_keyframe: 3-numpy-array where current center is stored.
     :return: None
     """
-    assert (orientation.dtype == np.float64
-            and center.dtype == np.float64
-            and orientation_keyframe.dtype == np.float64
-            and center_keyframe.dtype == np.float64)
+    assert (orientation.dtype in FLOAT_DTYPES
+            and center.dtype == orientation.dtype
+            and orientation_keyframe.dtype == orientation.dtype
+            and center_keyframe.dtype == orientation.dtype)
     assert orientation.shape == (4,) and center.shape == (3,)
     assert (orientation.shape == orientation_keyframe.shape
             and center.shape == center_keyframe.shape)
@@ -112,7 +145,7 @@ def init_cuboid(center: np.ndarray,
                 half_depth: Union[int, float]) -> Tuple[np.ndarray, np.ndarray]:
     """
     Initialize a 3D cuboid.
-    :param center: 3D float64 array of the center of the cuboid
+    :param center: 3D float array of the center of the cuboid
     :param half_width: half of the width of the cuboid, i.e. length in x
     :param half_height: half of the height of the cuboid, i.e. length in y
     :param half_depth: half of the depth of the cuboid, i.e. length in z
@@ -120,23 +153,30 @@ def init_cuboid(center: np.ndarray,
     """
     assert len(center.shape) == 1
     assert len(center) == 3
-    assert center.dtype == np.float64
+    assert center.dtype in FLOAT_DTYPES
 
     x, y, z = np.meshgrid((center[0] + half_width, center[0] - half_width),
                           (center[1] + half_height, center[1] - half_height),
                           (center[2] + half_depth, center[2] - half_depth), copy=True)
 
-    assert x.dtype == np.float64
+    assert x.dtype == center.dtype
 
     return (np.column_stack((x.flatten(), y.flatten(), z.flatten())),
             np.array([[0, 4, 6, 2],
                       [1, 3, 7, 5],
                       [0, 2, 3, 1],
                       [0, 1, 5, 4],
-                      [1, 3, 7, 5],
+                      [4, 5, 7, 6],
                       [2, 6, 7, 3]]))
 
 
+def _check_perspective_projection(camera_location: np.ndarray, vertices: np.ndarray) -> None:
+    assert len(camera_location.shape) == 1
+    assert len(vertices.shape) == 2
+    assert vertices.shape[1] == 3
+
+
+@validated(_check_perspective_projection)
 def perspective_projection(camera_location: np.ndarray, vertices: np.ndarray) -> np.ndarray:
     """
     Perspective projection of 3D vertices in world cartesian coordinate to the frame of the x-y plane.
@@ -144,80 +184,208 @@ def perspective_projection(camera_location: np.ndarray, vertices: np.ndarray) ->
     :param vertices: n x 3 matrix of vertices in world frame
     :return: n x 2 matrix of vertices in the frame of the x-y plane
     """
-    assert len(camera_location.shape) == 1
-    assert len(vertices.shape) == 2
-    assert vertices.shape[1] == 3
-
     return coc.homogeneous_to_cartesian(coc.cartesian_to_homogeneous(vertices) @ np.array([[-camera_location[2], 0, 0],
                                                                                            [0, -camera_location[2], 0],
                                                                                            [camera_location[0],
                                                                                             camera_location[1], 1],
                                                                                            [0, 0,
-                                                                                            -camera_location[2]]]))
+                                                                                            -camera_location[2]]],
+                                                                                          dtype=vertices.dtype))
 
 
+def _check_orthographic_projection(vertices: np.ndarray) -> None:
+    assert len(vertices.shape) == 2
+    assert vertices.shape[1] == 3
+
+
+@validated(_check_orthographic_projection)
 def orthographic_projection(vertices: np.ndarray) -> np.ndarray:
     """
     Orthographic projection of 3D vertices in world cartesian coordinate to the frame of the x-y plane.
     :param vertices: n x 3 vertices to project
     :return: n x 2 projected vertices, i.e. **VIEW** into first two columns of 'vertices'
     """
-    assert len(vertices.shape) == 2
-    assert vertices.shape[1] == 3
-
     return vertices[:, 0:2]
 
 
-def draw_wireframe(screen: pygame.Surface, vertices: np.ndarray, faces: np.ndarray) -> None:
+def _check_draw_wireframe(screen: pygame.Surface,
+                          vertices: np.ndarray,
+                          faces: np.ndarray,
+                          strips: Union[List[np.ndarray], None] = None) -> None:
+    assert len(vertices.shape) == 2
+    assert vertices.shape[1] == 2
+
+
+@validated(_check_draw_wireframe)
+def draw_wireframe(screen: pygame.Surface,
+                   vertices: np.ndarray,
+                   faces: np.ndarray,
+                   strips: Union[List[np.ndarray], None] = None) -> None:
     """
     Draw the 2D projected image of the wireframe of a 3D mesh onto the PyGame surface.
     :param screen: pygame Surface
     :param vertices: n x 2 matrix of projected vertices of the wireframe
     :param faces: m x 4 matrix of face indices
+    :param strips: edge strips of 'faces' (see mesh.edge_strips). Computed from 'faces' if None, so pass them in when
+    drawing the same mesh repeatedly.
     :return None
     """
-    assert len(vertices.shape) == 2
-    assert vertices.shape[1] == 2
+    if strips is None:
+        strips = m.edge_strips(m.unique_edges(faces)[0])
 
-    vertices_to_draw = coc.cartesian_to_pygame(vertices, screen.get_height())
+    draw_edges(screen, coc.cartesian_to_pygame(vertices, screen.get_height()), strips)
 
-    for face in faces:
-        for i in range(face.shape[0]):
-            pygame.draw.aaline(screen, (0, 0, 0),
-                               vertices_to_draw[face[i]],
-                               vertices_to_draw[face[(i + 1) % face.shape[0]]])
+
+def draw_edges(screen: pygame.Surface,
+               points: np.ndarray,
+               strips: List[np.ndarray]) -> None:
+    """
+    Draw edge strips onto the PyGame surface, one call per strip.
+    :param screen: pygame Surface
+    :param points: n x 2 matrix of vertices in pygame's coordinate system
+    :param strips: list of arrays of vertex indices along each strip, see mesh.edge_strips
+    :return None
+    """
+    for strip in strips:
+        pygame.draw.aalines(screen, (0, 0, 0), False, points[strip])
 
 
-def control(key_to_action: Dict[int, Tuple[Callable, Tuple]]) -> None:
+def control(key_to_action: Dict[int, Tuple[Callable, Tuple]]) -> bool:
     """
     Execute the associated function when a key is pressed.
     :param key_to_action: A dictionary where keys are PyGame keys and values are tuples where the first element is the
     function to execute, and the second is a tuple of arguments into the function.
-    :return: None
+    :return: True if at least one function was executed, i.e. the state of the simulation may have changed. Functions
+    that return False report that they changed nothing, e.g. an animation without keyframes, and do not count.
     """
+    pressed = pygame.key.get_pressed()
+    executed = False
     for key, action in key_to_action.items():
-        if pygame.key.get_pressed()[key]:
-            action[0](*action[1])
+        if pressed[key] and action[0](*action[1]) is not False:
+            executed = True
+
+    return executed
 
 
 def render(screen: pygame.Surface,
-           vertices: np.ndarray,
-           faces: np.ndarray,
-           projection_function: Callable[[np.ndarray], np.ndarray]) -> None:
+           points: np.ndarray,
+           strips: List[np.ndarray],
+           previous_rect: Union[pygame.Rect, None] = None,
+           timer: Union[FrameTimer, None] = None) -> pygame.Rect:
     """
-    Render the environment in which the object 'vertices' and 'faces' represent.
+    Render the environment in which the object 'points' and 'strips' represent.
+    :param screen: PyGame display window
+    :param points: v x 2 matrix of the object's vertices in pygame's coordinate system, e.g. from Camera.project
+    :param strips: edge strips of the object's faces, see mesh.edge_strips
+    :param previous_rect: area of the display the previous frame drew on. If given, only it and the area of this frame
+    are updated on the display, otherwise the whole display is.
+    :param timer: timer of the stages of the frame. Its percentiles are drawn over the frame if its overlay is on.
+    :return: area of the display this frame drew on
+    """
+    return present(screen, draw_points(screen, points, strips), previous_rect, timer)
+
+
+def render_filled(screen: pygame.Surface,
+                  rasterizer: Rasterizer,
+                  vertices: np.ndarray,
+                  points: np.ndarray,
+                  camera: Camera,
+                  visible: Union[np.ndarray, None] = None,
+                  previous_rect: Union[pygame.Rect, None] = None,
+                  timer: Union[FrameTimer, None] = None) -> pygame.Rect:
+    """
+    Render the environment with the faces of the object filled, see raster.Rasterizer.
     :param screen: PyGame display window
+    :param rasterizer: rasterizer of the object's faces
+    :param vertices: v x 3 matrix of the object's vertices in world frame
+    :param points: v x 2 matrix of the vertices in pygame's coordinate system, e.g. from Camera.project
+    :param camera: camera the vertices are projected with
+    :param visible: optional boolean array of the faces to draw, e.g. from culling.Culler.visible_faces
+    :param previous_rect: see render
+    :param timer: see render
+    :return: area of the display this frame drew on
+    """
+    return present(screen, rasterizer.draw(screen, vertices, points, camera, visible), previous_rect, timer)
+
+
+def present(screen: pygame.Surface,
+            rect: pygame.Rect,
+            previous_rect: Union[pygame.Rect, None] = None,
+            timer: Union[FrameTimer, None] = None) -> pygame.Rect:
+    """
+    Update the display with a drawn frame.
+    :param screen: PyGame display window
+    :param rect: area of the display the frame drew on
+    :param previous_rect: see render
+    :param timer: see render
+    :return: area of the display this frame drew on, grown by the timer's overlay if it is drawn
+    """
+    if timer is not None:
+        timer.mark("draw")
+        if timer.overlay:
+            rect.union_ip(timer.draw_overlay(screen))
+
+    if previous_rect is None:
+        pygame.display.update()
+    else:
+        # An empty rect would stretch the union to the origin.
+        areas = [area for area in (rect, previous_rect) if area.width and area.height]
+        if areas:
+            pygame.display.update(areas[0].unionall(areas[1:]))
+
+    if timer is not None:
+        timer.mark("display")
+
+    return rect
+
+
+def draw_frame(surface: pygame.Surface,
+               vertices: np.ndarray,
+               strips: List[np.ndarray],
+               camera: Camera) -> pygame.Rect:
+    """
+    Draw a frame of the environment in which the object 'vertices' and 'strips' represent onto a surface, which need
+    not be the display.
+    :param surface: PyGame surface to draw on
     :param vertices: v x 3 matrix of vertices
-    :param faces: f x 4 matrix of face indices
-    :param projection_function: a function that project 'vertices' onto 'screen'. Takes v x 3 matrix of vertices and
-    outputs v x 2 matrix of projected vertices
-    :return: None
+    :param strips: edge strips of the object's faces, see mesh.edge_strips
+    :param camera: camera that projects 'vertices' onto 'surface'
+    :return: area of the surface the object was drawn on
     """
-    screen.fill((255, 255, 255))
+    return draw_points(surface, camera.project(vertices), strips)
 
-    draw_wireframe(screen, projection_function(vertices), faces)
 
-    pygame.display.update()
+def draw_points(surface: pygame.Surface,
+                points: np.ndarray,
+                strips: List[np.ndarray]) -> pygame.Rect:
+    """
+    Draw a frame of the environment in which the object 'points' and 'strips' represent onto a surface.
+    :param surface: PyGame surface to draw on
+    :param points: v x 2 matrix of the object's vertices in pygame's coordinate system
+    :param strips: edge strips of the object's faces, see mesh.edge_strips
+    :return: area of the surface the object was drawn on
+    """
+    surface.fill((255, 255, 255))
+    draw_edges(surface, points, strips)
+
+    return bounding_rect(surface, points)
+
+
+def bounding_rect(surface: pygame.Surface, points: np.ndarray) -> pygame.Rect:
+    """
+    Return the area of a surface that lines between points can be drawn on.
+    :param surface: PyGame surface
+    :param points: n x 2 matrix of vertices in pygame's coordinate system
+    :return: bounding box of the points, grown by a pixel on every side for anti-aliasing, and clipped to the surface
+    """
+    finite = points[np.all(np.isfinite(points), axis=1)]
+    if finite.shape[0] == 0:
+        return pygame.Rect(0, 0, 0, 0)
+
+    left, top = np.floor(finite.min(axis=0)).astype(int) - 1
+    right, bottom = np.ceil(finite.max(axis=0)).astype(int) + 2
+
+    return pygame.Rect(left, top, right - left, bottom - top).clip(surface.get_rect())
 
 
 def projection(choice: int,
@@ -232,7 +400,7 @@ def projection(choice: int,
     assert choice == 0 or choice == 1
     assert len(camera_location.shape) == 1
     assert len(camera_location) == 3
-    assert camera_location.dtype == np.float64
+    assert camera_location.dtype in FLOAT_DTYPES
 
     if choice == 0:
         def perspective_projection_fixed_camera(vertices: np.ndarray) -> np.ndarray:
@@ -245,61 +413,85 @@ def projection(choice: int,
 
 
 def load_settings() -> Dict:
-    """Load settings of the simulation."""
-    center = np.array([300., 300., 300.])
-    vertices, faces = init_cuboid(center, 50, 50, 50)
+    """Load settings of the simulation. Floating point arrays have the type config.get_dtype()."""
+    dtype = config.get_dtype()
+    center = np.array([300., 300., 300.], dtype=dtype)
+    if config.MESH is None:
+        vertices, faces = init_cuboid(center, 50, 50, 50)
+        reference_vertices = vertices - center
+    else:
+        vertices, faces = m.load_mesh(config.MESH, dtype)
+        reference_vertices = m.fit_to_box(vertices, 50)
+    orientation = np.array([1., 0., 0., 0.], dtype=dtype)
+    scene_object = SceneObject(reference_vertices, orientation, center,
+                               RotationMatrixCache(max_size=8, assume_unit=True))
+    scene = Scene(dtype)
+    scene.add(scene_object, faces)
+
+    camera_location = np.array([400., 400., -100.], dtype=dtype)
+    projection_method = 1
+    screen_width = 800
+    screen_height = 800
     return {"center": center,
-            "vertices": vertices,
             "faces": faces,
-            "reference_vertices": vertices - center,
-            "orientation": np.array([1., 0., 0., 0.]),
-            "orientation_keyframes": np.full((2, 4), np.nan, dtype=np.float64),
-            "center_keyframes": np.full((2, 3), np.nan, dtype=np.float64),
-            "screen_width": 800,
-            "screen_height": 800,
-            "camera_location": np.array([400., 400., -100.]),
+            "reference_vertices": reference_vertices,
+            "orientation": orientation,
+            "object": scene_object,
+            "scene": scene,
+            "culler": scene_culler(scene, screen_width, screen_height) if config.CULLING else None,
+            "rasterizer": (Rasterizer(scene.batched_faces(), screen_width, screen_height)
+                           if config.RENDERING == "filled" else None),
+            "drift_monitor": DriftMonitor(),
+            "recorder": None if config.RECORDING is None else TrackRecorder(config.RECORDING, dtype),
+            "timer": FrameTimer(enabled=config.TIMING is not None,
+                                log_path=None if config.TIMING in (None, "1") else config.TIMING),
+            # Playback runs its own frames while a frame of the interactive loop is open, so it gets its own timer.
+            "playback_timer": FrameTimer(enabled=config.TIMING is not None),
+            "orientation_keyframes": np.full((2, 4), np.nan, dtype=dtype),
+            "center_keyframes": np.full((2, 3), np.nan, dtype=dtype),
+            "screen_width": screen_width,
+            "screen_height": screen_height,
+            "camera_location": camera_location,
+            "camera": Camera(camera_location, projection_method, screen_height, dtype),
             "rotation_speed": np.pi / 80.,
             "translation_speed": 5.,
             "fps": 60,
+            "idle_fps": 30,
             "number_of_frames": 100,
-            "projection_method": 1}
+            "projection_method": projection_method}
 
 
 def load_translation_controls(center: np.ndarray,
-                              vertices: np.ndarray,
                               translation_speed: float) -> Dict:
     """
     Return a dictionary of bindings between keys and scripts for translating an object.
-    :param center: center of the object 'vertices' represents. This is mutated to the new translated center.
-    :param vertices: n x 3 matrix of vertices in world cartesian coordinate
+    :param center: 3-numpy-array of center of the object. Mutated after translation.
     :param translation_speed: translation speed.
     """
-    return {pygame.K_LEFT: (t.translation, (center, vertices, - translation_speed, 0)),
-            pygame.K_RIGHT: (t.translation, (center, vertices, translation_speed, 0)),
-            pygame.K_UP: (t.translation, (center, vertices, translation_speed, 1)),
-            pygame.K_DOWN: (t.translation, (center, vertices, - translation_speed, 1)),
-            pygame.K_w: (t.translation, (center, vertices, translation_speed, 2)),
-            pygame.K_s: (t.translation, (center, vertices, - translation_speed, 2))}
+    return {pygame.K_LEFT: (translation_script, (center, - translation_speed, 0)),
+            pygame.K_RIGHT: (translation_script, (center, translation_speed, 0)),
+            pygame.K_UP: (translation_script, (center, translation_speed, 1)),
+            pygame.K_DOWN: (translation_script, (center, - translation_speed, 1)),
+            pygame.K_w: (translation_script, (center, translation_speed, 2)),
+            pygame.K_s: (translation_script, (center, - translation_speed, 2))}
 
 
-def load_rotation_controls(center: np.ndarray,
-                           vertices: np.ndarray,
-                           orientation: np.ndarray,
-                           rotation_speed: float) -> Dict:
+def load_rotation_controls(orientation: np.ndarray,
+                           rotation_speed: float,
+                           drift_monitor: Union[DriftMonitor, None] = None) -> Dict:
     """
     Return a dictionary of bindings between keys and scripts for rotating the object.
-    :param center: 3-numpy-array of center of the object. Mutated after rotation.
-    :param vertices: v x 3 numpy array of the object vertices. Mutated after rotation.
-    :param orientation: 4-numpy-array of the object's orientation in quaternion.
+    :param orientation: 4-numpy-array of the object's orientation in quaternion. Mutated after rotation.
     :param rotation_speed: rotation speed.
+    :param drift_monitor: monitor that keeps 'orientation' at unit norm, see rotation_script.
     :return: None
     """
-    return {pygame.K_LEFT: (rotation_script, (center, vertices, - rotation_speed, orientation, 1)),
-            pygame.K_RIGHT: (rotation_script, (center, vertices, rotation_speed, orientation, 1)),
-            pygame.K_UP: (rotation_script, (center, vertices, - rotation_speed, orientation, 0)),
-            pygame.K_DOWN: (rotation_script, (center, vertices, rotation_speed, orientation, 0)),
-            pygame.K_a: (rotation_script, (center, vertices, - rotation_speed, orientation, 2)),
-            pygame.K_d: (rotation_script, (center, vertices, rotation_speed, orientation, 2))}
+    return {pygame.K_LEFT: (rotation_script, (- rotation_speed, orientation, 1, drift_monitor)),
+            pygame.K_RIGHT: (rotation_script, (rotation_speed, orientation, 1, drift_monitor)),
+            pygame.K_UP: (rotation_script, (- rotation_speed, orientation, 0, drift_monitor)),
+            pygame.K_DOWN: (rotation_script, (rotation_speed, orientation, 0, drift_monitor)),
+            pygame.K_a: (rotation_script, (- rotation_speed, orientation, 2, drift_monitor)),
+            pygame.K_d: (rotation_script, (rotation_speed, orientation, 2, drift_monitor))}
 
 
 def load_record_keyframes_controls(center: np.ndarray,
@@ -332,7 +524,9 @@ def load_play_keyframe_animation_controls(screen,
                                           reference_vertices,
                                           faces,
                                           fps,
-                                          number_of_frames) -> Dict:
+                                          number_of_frames,
+                                          timer: Union[FrameTimer, None] = None,
+                                          rasterizer: Union[Rasterizer, None] = None) -> Dict:
     """
     Return a dictionary of bindings between keys and scripts for animating the interpolated frames.
     :param screen: PyGame display window.
@@ -346,6 +540,8 @@ def load_play_keyframe_animation_controls(screen,
     :param faces: 2D numpy array of face indices.
     :param fps: number of frames per second of the animation.
     :param number_of_frames: number of frames of the animation.
+    :param timer: timer of the stages of the animation's frames.
+    :param rasterizer: rasterizer of 'faces' to draw the frames filled with. If None, they are drawn as wireframes.
     :return: None
     """
     return {pygame.K_p: (play_keyframe_animation_script, (screen,
@@ -356,7 +552,76 @@ def load_play_keyframe_animation_controls(screen,
                                                           reference_vertices,
                                                           faces,
                                                           fps,
-                                                          number_of_frames))}
+                                                          number_of_frames,
+                                                          timer,
+                                                          rasterizer))}
+
+
+def load_play_recording_controls(screen: pygame.Surface,
+                                 recorder: Union[TrackRecorder, None],
+                                 reference_vertices: np.ndarray,
+                                 faces: np.ndarray,
+                                 camera: Camera,
+                                 fps: int,
+                                 rasterizer: Union[Rasterizer, None] = None) -> Dict:
+    """
+    Return a dictionary of bindings between keys and scripts for playing the recorded poses back.
+    :param screen: PyGame display window.
+    :param recorder: recorder of the object's poses. No key is bound if it is None.
+    :param reference_vertices: v x 3 object vertices with (0, 0, 0) as center. All orientations are relative to them.
+    :param faces: 2D numpy array of face indices.
+    :param camera: camera that projects the object onto 'screen'.
+    :param fps: number of frames per second of the playback.
+    :param rasterizer: rasterizer of 'faces' to draw the frames filled with. If None, they are drawn as wireframes.
+    :return: None
+    """
+    if recorder is None:
+        return {}
+
+    return {pygame.K_r: (play_recording_script, (screen, recorder, reference_vertices, faces, camera, fps, rasterizer))}
+
+
+def play_recording_script(screen: pygame.Surface,
+                          recorder: TrackRecorder,
+                          reference_vertices: np.ndarray,
+                          faces: np.ndarray,
+                          camera: Camera,
+                          fps: int,
+                          rasterizer: Union[Rasterizer, None] = None) -> bool:
+    """
+    Script to execute when playing the recorded poses back, in real time. The track file is streamed, see
+    recording.TrackReader, so recordings of any length play in constant memory. Escape stops the playback.
+    :param screen: PyGame display window.
+    :param recorder: recorder of the object's poses. Flushed before its file is read.
+    :param reference_vertices: v x 3 object vertices with (0, 0, 0) as center. All orientations are relative to them.
+    :param faces: 2D numpy array of face indices.
+    :param camera: camera that projects the object onto 'screen'.
+    :param fps: number of frames per second of the playback.
+    :param rasterizer: rasterizer of 'faces' to draw the frames filled with. If None, they are drawn as wireframes.
+    :return: True if the recording was played, False if it has fewer than two poses.
+    """
+    recorder.flush()
+    reader = TrackReader(recorder.path)
+    if len(reader) < 2:
+        return False
+
+    strips = m.edge_strips(m.unique_edges(faces)[0])
+
+    clock = pygame.time.Clock()
+    for _, vertices in a.transform_frames(reference_vertices,
+                                          reader.evaluate,
+                                          np.arange(reader.start, reader.end, 1. / fps)):
+        if any(event.key == pygame.K_ESCAPE for event in pygame.event.get(pygame.KEYDOWN)):
+            break
+
+        if rasterizer is None:
+            render(screen, camera.project(vertices), strips)
+        else:
+            render_filled(screen, rasterizer, vertices, camera.project(vertices), camera)
+
+        clock.tick(fps)
+
+    return True
 
 
 def play_keyframe_animation_script(screen,
@@ -367,7 +632,9 @@ def play_keyframe_animation_script(screen,
                                    reference_vertices,
                                    faces,
                                    fps,
-                                   number_of_frames) -> None:
+                                   number_of_frames,
+                                   timer: Union[FrameTimer, None] = None,
+                                   rasterizer: Union[Rasterizer, None] = None) -> bool:
     """
     Script to execute when animating the interpolated frames.
     :param screen: PyGame display window.
@@ -381,40 +648,54 @@ def play_keyframe_animation_script(screen,
     :param faces: 2D numpy array of face indices.
     :param fps: number of frames per second of the animation.
     :param number_of_frames: number of frames of the animation.
-    :return: None
+    :param timer: timer of the stages of the animation's frames.
+    :param rasterizer: rasterizer of 'faces' to draw the frames filled with. If None, they are drawn as wireframes.
+    :return: True if the animation was played, False if a keyframe has not been captured.
     """
-    if animate_between_keyframes(screen, camera_location, projection_method, orientation_keyframes,
-                                 center_keyframes,
-                                 reference_vertices, faces, fps, number_of_frames):
-        orientation_keyframes[:] = np.full_like(orientation_keyframes, np.nan, dtype=np.float64)
-        center_keyframes[:] = np.full_like(orientation_keyframes, np.nan, dtype=np.float64)
+    if not animate_between_keyframes(screen, camera_location, projection_method, orientation_keyframes,
+                                     center_keyframes,
+                                     reference_vertices, faces, fps, number_of_frames, timer, rasterizer):
+        return False
+
+    orientation_keyframes[:] = np.nan
+    center_keyframes[:] = np.nan
+    return True
 
 
-def rotation_script(center: np.ndarray,
-                    vertices: np.ndarray,
-                    rotation_speed: float,
+def rotation_script(rotation_speed: float,
                     orientation: np.ndarray,
-                    axis: int) -> None:
+                    axis: int,
+                    drift_monitor: Union[DriftMonitor, None] = None) -> None:
     """
     Script to execute when rotating the object.
-    :param center: 3-numpy-array of center of the object. Mutated after rotation.
-    :param vertices: v x 3 numpy array of the object vertices. Mutated after rotation.
     :param rotation_speed: rotation speed.
-    :param orientation: 4-numpy-array of the object's orientation in quaternion.
+    :param orientation: 4-numpy-array of the object's orientation in quaternion. Mutated after rotation.
     :param axis: canonical axis about which to rotate. 0, 1, 2 for x-, y-, and z-axis, respectively.
+    :param drift_monitor: if given, records the drift of the new orientation from unit norm and renormalizes it when
+    due.
     :return: None
     """
     assert axis == 0 or axis == 1 or axis == 2
 
-    if axis == 0:
-        t.rotation_about_x(center, vertices, rotation_speed)
-        orientation[:] = update_orientation(orientation, rotation_speed, np.array([1., 0., 0.]))
-    elif axis == 1:
-        t.rotation_about_y(center, vertices, rotation_speed)
-        orientation[:] = update_orientation(orientation, rotation_speed, np.array([0., 1., 0.]))
-    else:
-        t.rotation_about_z(center, vertices, rotation_speed)
-        orientation[:] = update_orientation(orientation, rotation_speed, np.array([0., 0., 1.]))
+    orientation[:] = update_orientation(orientation, rotation_speed, np.eye(3, dtype=orientation.dtype)[axis])
+
+    if drift_monitor is not None:
+        drift_monitor.update(orientation)
+
+
+def translation_script(center: np.ndarray,
+                       step: Union[int, float],
+                       axis: int) -> None:
+    """
+    Script to execute when translating the object.
+    :param center: 3-numpy-array of center of the object. Mutated after translation.
+    :param step: number to translate by, in the positive direction if positive, and vice versa.
+    :param axis: canonical axis along which to translate. 0, 1, 2 for x-, y-, and z-axis, respectively.
+    :return: None
+    """
+    assert axis == 0 or axis == 1 or axis == 2
+
+    center[axis] += step
 
 
 def start_environment(screen: pygame.Surface,
@@ -422,7 +703,8 @@ def start_environment(screen: pygame.Surface,
                       rotation_controls: Dict,
                       translation_controls: Dict,
                       record_keyframes_controls: Dict,
-                      play_keyframe_animation_controls: Dict) -> None:
+                      play_keyframe_animation_controls: Dict,
+                      play_recording_controls: Union[Dict, None] = None) -> None:
     """
     The main loop of the simulation.
     :param screen: pygame screen/display.
@@ -432,28 +714,87 @@ def start_environment(screen: pygame.Surface,
     :param record_keyframes_controls: dictionary of bindings between keys and scripts for recording keyframes.
     :param play_keyframe_animation_controls: dictionary of bindings between keys and scripts for animating the
     interpolated frames.
+    :param play_recording_controls: dictionary of bindings between keys and scripts for playing back the poses that
+    settings["recorder"] records.
     :return: None
     """
+    clock = pygame.time.Clock()
+    timer = settings["timer"]
+    camera_version = None
+    # Area of the display the wireframe was last drawn on. None when the whole display has to be updated.
+    drawn_rect = None
+
     running = True
     while running:
+        timer.start_frame()
+        dirty = False
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
-
-        control(record_keyframes_controls)
-        control(play_keyframe_animation_controls)
+            elif event.type == pygame.VIDEOEXPOSE or event.type == pygame.WINDOWEXPOSED:
+                drawn_rect = None
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3 and timer.enabled:
+                timer.overlay = not timer.overlay
+                settings["playback_timer"].overlay = timer.overlay
+                drawn_rect = None
+
+        dirty |= control(record_keyframes_controls)
+        if control(play_keyframe_animation_controls):
+            drawn_rect = None
+        if play_recording_controls is not None and control(play_recording_controls):
+            drawn_rect = None
 
         if pygame.key.get_pressed()[pygame.K_LSHIFT] or pygame.key.get_pressed()[pygame.K_RSHIFT]:
-            control(rotation_controls)
+            dirty |= control(rotation_controls)
 
         else:
-            control(translation_controls)
+            dirty |= control(translation_controls)
+
+        if settings["recorder"] is not None:
+            settings["recorder"].record(time.time(), settings["orientation"], settings["center"])
+
+        timer.mark("control")
+
+        if settings["camera"].version != camera_version:
+            camera_version = settings["camera"].version
+            drawn_rect = None
+
+        if dirty or drawn_rect is None:
+            if settings["rasterizer"] is None and settings["culler"] is None:
+                # Only the screen coordinates are drawn, so they are projected straight from the world poses.
+                settings["scene"].update()
+                timer.mark("transform")
+                points = settings["scene"].project(settings["camera"])
+                timer.mark("project")
+            else:
+                vertices = settings["scene"].world_vertices()
+                timer.mark("transform")
+                points = settings["camera"].project(vertices)
+                timer.mark("project")
+
+            if settings["rasterizer"] is not None:
+                visible = None
+                if settings["culler"] is not None:
+                    visible = settings["culler"].visible_faces(vertices, points, settings["camera"])
+                    timer.mark("cull")
+                drawn_rect = render_filled(screen, settings["rasterizer"], vertices, points, settings["camera"],
+                                           visible, drawn_rect, timer)
+            else:
+                if settings["culler"] is None:
+                    strips = settings["scene"].strips
+                else:
+                    strips = settings["culler"].cull(vertices, points, settings["camera"])
+                    timer.mark("cull")
+                drawn_rect = render(screen, points, strips, drawn_rect, timer)
+            timer.end_frame()
+            clock.tick(settings["fps"])
+        else:
+            clock.tick(settings["idle_fps"])
 
-        render(screen,
-               settings["vertices"],
-               settings["faces"],
-               projection(settings["projection_method"],
-                          settings["camera_location"]))
+    if settings["recorder"] is not None:
+        settings["recorder"].close()
+    if timer.log_path is not None:
+        timer.log()
 
     pygame.quit()
     sys.exit(0)
@@ -472,13 +813,11 @@ def run() -> None:
     pygame.display.set_caption('Quaternion')
 
     translation_controls = load_translation_controls(settings["center"],
-                                                     settings["vertices"],
                                                      settings["translation_speed"])
 
-    rotation_controls = load_rotation_controls(settings["center"],
-                                               settings["vertices"],
-                                               settings["orientation"],
-                                               settings["rotation_speed"])
+    rotation_controls = load_rotation_controls(settings["orientation"],
+                                               settings["rotation_speed"],
+                                               settings["drift_monitor"])
 
     record_keyframes_controls = load_record_keyframes_controls(settings["center"],
                                                                settings["orientation"],
@@ -493,10 +832,21 @@ def run() -> None:
                                                                              settings["reference_vertices"],
                                                                              settings["faces"],
                                                                              settings["fps"],
-                                                                             settings["number_of_frames"])
+                                                                             settings["number_of_frames"],
+                                                                             settings["playback_timer"],
+                                                                             settings["rasterizer"])
+
+    play_recording_controls = load_play_recording_controls(screen,
+                                                           settings["recorder"],
+                                                           settings["reference_vertices"],
+                                                           settings["faces"],
+                                                           settings["camera"],
+                                                           settings["fps"],
+                                                           settings["rasterizer"])
     start_environment(screen,
                       settings,
                       rotation_controls,
                       translation_controls,
                       record_keyframes_controls,
-                      play_keyframe_animation_controls)
\ No newline at end of file
+                      play_keyframe_animation_controls,
+                      play_recording_controls)
\ No newline at end of file
@@ -0,0 +1,142 @@
+import json
+import os
+import time
+from typing import Dict, Sequence, Union
+
+import numpy as np
+import pygame
+
+# Stages of a frame of the simulation, in order.
+STAGES = ("control", "transform", "project", "cull", "draw", "display")
+
+# Percentiles of the stage and frame times that are reported.
+PERCENTILES = (50, 95, 99)
+
+
+class FrameTimer:
+    """
+    Times the stages of frames. A frame starts with start_frame, each mark(stage) adds the time since the previous
+    mark, or the start of the frame, to the stage, and end_frame keeps the frame among the last 'window' ones, over which
+    percentiles are computed. A disabled timer returns straight away from every call.
+    """
+
+    def __init__(self,
+                 stages: Sequence[str] = STAGES,
+                 window: int = 240,
+                 enabled: bool = True,
+                 log_path: Union[str, None] = None,
+                 log_interval: float = 5.) -> None:
+        """
+        :param stages: names of the stages of a frame.
+        :param window: number of most recent frames percentiles are computed over.
+        :param enabled: whether frames are timed.
+        :param log_path: path of a .csv or .json file the percentiles are appended to every 'log_interval' seconds. A
+        .json file gets one JSON object per line.
+        :param log_interval: seconds between log entries.
+        """
+        assert 0 < window
+
+        self.stages = tuple(stages)
+        self.enabled = enabled
+        # Whether the percentiles are drawn over the frames, see draw_overlay.
+        self.overlay = False
+        self.log_path = log_path
+        self.log_interval = log_interval
+
+        self._indices = {stage: index for index, stage in enumerate(self.stages)}
+        # Stage times of the last frames in seconds, one row per frame, and the frame's total in the last column.
+        self._times = np.zeros((window, len(self.stages) + 1))
+        self._row = np.zeros(len(self.stages) + 1)
+        self.frames = 0
+        self._start = self._last = time.perf_counter()
+        self._logged = self._start
+        self._font = None
+
+    def start_frame(self) -> None:
+        """Start timing a frame."""
+        if not self.enabled:
+            return
+
+        self._row[:] = 0.
+        self._start = self._last = time.perf_counter()
+
+    def mark(self, stage: str) -> None:
+        """
+        Add the time since the previous mark, or the start of the frame, to a stage.
+        :param stage: name of the stage.
+        :return: None
+        """
+        if not self.enabled:
+            return
+
+        now = time.perf_counter()
+        self._row[self._indices[stage]] += now - self._last
+        self._last = now
+
+    def end_frame(self) -> None:
+        """Keep the times of the frame, and log the percentiles if they are due."""
+        if not self.enabled:
+            return
+
+        self._row[-1] = self._last - self._start
+        self._times[self.frames % self._times.shape[0]] = self._row
+        self.frames += 1
+
+        if self.log_path is not None and self._last - self._logged >= self.log_interval:
+            self._logged = self._last
+            self.log()
+
+    def percentiles(self) -> Dict[str, Dict[int, float]]:
+        """
+        Return the percentiles of the stage and frame times over the last frames.
+        :return: dictionary from the stages, and "frame", to dictionaries from percentiles to times in milliseconds.
+        """
+        times = self._times[:min(self.frames, self._times.shape[0])]
+        if times.shape[0] == 0:
+            return {}
+
+        values = np.percentile(times, PERCENTILES, axis=0) * 1e3
+
+        return {stage: dict(zip(PERCENTILES, values[:, index].tolist()))
+                for index, stage in enumerate(self.stages + ("frame",))}
+
+    def log(self) -> None:
+        """Append the percentiles to the log file."""
+        percentiles = self.percentiles()
+        now = time.time()
+
+        if self.log_path.endswith(".csv"):
+            new = not os.path.exists(self.log_path)
+            with open(self.log_path, "a") as file:
+                if new:
+                    file.write("time,frames,stage," + ",".join("p{}".format(p) for p in PERCENTILES) + "\n")
+                for stage, values in percentiles.items():
+                    file.write("{:.3f},{},{},{}\n".format(now, self.frames, stage,
+                                                          ",".join("{:.4f}".format(values[p]) for p in PERCENTILES)))
+        else:
+            with open(self.log_path, "a") as file:
+                file.write(json.dumps({"time": now, "frames": self.frames, "milliseconds": percentiles}) + "\n")
+
+    def draw_overlay(self, surface: pygame.Surface) -> pygame.Rect:
+        """
+        Draw the percentiles in the top left corner of a surface.
+        :param surface: PyGame surface.
+        :return: area of the surface drawn on.
+        """
+        if self._font is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            self._font = pygame.font.Font(None, 18)
+
+        rows = [["ms"] + ["p{}".format(p) for p in PERCENTILES]]
+        rows += [[stage] + ["{:.2f}".format(values[p]) for p in PERCENTILES]
+                 for stage, values in self.percentiles().items()]
+
+        # The default font is proportional, so every cell is drawn on its own to keep the columns aligned.
+        rect = pygame.Rect(4, 4, 0, 0)
+        for row, cells in enumerate(rows):
+            for column, cell in enumerate(cells):
+                text = self._font.render(cell, True, (0, 0, 0), (230, 230, 230))
+                rect.union_ip(surface.blit(text, (4 + 80 * column, 4 + row * self._font.get_linesize())))
+
+        return rect
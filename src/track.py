@@ -0,0 +1,80 @@
+from typing import Tuple
+
+import numpy as np
+
+import src.interpolation as i
+from src.config import FLOAT_DTYPES
+
+
+class AnimationTrack:
+    """
+    Timestamped keyframes of an object's orientation and center. Orientations are interpolated with SQUAD and centers
+    with Catmull-Rom splines. The control quaternions and tangents are computed once on construction, so any batch of
+    sample times is evaluated without re-deriving them.
+    """
+
+    def __init__(self,
+                 times: np.ndarray,
+                 orientations: np.ndarray,
+                 centers: np.ndarray) -> None:
+        """
+        :param times: n-numpy-array of strictly increasing keyframe times, n >= 2.
+        :param orientations: n x 4 numpy array of keyframe orientations in quaternions.
+        :param centers: n x 3 numpy array of keyframe centers.
+        """
+        assert times.dtype in FLOAT_DTYPES and orientations.dtype in FLOAT_DTYPES and centers.dtype == orientations.dtype
+        assert len(times.shape) == 1 and 2 <= times.shape[0]
+        assert orientations.shape == (times.shape[0], 4) and centers.shape == (times.shape[0], 3)
+        assert np.all(np.diff(times) > 0)
+
+        self.times = times.copy()
+        self.durations = np.diff(self.times)
+        self.centers = centers.copy()
+
+        # Keep every keyframe in the hemisphere of the one before it so that each segment takes the shortest path.
+        self.orientations = orientations / np.linalg.norm(orientations, axis=-1)[:, None]
+        signs = np.ones(times.shape[0], dtype=orientations.dtype)
+        signs[1:] = np.where(np.sum(self.orientations[1:] * self.orientations[:-1], axis=-1) < 0, -1., 1.)
+        self.orientations *= np.cumprod(signs)[:, None]
+
+        self.controls = i.squad_controls(self.orientations)
+        self.tangents = i.catmull_rom_tangents(self.times, self.centers)
+
+    @property
+    def start(self) -> float:
+        return float(self.times[0])
+
+    @property
+    def end(self) -> float:
+        return float(self.times[-1])
+
+    def segments(self, sample_times: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Locate the segments sample times fall in.
+        :param sample_times: m-numpy-array of times. Those outside the track are clamped to its ends.
+        :return: m-numpy-array of segment indices, and m-numpy-array of interpolation parameters within the segments.
+        """
+        sample_times = np.clip(sample_times, self.times[0], self.times[-1])
+        indices = np.clip(np.searchsorted(self.times, sample_times, side='right') - 1, 0, self.durations.shape[0] - 1)
+
+        return indices, (sample_times - self.times[indices]) / self.durations[indices]
+
+    def evaluate(self, sample_times: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Interpolate the track at sample times.
+        :param sample_times: m-numpy-array of times. Those outside the track are clamped to its ends.
+        :return: m x 4 numpy array of orientations, and m x 3 numpy array of centers.
+        """
+        assert len(sample_times.shape) == 1
+
+        indices, t = self.segments(sample_times.astype(self.times.dtype, copy=False))
+
+        orientations = i.squad(self.orientations[indices], self.orientations[indices + 1],
+                               self.controls[indices], self.controls[indices + 1],
+                               t)
+        centers = i.hermite(self.centers[indices], self.centers[indices + 1],
+                            self.tangents[indices], self.tangents[indices + 1],
+                            self.durations[indices],
+                            t)
+
+        return orientations, centers
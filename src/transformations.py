@@ -1,24 +1,72 @@
 import numpy as np
-from typing import Union
+from typing import Optional, Union
 import src.quaternion as q
+from src.cache import RotationMatrixCache
+from src.config import FLOAT_DTYPES
+from src.validation import validated
 
+# Number of vertices rotated at once when quaternion_rotation rotates vertices in place.
+IN_PLACE_BLOCK_SIZE = 4096
 
+
+def _check_quaternion_rotation(quaternion: np.ndarray,
+                               vertices: np.ndarray,
+                               cache: Optional[RotationMatrixCache] = None,
+                               assume_unit: bool = False,
+                               out: Optional[np.ndarray] = None) -> None:
+    assert quaternion.dtype in FLOAT_DTYPES and vertices.dtype == quaternion.dtype
+    assert len(quaternion.shape) <= 2 and quaternion.shape[-1] == 4
+    assert vertices.shape[-1] == 3
+    assert (len(vertices.shape) <= 2
+            or (len(vertices.shape) == 3 and len(quaternion.shape) == 2 and vertices.shape[0] == quaternion.shape[0]))
+    assert cache is None or quaternion.shape == (4,)
+    if out is not None:
+        assert out.dtype == vertices.dtype
+        assert out.shape == np.broadcast_shapes(vertices.shape[:-2], quaternion.shape[:-1]) + vertices.shape[-2:]
+        assert not np.shares_memory(out, vertices) or (out.shape == vertices.shape and len(vertices.shape) >= 2)
+
+
+@validated(_check_quaternion_rotation)
 def quaternion_rotation(quaternion: np.ndarray,
-                        vertices: np.ndarray) -> np.ndarray:
+                        vertices: np.ndarray,
+                        cache: Optional[RotationMatrixCache] = None,
+                        assume_unit: bool = False,
+                        out: Optional[np.ndarray] = None) -> np.ndarray:
     """
-    Rotate vertices using a quaternion.
-    :param quaternion: 4-numpy-array defining a rotation.
-    :param center: 3-numpy-array of the object's center.
-    :param vertices: v x 3 numpy array of the object's vertices.
-    :return: v x 3 numpy array of rotated vertices.
+    Rotate vertices using a quaternion, or many sets of vertices using many quaternions at once. The rotation matrices
+    are applied to the vertices directly, without padding them to quaternions.
+    :param quaternion: 4-numpy-array defining a rotation, or k x 4 numpy array defining k rotations.
+    :param vertices: v x 3 numpy array of the object's vertices. If k rotations are given, it can also be a k x v x 3
+    numpy array where the i-th set of vertices is rotated by the i-th rotation.
+    :param cache: optional cache to look up the rotation matrix of a single rotation in.
+    :param assume_unit: if True, 'quaternion' must be unit quaternions, see quaternion.rotation_matrix. Ignored if a
+    cache is given.
+    :param out: optional numpy array of the shape of the result where the rotated vertices are stored. It may be
+    'vertices' itself to rotate them in place.
+    :return: v x 3 numpy array of rotated vertices for a single rotation, otherwise k x v x 3 numpy array where the i-th
+    set is rotated by the i-th rotation. This is 'out' if it is given.
     """
-    assert (quaternion.dtype == np.float64
-            and vertices.dtype == np.float64)
-    assert quaternion.shape == (4,)
-    assert len(vertices.shape) <= 2 and vertices.shape[-1] == 3
+    if cache is not None:
+        matrix = cache.get(quaternion)
+    else:
+        matrix = q.rotation_matrix(quaternion, assume_unit)
+
+    if out is None:
+        return np.matmul(vertices, matrix)
+
+    if not np.shares_memory(out, vertices):
+        return np.matmul(vertices, matrix, out=out)
+
+    # Rotating in place. matmul would copy the whole of 'vertices' first, so rotate a block of rows at a time through a
+    # small scratch buffer instead.
+
+    scratch = np.empty(vertices.shape[:-2] + (min(IN_PLACE_BLOCK_SIZE, vertices.shape[-2]), 3), dtype=vertices.dtype)
+    for start in range(0, vertices.shape[-2], IN_PLACE_BLOCK_SIZE):
+        block = scratch[..., :min(IN_PLACE_BLOCK_SIZE, vertices.shape[-2] - start), :]
+        np.matmul(vertices[..., start:start + IN_PLACE_BLOCK_SIZE, :], matrix, out=block)
+        out[..., start:start + IN_PLACE_BLOCK_SIZE, :] = block
 
-    return q.quaternion_to_vector(q.qvq_inverse(quaternion,
-                                                q.vector_to_quaternion(vertices)))
+    return out
 
 
 def rotation_about_x(center: np.ndarray, vertices: np.ndarray, degree: float) -> None:
@@ -32,7 +80,7 @@ def rotation_about_x(center: np.ndarray, vertices: np.ndarray, degree: float) ->
     vertices -= center
     vertices @= np.array([[1, 0, 0],
                           [0, np.cos(degree), -np.sin(degree)],
-                          [0, np.sin(degree), np.cos(degree)]])
+                          [0, np.sin(degree), np.cos(degree)]], dtype=vertices.dtype)
     vertices += center
 
 
@@ -47,7 +95,7 @@ def rotation_about_y(center: np.ndarray, vertices: np.ndarray, degree: float) ->
     vertices -= center
     vertices @= np.array([[np.cos(degree), 0, np.sin(degree)],
                           [0, 1, 0],
-                          [-np.sin(degree), 0, np.cos(degree)]])
+                          [-np.sin(degree), 0, np.cos(degree)]], dtype=vertices.dtype)
     vertices += center
 
 
@@ -62,7 +110,7 @@ def rotation_about_z(center: np.ndarray, vertices: np.ndarray, degree: float) ->
     vertices -= center
     vertices @= np.array([[np.cos(degree), -np.sin(degree), 0],
                           [np.sin(degree), np.cos(degree), 0],
-                          [0, 0, 1]])
+                          [0, 0, 1]], dtype=vertices.dtype)
     vertices += center
 
 
@@ -0,0 +1,32 @@
+import functools
+from typing import Callable, TypeVar
+
+import src.config as config
+
+F = TypeVar("F", bound=Callable)
+
+
+def validated(check: Callable) -> Callable[[F], F]:
+    """
+    Return a decorator that calls 'check' with a function's arguments before the function itself. 'check' asserts
+    whatever the function requires of its arguments, so the function body holds no checks of its own.
+    If validation is off when the function is decorated, i.e. QUATERNION_VALIDATE=1 is not set at import, the function
+    is returned as is and calls to it cost nothing extra.
+    :param check: function taking the same arguments as the decorated function.
+    :return: decorator.
+    """
+    def decorator(function: F) -> F:
+        if not config.validation_enabled():
+            return function
+
+        @functools.wraps(function)
+        def checked(*args, **kwargs):
+            if config.validation_enabled():
+                check(*args, **kwargs)
+            return function(*args, **kwargs)
+
+        checked.unchecked = function
+
+        return checked
+
+    return decorator
@@ -0,0 +1,68 @@
+import unittest
+import numpy as np
+import src.animation as a
+import src.interpolation as i
+import src.quaternion as q
+import src.transformations as t
+from src.track import AnimationTrack
+
+
+class KeyframeFrames(unittest.TestCase):
+    def setUp(self) -> None:
+        self.orientation_keyframes = np.array([[1., 0., 0., 0.],
+                                               [0.5, 0.5, 0.5, 0.5]])
+        self.center_keyframes = np.array([[0., 0., 0.],
+                                          [10., -20., 30.]])
+        self.reference_vertices = np.array([[1., 0., 0.],
+                                            [0., 2., 0.],
+                                            [1., 2., 3.],
+                                            [-1., -1., -1.]])
+
+    def test_frames(self) -> None:
+        number_of_frames = 10
+        orientations = i.slerp(self.orientation_keyframes[0], self.orientation_keyframes[1],
+                               np.linspace(0., 1., number_of_frames))
+        centers = i.linear_interpolation(self.center_keyframes, number_of_frames)
+
+        indices = []
+        for index, vertices in a.keyframe_frames(self.orientation_keyframes,
+                                                 self.center_keyframes,
+                                                 self.reference_vertices,
+                                                 number_of_frames,
+                                                 chunk_size=3):
+            indices.append(index)
+            expected = t.quaternion_rotation(orientations[index], self.reference_vertices) + centers[index]
+            self.assertTrue(np.allclose(vertices, expected))
+
+        self.assertEqual(indices, list(range(number_of_frames)))
+
+    def test_buffer_is_reused(self) -> None:
+        frames = [vertices for _, vertices in a.keyframe_frames(self.orientation_keyframes,
+                                                                self.center_keyframes,
+                                                                self.reference_vertices,
+                                                                8,
+                                                                chunk_size=4)]
+
+        self.assertTrue(np.shares_memory(frames[0], frames[4]))
+
+
+class TransformFrames(unittest.TestCase):
+    def test_track_poses(self) -> None:
+        track = AnimationTrack(np.array([0., 1., 2.]),
+                               q.rotation_quaternion(np.array([0., 1., 2.]), np.array([[0., 0., 1.],
+                                                                                       [0., 0., 1.],
+                                                                                       [0., 1., 0.]])),
+                               np.array([[0., 0., 0.],
+                                         [1., 1., 1.],
+                                         [5., 0., 0.]]))
+        reference_vertices = np.eye(3)
+        times = np.linspace(0., 2., 7)
+        orientations, centers = track.evaluate(times)
+
+        for index, vertices in a.transform_frames(reference_vertices, track.evaluate, times, chunk_size=2):
+            expected = t.quaternion_rotation(orientations[index], reference_vertices) + centers[index]
+            self.assertTrue(np.allclose(vertices, expected))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+import numpy as np
+import src.quaternion as q
+from src.cache import RotationMatrixCache
+
+
+class RotationMatrixCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.cache = RotationMatrixCache(max_size=2)
+        self.quaternions = np.array([[1., 0., 0., 0.],
+                                     [0.92387953, 0.38268343, 0., 0.],
+                                     [0.5, 0.5, 0.5, 0.5]])
+
+    def test_hit_and_miss(self) -> None:
+        first = self.cache.get(self.quaternions[1])
+        second = self.cache.get(self.quaternions[1].copy())
+
+        self.assertIs(first, second)
+        self.assertTrue(np.allclose(first, q.rotation_matrix(self.quaternions[1])))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_least_recently_used_eviction(self) -> None:
+        self.cache.get(self.quaternions[0])
+        self.cache.get(self.quaternions[1])
+        self.cache.get(self.quaternions[0])
+        self.cache.get(self.quaternions[2])
+
+        self.assertEqual(len(self.cache), 2)
+        self.cache.get(self.quaternions[0])
+        self.assertEqual(self.cache.hits, 2)
+        self.cache.get(self.quaternions[1])
+        self.assertEqual(self.cache.misses, 4)
+
+    def test_invalidate(self) -> None:
+        self.cache.get(self.quaternions[0])
+        self.cache.get(self.quaternions[1])
+
+        self.cache.invalidate(self.quaternions[0])
+        self.assertEqual(len(self.cache), 1)
+        self.cache.invalidate()
+        self.assertEqual(len(self.cache), 0)
+
+    def test_matrices_are_read_only(self) -> None:
+        with self.assertRaises(ValueError):
+            self.cache.get(self.quaternions[0])[0, 0] = 2.
+
+    def test_precomputed_matrix(self) -> None:
+        matrices = q.rotation_matrix(self.quaternions)
+        stored = self.cache.get(self.quaternions[1], matrices[1])
+
+        self.assertIsNot(stored.base, matrices)
+        self.assertTrue(np.array_equal(stored, matrices[1]))
+        self.assertIs(self.cache.get(self.quaternions[1], matrices[2]), stored)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_assume_unit(self) -> None:
+        cache = RotationMatrixCache(assume_unit=True)
+        self.assertTrue(np.allclose(cache.get(self.quaternions[2]), q.rotation_matrix(self.quaternions[2])))
+
+
+if __name__ == '__main__':
+    unittest.main()
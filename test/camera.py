@@ -0,0 +1,80 @@
+import unittest
+import numpy as np
+import src.coordinates as coc
+import src.simulation as sim
+import src.config as config
+from src.camera import Camera
+
+
+class CameraProject(unittest.TestCase):
+    def setUp(self) -> None:
+        self.location = np.array([400., 300., -100.])
+        self.vertices = np.array([[350., 250., 300.],
+                                  [250., 350., 400.],
+                                  [0., 0., 0.],
+                                  [-20., 70., 900.]])
+        self.camera = Camera(self.location, 0, 600, np.float64)
+
+    def test_perspective(self) -> None:
+        expected = coc.cartesian_to_pygame(sim.perspective_projection(self.location, self.vertices), 600)
+        self.assertTrue(np.allclose(self.camera.project(self.vertices), expected))
+
+    def test_orthographic(self) -> None:
+        self.camera.projection_method = 1
+        expected = coc.cartesian_to_pygame(sim.orthographic_projection(self.vertices), 600)
+        self.assertTrue(np.allclose(self.camera.project(self.vertices), expected))
+
+    def test_moved_camera(self) -> None:
+        self.camera.project(self.vertices)
+        location = np.array([0., 100., -50.])
+        self.camera.location = location
+        expected = coc.cartesian_to_pygame(sim.perspective_projection(location, self.vertices), 600)
+
+        self.assertTrue(np.allclose(self.camera.project(self.vertices), expected))
+
+    def test_matrix_cached_until_camera_changes(self) -> None:
+        matrix = self.camera.matrix
+        version = self.camera.version
+        self.camera.project(self.vertices)
+        self.assertIs(self.camera.matrix, matrix)
+        self.assertEqual(self.camera.version, version)
+
+        self.camera.screen_height = 800
+        self.assertIsNot(self.camera.matrix, matrix)
+        self.assertGreater(self.camera.version, version)
+
+    def test_location_is_read_only(self) -> None:
+        with self.assertRaises(ValueError):
+            self.camera.location[0] = 0.
+
+    def test_buffers_are_reused(self) -> None:
+        first = self.camera.project(self.vertices)
+        second = self.camera.project(self.vertices[:2])
+        self.assertTrue(np.shares_memory(first, second))
+
+        out = np.empty((4, 2))
+        self.assertIs(self.camera.project(self.vertices, out), out)
+        self.assertTrue(np.allclose(out, self.camera.project(self.vertices)))
+
+
+class Float32Camera(unittest.TestCase):
+    def test_dtype_preserved(self) -> None:
+        location = np.array([400., 300., -100.])
+        vertices = np.array([[350., 250., 300.],
+                             [250., 350., 400.]])
+        camera = Camera(location, 0, 600, np.float32)
+        actual = camera.project(vertices.astype(np.float32))
+
+        self.assertEqual(actual.dtype, np.float32)
+        self.assertTrue(np.allclose(actual, Camera(location, 0, 600, np.float64).project(vertices), atol=1e-3))
+
+    def test_default_dtype(self) -> None:
+        config.set_dtype(np.float32)
+        try:
+            self.assertEqual(Camera(np.zeros(3), 1, 600).dtype, np.float32)
+        finally:
+            config.set_dtype(np.float64)
+
+
+if __name__ == '__main__':
+    unittest.main()
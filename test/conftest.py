@@ -0,0 +1,5 @@
+import os
+
+# Argument checks are off by default, and only added to functions decorated while they are on, so they are turned on
+# before any test imports the package.
+os.environ.setdefault("QUATERNION_VALIDATE", "1")
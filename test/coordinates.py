@@ -30,5 +30,16 @@ class RecordKeyframe(unittest.TestCase):
         self.assertTrue(np.allclose(actual, expected))
 
 
+class Float32(unittest.TestCase):
+    def test_dtype_preserved(self) -> None:
+        vertices = np.array([[1., -8., 1.],
+                             [-10., -1., -8.]], dtype=np.float32)
+        result = np.empty_like(vertices)
+        c.local_coordinates(result, vertices, np.array([1., 1., 1.], dtype=np.float32))
+
+        self.assertEqual(c.cartesian_to_homogeneous(vertices).dtype, np.float32)
+        self.assertTrue(np.array_equal(result, vertices - 1.))
+
+
 if __name__ == '__main__':
     unittest.main()
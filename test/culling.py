@@ -0,0 +1,96 @@
+import unittest
+import numpy as np
+import src.culling as c
+import src.mesh as m
+import src.simulation as sim
+from src.camera import Camera
+from src.scene import Scene, SceneObject
+
+
+def drawn_edges(strips) -> set:
+    return {tuple(sorted(pair)) for strip in strips for pair in zip(strip[:-1].tolist(), strip[1:].tolist())}
+
+
+class Normals(unittest.TestCase):
+    def setUp(self) -> None:
+        self.vertices, self.faces = sim.init_cuboid(np.zeros(3), 1, 2, 3)
+
+    def test_face_normals(self) -> None:
+        normals = c.face_normals(self.vertices, self.faces)
+        centers = self.vertices[self.faces].mean(axis=1)
+
+        self.assertTrue(np.allclose(np.cross(normals, centers), 0.))
+        self.assertTrue(np.all(np.einsum('ij,ij->i', normals, centers) < 0))
+
+    def test_outward_sign(self) -> None:
+        self.assertEqual(c.outward_sign(self.vertices, self.faces), -1)
+        self.assertEqual(c.outward_sign(self.vertices + 10., self.faces[:, ::-1]), 1)
+
+
+class CullerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        center = np.array([300., 300., 300.])
+        vertices, faces = sim.init_cuboid(np.zeros(3), 50, 50, 50)
+        self.scene = Scene(np.float64)
+        self.scene.add(SceneObject(vertices, np.array([1., 0., 0., 0.]), center), faces)
+        # A tetrahedron with outward normals, whose triangles are padded to the cuboid's quads.
+        self.scene.add(SceneObject(np.array([[0., 0., 0.], [20., 0., 0.], [0., 20., 0.], [0., 0., 20.]]),
+                                   np.array([1., 0., 0., 0.]),
+                                   np.array([100., 0., 0.])),
+                       np.array([[0, 2, 1], [0, 1, 3], [0, 3, 2], [1, 2, 3]]),
+                       0)
+        self.culler = c.scene_culler(self.scene, 800, 800)
+        self.camera = Camera(np.array([400., 400., -100.]), 1, 800, np.float64)
+
+    def cull(self):
+        vertices = self.scene.world_vertices()
+        points = self.camera.project(vertices)
+        return self.culler.visible_faces(vertices, points, self.camera), self.culler.cull(vertices, points, self.camera)
+
+    def test_orthographic(self) -> None:
+        visible, strips = self.cull()
+
+        # Only the cuboid's face nearest the camera, and the tetrahedron's face on the z = 0 plane, face it.
+        self.assertEqual(visible.tolist(), [False, True, False, False, False, False, True, False, False, False])
+        self.assertEqual(drawn_edges(strips), {(1, 3), (3, 7), (5, 7), (1, 5), (8, 10), (9, 10), (8, 9)})
+
+    def test_perspective(self) -> None:
+        self.camera.projection_method = 0
+        visible, strips = self.cull()
+
+        expected = set()
+        for face in self.culler.faces[visible]:
+            expected |= drawn_edges([np.append(face, face[0])])
+        expected = {edge for edge in expected if edge[0] != edge[1]}
+
+        self.assertEqual(drawn_edges(strips), expected)
+        self.assertLess(len(expected), len(drawn_edges(self.scene.strips)))
+
+    def test_strips_are_runs_of_scene_strips(self) -> None:
+        _, strips = self.cull()
+        path = np.concatenate(self.scene.strips).tolist()
+
+        for strip in strips:
+            strip = strip.tolist()
+            self.assertTrue(any(path[i:i + len(strip)] == strip for i in range(len(path))))
+
+    def test_off_screen(self) -> None:
+        self.scene.objects[0].center[:] = [2000., 300., 300.]
+        visible, strips = self.cull()
+
+        self.assertFalse(np.any(visible))
+        self.assertEqual(strips, [])
+
+    def test_all_edges_of_mesh(self) -> None:
+        faces = np.array([[0, 1, 2, 3]])
+        culler = c.Culler(faces, m.edge_strips(m.unique_edges(faces)[0]), np.array([1]), 10, 10)
+        vertices = np.array([[1., 1., 0.], [1., 5., 0.], [5., 5., 0.], [5., 1., 0.]])
+        camera = Camera(np.array([0., 0., -10.]), 1, 10, np.float64)
+
+        self.assertEqual(drawn_edges(culler.cull(vertices, camera.project(vertices), camera)),
+                         {(0, 1), (1, 2), (2, 3), (0, 3)})
+        self.assertEqual(culler.cull(vertices[:, [1, 0, 2]], camera.project(vertices[:, [1, 0, 2]]), camera), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
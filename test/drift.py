@@ -0,0 +1,49 @@
+import unittest
+import numpy as np
+import src.simulation as sim
+from src.drift import DriftMonitor
+
+
+class DriftMonitorTest(unittest.TestCase):
+    def test_histogram(self) -> None:
+        monitor = DriftMonitor(bins=np.array([0., 1e-6, 1e-3, np.inf]))
+        for orientation in (np.array([1., 0., 0., 0.]),
+                            np.array([1. + 1e-5, 0., 0., 0.]),
+                            np.array([0., 0., 2., 0.])):
+            monitor.observe(orientation)
+
+        self.assertTrue(np.array_equal(monitor.histogram, np.array([1, 1, 1])))
+        self.assertAlmostEqual(monitor.max_drift, 1.)
+
+    def test_renormalized_on_cadence(self) -> None:
+        monitor = DriftMonitor(renormalize_every=3, tolerance=1.)
+        orientation = np.array([1.5, 0., 0., 0.])
+
+        monitor.update(orientation)
+        monitor.update(orientation)
+        self.assertEqual(orientation[0], 1.5)
+        monitor.update(orientation)
+
+        self.assertTrue(np.allclose(orientation, np.array([1., 0., 0., 0.])))
+        self.assertEqual((monitor.updates, monitor.renormalizations), (3, 1))
+
+    def test_renormalized_beyond_tolerance(self) -> None:
+        monitor = DriftMonitor(renormalize_every=100, tolerance=1e-6)
+        orientation = np.array([0., 0.6, 0.8 + 1e-3, 0.])
+        monitor.update(orientation)
+
+        self.assertAlmostEqual(np.linalg.norm(orientation), 1.)
+        self.assertEqual(monitor.renormalizations, 1)
+
+    def test_long_interactive_session_stays_unit(self) -> None:
+        monitor = DriftMonitor(renormalize_every=16)
+        orientation = np.array([1., 0., 0., 0.])
+        for j in range(5000):
+            sim.rotation_script(np.pi / 80., orientation, j % 3, monitor)
+
+        self.assertLess(abs(np.linalg.norm(orientation) - 1.), 1e-12)
+        self.assertEqual(monitor.summary()["updates"], 5000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import src.headless as h
+import src.simulation as sim
+
+
+class RenderKeyframeAnimation(unittest.TestCase):
+    def setUp(self) -> None:
+        self.center = np.array([50., 50., 50.])
+        vertices, self.faces = sim.init_cuboid(self.center, 20, 20, 20)
+        self.reference_vertices = vertices - self.center
+        self.orientation_keyframes = np.array([[1., 0., 0., 0.],
+                                               [0.5, 0.5, 0.5, 0.5]])
+        self.center_keyframes = np.array([[40., 40., 50.],
+                                          [60., 60., 50.]])
+        self.camera_location = np.array([50., 50., -100.])
+
+    def render(self, output, projection_method: int = 1):
+        return h.render_keyframe_animation(output,
+                                           self.orientation_keyframes,
+                                           self.center_keyframes,
+                                           self.reference_vertices,
+                                           self.faces,
+                                           self.camera_location,
+                                           projection_method,
+                                           screen_width=100,
+                                           screen_height=80,
+                                           number_of_frames=4)
+
+    def test_raw_buffer(self) -> None:
+        rgb = np.zeros((4, 80, 100, 3), dtype=np.uint8)
+        self.assertIs(self.render(rgb), rgb)
+
+        white = np.all(rgb == 255, axis=-1)
+        self.assertTrue(np.all(np.any(~white, axis=(1, 2))))
+        self.assertTrue(np.all(white[:, 0, 0]))
+        self.assertFalse(np.array_equal(rgb[0], rgb[-1]))
+
+    def test_memory_mapped_file(self) -> None:
+        rgb = np.zeros((4, 80, 100, 3), dtype=np.uint8)
+        self.render(rgb, projection_method=0)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'frames.npy')
+            self.render(path, projection_method=0)
+            self.assertTrue(np.array_equal(np.load(path), rgb))
+
+    def test_image_files(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            self.assertIsNone(self.render(os.path.join(directory, 'frames', '{:02d}.bmp')))
+            self.assertEqual(sorted(os.listdir(os.path.join(directory, 'frames'))),
+                             ['00.bmp', '01.bmp', '02.bmp', '03.bmp'])
+
+    def test_image_file_without_field(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            with self.assertRaises(AssertionError):
+                self.render(os.path.join(directory, 'frame.bmp'))
+
+
+class RenderBatch(unittest.TestCase):
+    def setUp(self) -> None:
+        center = np.array([50., 50., 50.])
+        vertices, self.faces = sim.init_cuboid(center, 20, 20, 20)
+        self.reference_vertices = vertices - center
+        self.other_vertices = self.reference_vertices * 1.5
+
+    def job(self, output: str, reference_vertices: np.ndarray, angle: float) -> dict:
+        return {"output": output,
+                "orientation_keyframes": np.array([[1., 0., 0., 0.],
+                                                   [np.cos(angle), np.sin(angle), 0., 0.]]),
+                "center_keyframes": np.array([[40., 40., 50.],
+                                              [60., 60., 50.]]),
+                "reference_vertices": reference_vertices,
+                "faces": self.faces,
+                "camera_location": np.array([50., 50., -100.]),
+                "projection_method": 0,
+                "screen_width": 100,
+                "screen_height": 80,
+                "number_of_frames": 3}
+
+    def test_matches_serial_rendering(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            jobs = [self.job(os.path.join(directory, '{}.npy'.format(index)), vertices, angle)
+                    for index, (vertices, angle) in enumerate([(self.reference_vertices, 0.3),
+                                                               (self.other_vertices, 0.6),
+                                                               (self.reference_vertices, 0.9)])]
+            self.assertEqual(h.render_batch(jobs, processes=2), [job["output"] for job in jobs])
+
+            for job in jobs:
+                expected = np.zeros((3, 80, 100, 3), dtype=np.uint8)
+                h.render_keyframe_animation(**dict(job, output=expected))
+                self.assertTrue(np.array_equal(np.load(job["output"]), expected))
+
+    def test_image_files(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'frames', '{:02d}.bmp')
+            h.render_batch([self.job(output, self.reference_vertices, 0.3)])
+            self.assertEqual(sorted(os.listdir(os.path.join(directory, 'frames'))), ['00.bmp', '01.bmp', '02.bmp'])
+
+
+if __name__ == '__main__':
+    unittest.main()
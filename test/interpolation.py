@@ -22,5 +22,98 @@ class LinearInterpolation(unittest.TestCase):
         self.assertTrue(np.allclose(actual, expected))
 
 
+class Slerp(unittest.TestCase):
+    def setUp(self) -> None:
+        self.q0 = np.array([0.92387953, 0.38268343, 0., 0.])
+        self.q1 = np.array([0.5, -0.5, 0.5, 0.5])
+        self.t = np.linspace(0., 1., 11)
+
+    def test_endpoints_and_unit_norm(self) -> None:
+        actual = i.slerp(self.q0, self.q1, self.t)
+
+        self.assertEqual(actual.shape, (11, 4))
+        self.assertTrue(np.allclose(actual[0], self.q0))
+        self.assertTrue(np.allclose(actual[-1], self.q1))
+        self.assertTrue(np.allclose(np.linalg.norm(actual, axis=-1), 1.))
+
+    def test_constant_angular_speed(self) -> None:
+        actual = i.slerp(self.q0, self.q1, self.t)
+        steps = np.arccos(np.clip(np.sum(actual[:-1] * actual[1:], axis=-1), -1., 1.))
+
+        self.assertTrue(np.allclose(steps, steps[0]))
+
+    def test_shortest_path(self) -> None:
+        self.assertTrue(np.allclose(i.slerp(self.q0, -self.q1, self.t),
+                                    i.slerp(self.q0, self.q1, self.t)))
+
+    def test_small_angle(self) -> None:
+        q1 = self.q0 + np.array([0., 0., 1e-5, 0.])
+        actual = i.slerp(self.q0, q1, self.t)
+
+        self.assertTrue(np.allclose(np.linalg.norm(actual, axis=-1), 1.))
+        self.assertTrue(np.allclose(actual[-1], q1 / np.linalg.norm(q1)))
+
+
+class Nlerp(unittest.TestCase):
+    def test_unit_norm_and_midpoint(self) -> None:
+        q0 = np.array([1., 0., 0., 0.])
+        q1 = np.array([0., 1., 0., 0.])
+        actual = i.nlerp(q0, q1, np.array([0., 0.5, 1.]))
+        expected = np.array([[1., 0., 0., 0.],
+                             [np.sqrt(0.5), np.sqrt(0.5), 0., 0.],
+                             [0., 1., 0., 0.]])
+
+        self.assertTrue(np.allclose(actual, expected))
+
+
+class PairwiseSlerp(unittest.TestCase):
+    def test_near_antipodal_pairs(self) -> None:
+        q0 = np.array([[1., 0., 0., 0.]] * 3)
+        q1 = np.array([[-1., 1e-3, 0., 0.]] * 3)
+        q1 /= np.linalg.norm(q1, axis=-1)[:, None]
+        actual = i.pairwise_slerp(q0, q1, np.array([0.25, 0.5, 0.75]))
+
+        angles = np.arccos(np.clip(np.sum(q0 * actual, axis=-1), -1., 1.))
+
+        self.assertTrue(np.all(np.isfinite(actual)))
+        self.assertTrue(np.allclose(np.linalg.norm(actual, axis=-1), 1.))
+        self.assertTrue(np.allclose(angles, np.arccos(q1[0, 0]) * np.array([0.25, 0.5, 0.75])))
+
+
+class CatmullRomTangents(unittest.TestCase):
+    def test_non_uniform_times(self) -> None:
+        times = np.array([0., 1., 3.])
+        points = np.array([[0., 0.],
+                           [2., 1.],
+                           [4., 7.]])
+        expected = np.array([[2., 1.],
+                             [4. / 3., 7. / 3.],
+                             [1., 3.]])
+
+        self.assertTrue(np.allclose(i.catmull_rom_tangents(times, points), expected))
+
+
+class SquadControls(unittest.TestCase):
+    def test_collinear_keyframes(self) -> None:
+        quaternions = i.slerp(np.array([1., 0., 0., 0.]), np.array([0., 1., 0., 0.]), np.linspace(0., 1., 4))
+        controls = i.squad_controls(quaternions)
+
+        self.assertTrue(np.allclose(controls, quaternions))
+
+
+class Float32(unittest.TestCase):
+    def test_dtype_preserved(self) -> None:
+        keyframes = np.array([[1., 0., 0., 0.],
+                              [0.5, 0.5, 0.5, 0.5]], dtype=np.float32)
+        t = np.linspace(0., 1., 5)
+
+        self.assertEqual(i.linear_interpolation(keyframes, 5).dtype, np.float32)
+        self.assertEqual(i.slerp(keyframes[0], keyframes[1], t).dtype, np.float32)
+        self.assertEqual(i.nlerp(keyframes[0], keyframes[1], t).dtype, np.float32)
+        self.assertTrue(np.allclose(i.slerp(keyframes[0], keyframes[1], t),
+                                    i.slerp(keyframes[0].astype(np.float64), keyframes[1].astype(np.float64), t),
+                                    atol=1e-6))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+import numpy as np
+import src.kernels as k
+import src.quaternion as q
+from src.camera import Camera
+
+
+class KernelsTest(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = np.random.default_rng(0)
+        self.q = rng.normal(size=(5, 4))
+        self.p = rng.normal(size=(5, 4))
+        self.vertices = rng.normal(size=(20, 3))
+        self.rotation = q.rotation_matrix(q.rotation_quaternion(0.7, np.array([1., 2., 3.])))
+        self.center = np.array([1., -2., 3.])
+        self.camera = Camera(np.array([2., 1., -40.]), 0, 600, np.float64)
+
+    def test_hamilton_product(self) -> None:
+        expected = q.quaternion_multiplication(self.q, self.p)
+
+        self.assertTrue(np.allclose(k.hamilton_product(self.q, self.p), expected))
+        self.assertTrue(np.allclose(k.hamilton_product(self.q[0], self.p[0]), expected[0]))
+
+    def test_hamilton_product_strided(self) -> None:
+        buffer = np.zeros((10, 4))
+        out = k.hamilton_product(self.q[::-1], self.p[::-1], out=buffer[::2])
+
+        self.assertIs(out.base, buffer)
+        self.assertTrue(np.allclose(buffer[::2], q.quaternion_multiplication(self.q, self.p)[::-1]))
+        self.assertTrue(np.all(buffer[1::2] == 0.))
+
+    def test_hamilton_product_checks_arguments_once(self) -> None:
+        # The numpy backend forwards to quaternion_multiplication past its checks, which repeat hamilton_product's.
+        self.assertIs(k._quaternion_multiplication, q.quaternion_multiplication.unchecked)
+
+        with self.assertRaises(AssertionError):
+            k.hamilton_product(self.q, self.p[..., :3])
+
+    def test_hamilton_product_loop(self) -> None:
+        out = np.empty_like(self.q)
+        k._hamilton_product_loop(self.q, self.p, out)
+
+        self.assertTrue(np.allclose(out, q.quaternion_multiplication(self.q, self.p)))
+
+    def test_transform_project(self) -> None:
+        expected = self.camera.project(self.vertices @ self.rotation + self.center)
+        out = np.empty((20, 2))
+
+        self.assertIs(k.transform_project(self.vertices, self.rotation, self.center, self.camera.matrix, out), out)
+        self.assertTrue(np.allclose(out, expected))
+
+    def test_affine_project_loop(self) -> None:
+        matrix = self.rotation @ self.camera.matrix[:3]
+        offset = self.center @ self.camera.matrix[:3] + self.camera.matrix[3]
+        out = np.empty((20, 2))
+        k._affine_project_loop(self.vertices, matrix, offset, out)
+
+        self.assertTrue(np.allclose(out, self.camera.project(self.vertices @ self.rotation + self.center)))
+
+    def test_batched_transform(self) -> None:
+        offsets = np.array([0, 8, 8, 20])
+        rotations = q.rotation_matrix(q.rotation_quaternion(np.array([0.7, -0.2, 1.5]), np.eye(3)))
+        centers = np.array([[1., -2., 3.], [0., 0., 0.], [-4., 5., 6.]])
+        out = np.zeros((20, 3))
+
+        self.assertIs(k.batched_transform(self.vertices, offsets, rotations, centers, np.array([2]), out), out)
+        self.assertTrue(np.all(out[:8] == 0.))
+        self.assertTrue(np.allclose(out[8:], self.vertices[8:] @ rotations[2] + centers[2]))
+
+        points = k.batched_transform_project(self.vertices, offsets, rotations, centers, self.camera.matrix)
+        k.batched_transform(self.vertices, offsets, rotations, centers, np.arange(3), out)
+        self.assertTrue(np.allclose(points, self.camera.project(out)))
+
+    def test_float32(self) -> None:
+        camera = Camera(np.array([2., 1., -40.]), 0, 600, np.float32)
+        actual = k.transform_project(self.vertices.astype(np.float32),
+                                     self.rotation.astype(np.float32),
+                                     self.center.astype(np.float32),
+                                     camera.matrix)
+
+        self.assertEqual(actual.dtype, np.float32)
+        self.assertTrue(np.allclose(actual, self.camera.project(self.vertices @ self.rotation + self.center),
+                                    atol=1e-3))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,232 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import src.kernels as k
+import src.mesh as m
+
+
+class UniqueEdges(unittest.TestCase):
+    def test_shared_edges_listed_once(self) -> None:
+        faces = np.array([[0, 1, 2, 3],
+                          [1, 4, 5, 2]])
+        edges, face_edges = m.unique_edges(faces)
+        expected = np.array([[0, 1], [0, 3], [1, 2], [1, 4], [2, 3], [2, 5], [4, 5]])
+
+        self.assertTrue(np.array_equal(edges, expected))
+        self.assertTrue(np.array_equal(np.sort(faces[:, [0, 1]], axis=1), edges[face_edges[:, 0]]))
+        self.assertTrue(np.array_equal(np.sort(faces[:, [3, 0]], axis=1), edges[face_edges[:, 3]]))
+
+    def test_duplicate_faces(self) -> None:
+        faces = np.array([[0, 1, 2],
+                          [2, 1, 0]])
+        self.assertEqual(m.unique_edges(faces)[0].shape, (3, 2))
+
+
+class EdgeStrips(unittest.TestCase):
+    @staticmethod
+    def strip_edges(strips) -> np.ndarray:
+        sides = np.concatenate([np.stack((strip[:-1], strip[1:]), axis=1) for strip in strips])
+        sides.sort(axis=1)
+        return sides
+
+    def test_every_edge_drawn_once(self) -> None:
+        faces = np.array([[0, 4, 6, 2],
+                          [1, 3, 7, 5],
+                          [0, 2, 3, 1],
+                          [0, 1, 5, 4],
+                          [4, 5, 7, 6],
+                          [2, 6, 7, 3]])
+        edges, _ = m.unique_edges(faces)
+        sides = self.strip_edges(m.edge_strips(edges))
+
+        self.assertEqual(sides.shape[0], 12)
+        self.assertTrue(np.array_equal(np.unique(sides, axis=0), edges))
+
+    def test_closed_loop_is_one_strip(self) -> None:
+        edges, _ = m.unique_edges(np.array([[0, 1, 2, 3, 4]]))
+        strips = m.edge_strips(edges)
+
+        self.assertEqual(len(strips), 1)
+        self.assertEqual(strips[0].shape, (6,))
+
+    def test_disconnected_edges(self) -> None:
+        edges = np.array([[0, 1], [2, 3], [5, 6]])
+        strips = m.edge_strips(edges)
+
+        self.assertEqual(len(strips), 3)
+        self.assertTrue(np.array_equal(self.strip_edges(strips), edges))
+
+    def test_no_edges(self) -> None:
+        self.assertEqual(m.edge_strips(np.empty((0, 2), dtype=np.int64)), [])
+
+    def test_padded_faces(self) -> None:
+        edges, _ = m.unique_edges(np.array([[0, 1, 2, 2]]))
+        sides = self.strip_edges(m.edge_strips(edges))
+
+        self.assertTrue(np.array_equal(np.unique(sides, axis=0), [[0, 1], [0, 2], [1, 2]]))
+
+
+class Loaders(unittest.TestCase):
+    vertices = np.array([[0., 0., 0.],
+                         [1., 0., 0.],
+                         [1., 1., 0.],
+                         [0., 1., 0.],
+                         [0., 0., 1.5]])
+    faces = np.array([[0, 1, 2, 3],
+                      [4, 0, 1, 1]])
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def write(self, name: str, data: bytes) -> str:
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'wb') as file:
+            file.write(data)
+        return path
+
+    @staticmethod
+    def ply_header(file_format: str) -> bytes:
+        return ('ply\nformat {} 1.0\ncomment test\n'
+                'element vertex 5\nproperty float x\nproperty float y\nproperty float z\nproperty uchar red\n'
+                'element face 2\nproperty list uchar int vertex_indices\nend_header\n').format(file_format).encode()
+
+    def test_obj(self) -> None:
+        path = self.write('mesh.obj', b'# comment\nv 0 0 0\nv 1 0 0\nv\t1 1 0\nv 0 1 0\nvn 0 0 1\n'
+                                      b'v 0 0 1.5 0.2 0.3 0.4\nf 1/1/1 2/2/1 3//1 4\nf -1 1 2\n')
+        vertices, faces = m.load_obj(path, np.float32)
+
+        self.assertEqual(vertices.dtype, np.float32)
+        self.assertTrue(np.array_equal(vertices, self.vertices))
+        self.assertTrue(np.array_equal(faces, self.faces))
+
+    def test_obj_comments_and_indentation(self) -> None:
+        path = self.write('mesh.obj', b'v 0 0 0 # origin\n  v 1 0 0\nv 1 1 0\t\n\tv 0 1 0\nv 0 0 1.5#top\n'
+                                      b'f 1 2 3 4 # quad\n   f -1 1 2\n')
+        vertices, faces = m.load_obj(path, np.float64)
+
+        self.assertTrue(np.array_equal(vertices, self.vertices))
+        self.assertTrue(np.array_equal(faces, self.faces))
+
+    def test_obj_malformed_line(self) -> None:
+        path = self.write('mesh.obj', b'v 0 0 0\nv 1 x 0\nv 0 1 0\nf 1 2 3\n')
+        with self.assertRaisesRegex(ValueError, 'v 1 x 0'):
+            m.load_obj(path, np.float64)
+
+        path = self.write('mesh.obj', b'v 0 0 0\nv 1 0\nv 0 1 0\nf 1 2 3\n')
+        with self.assertRaisesRegex(ValueError, 'v 1 0'):
+            m.load_obj(path, np.float64)
+
+    def test_ascii_ply(self) -> None:
+        body = b''.join(b'%g %g %g 7\n' % tuple(vertex) for vertex in self.vertices) + b'4 0 1 2 3\n3 4 0 1\n'
+        vertices, faces = m.load_ply(self.write('mesh.ply', self.ply_header('ascii') + body), np.float64)
+
+        self.assertTrue(np.array_equal(vertices, self.vertices))
+        self.assertTrue(np.array_equal(faces, self.faces))
+
+    def test_binary_ply(self) -> None:
+        for order, file_format in (('<', 'binary_little_endian'), ('>', 'binary_big_endian')):
+            records = np.zeros(5, dtype=[('x', order + 'f4'), ('y', order + 'f4'), ('z', order + 'f4'), ('r', 'u1')])
+            records['x'], records['y'], records['z'] = self.vertices.T
+            triangles = np.zeros(2, dtype=[('count', 'u1'), ('indices', order + 'i4', (3,))])
+            triangles['count'] = 3
+            triangles['indices'] = self.faces[:, :3]
+            mixed = b''.join((b'\x04', np.array([0, 1, 2, 3], order + 'i4').tobytes(),
+                              b'\x03', np.array([4, 0, 1], order + 'i4').tobytes()))
+
+            path = self.write('triangles.ply', self.ply_header(file_format) + records.tobytes() + triangles.tobytes())
+            vertices, faces = m.load_ply(path, np.float64)
+            self.assertTrue(np.array_equal(vertices, self.vertices))
+            self.assertTrue(np.array_equal(faces, self.faces[:, :3]))
+
+            path = self.write('mixed.ply', self.ply_header(file_format) + records.tobytes() + mixed)
+            self.assertTrue(np.array_equal(m.load_ply(path, np.float64)[1], self.faces))
+
+    def test_ply_extra_face_properties(self) -> None:
+        header = ('ply\nformat {} 1.0\n'
+                  'element vertex 5\nproperty float x\nproperty float y\nproperty float z\n'
+                  'element face 2\nproperty uchar red\nproperty list uchar float texcoord\n'
+                  'property list uchar int vertex_indices\nproperty short flags\nend_header\n')
+
+        body = (b''.join(b'%g %g %g\n' % tuple(vertex) for vertex in self.vertices)
+                + b'7 2 0.5 0.5 4 0 1 2 3 -1\n9 0 3 4 0 1 2\n')
+        vertices, faces = m.load_ply(self.write('mesh.ply', header.format('ascii').encode() + body), np.float64)
+        self.assertTrue(np.array_equal(vertices, self.vertices))
+        self.assertTrue(np.array_equal(faces, self.faces))
+
+        for order, file_format in (('<', 'binary_little_endian'), ('>', 'binary_big_endian')):
+            body = b''.join((self.vertices.astype(order + 'f4').tobytes(),
+                             b'\x07\x02', np.array([.5, .5], order + 'f4').tobytes(),
+                             b'\x04', np.array([0, 1, 2, 3], order + 'i4').tobytes(),
+                             np.array(-1, order + 'i2').tobytes(),
+                             b'\x09\x00',
+                             b'\x03', np.array([4, 0, 1], order + 'i4').tobytes(), np.array(2, order + 'i2').tobytes()))
+            path = self.write('mixed.ply', header.format(file_format).encode() + body)
+            vertices, faces = m.load_ply(path, np.float64)
+            self.assertTrue(np.array_equal(vertices, self.vertices))
+            self.assertTrue(np.array_equal(faces, self.faces))
+
+    def test_binary_ply_many_mixed_faces(self) -> None:
+        rng = np.random.default_rng(0)
+        counts = rng.integers(3, 6, 1000)
+        indices = rng.integers(0, 5, counts.sum())
+        body = b''.join(bytes([count]) + face.astype('<i4').tobytes()
+                        for count, face in zip(counts, np.split(indices, np.cumsum(counts)[:-1])))
+        header = ('ply\nformat binary_little_endian 1.0\nelement vertex 5\nproperty float x\nproperty float y\n'
+                  'property float z\nelement face 1000\nproperty list uchar int vertex_indices\nend_header\n')
+
+        path = self.write('many.ply', header.encode() + self.vertices.astype('<f4').tobytes() + body)
+        faces = m.load_ply(path, np.float64)[1]
+        self.assertEqual(faces.shape, (1000, 5))
+        self.assertTrue(np.array_equal(faces[np.arange(5) < counts[:, None]], indices))
+
+    def test_cache(self) -> None:
+        path = self.write('mesh.obj', b'v 0 0 0\nv 1 0 0\nv 0 1 0\nf 1 2 3\n')
+        m.load_mesh(path, np.float64)
+        vertices, faces = m.load_mesh(path, np.float64)
+
+        self.assertIsInstance(vertices, np.memmap)
+        self.assertIsInstance(faces, np.memmap)
+        self.assertTrue(np.array_equal(faces, [[0, 1, 2]]))
+
+        self.write('mesh.obj', b'v 0 0 0\nv 2 0 0\nv 0 1 0\nf 1 2 3\n')
+        os.utime(path, (os.path.getmtime(path) + 10,) * 2)
+        self.assertEqual(m.load_mesh(path, np.float64)[0][1, 0], 2.)
+
+    def test_binary_ply_mixed_faces_in_chunks(self) -> None:
+        rng = np.random.default_rng(1)
+        counts = rng.integers(3, 6, 300)
+        indices = rng.integers(0, 5, counts.sum())
+        body = b''.join(bytes([count]) + face.astype('>i4').tobytes()
+                        for count, face in zip(counts, np.split(indices, np.cumsum(counts)[:-1])))
+        header = ('ply\nformat binary_big_endian 1.0\nelement vertex 5\nproperty float x\nproperty float y\n'
+                  'property float z\nelement face 300\nproperty list uchar int vertex_indices\nend_header\n')
+        path = self.write('chunks.ply', header.encode() + self.vertices.astype('>f4').tobytes() + body)
+
+        # Chunks smaller than some records, on the numpy backend, and the numba kernel where it is available.
+        for backend in ('numpy', k.BACKEND):
+            with mock.patch.object(k, 'BACKEND', backend), mock.patch.object(m, 'PLY_CHUNK', 16):
+                faces = m.load_ply(path, np.float64)[1]
+            self.assertTrue(np.array_equal(faces[np.arange(5) < counts[:, None]], indices))
+
+    def test_cache_in_read_only_directory(self) -> None:
+        path = self.write('mesh.obj', b'v 0 0 0\nv 1 0 0\nv 0 1 0\nf 1 2 3\n')
+        with mock.patch('builtins.open', side_effect=[open(path, 'rb'), PermissionError('read-only')]):
+            vertices, faces = m.load_mesh(path, np.float64)
+
+        self.assertTrue(np.array_equal(faces, [[0, 1, 2]]))
+        self.assertFalse(os.path.exists(path + '.float64.vertices.npy'))
+
+    def test_fit_to_box(self) -> None:
+        vertices = m.fit_to_box(self.vertices + 10., 3.)
+
+        self.assertTrue(np.allclose(vertices.min(axis=0), [-2., -2., -3.]))
+        self.assertTrue(np.allclose(vertices.max(axis=0), [2., 2., 3.]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -81,5 +81,130 @@ class RotationQuaternion(unittest.TestCase):
                                         expected))
 
 
+class QuaternionMultiplication(unittest.TestCase):
+    def setUp(self) -> None:
+        self.q = np.array([0.5, -1.5, 2., 3.])
+        self.p = np.array([-2., 1., 0.5, -1.])
+        self.expected = np.array([2.5, 0., -2.25, -9.25])
+
+    def test_one_pair(self) -> None:
+        self.assertTrue(np.allclose(s.quaternion_multiplication(self.q, self.p),
+                                    self.expected))
+
+    def test_multiple_pairs(self) -> None:
+        qs = np.stack((self.q, self.p, self.q))
+        ps = np.stack((self.p, self.q, self.q))
+        expected = np.stack((self.expected,
+                             s.quaternion_multiplication(self.p, self.q),
+                             s.quaternion_multiplication(self.q, self.q)))
+
+        self.assertTrue(np.allclose(s.quaternion_multiplication(qs, ps), expected))
+
+    def test_broadcasting(self) -> None:
+        ps = np.stack((self.p, self.p))
+        self.assertTrue(np.allclose(s.quaternion_multiplication(self.q, ps),
+                                    np.stack((self.expected, self.expected))))
+
+    def test_out(self) -> None:
+        out = np.full((2, 4), np.nan)
+        result = s.quaternion_multiplication(np.stack((self.q, self.q)), self.p, out=out)
+
+        self.assertIs(result, out)
+        self.assertTrue(np.allclose(out, np.stack((self.expected, self.expected))))
+
+    def test_out_overlapping_input(self) -> None:
+        with self.assertRaises(AssertionError):
+            s.quaternion_multiplication(self.q, self.p, out=self.q)
+
+
+class QVQInverse(unittest.TestCase):
+    def setUp(self) -> None:
+        self.quaternions = np.array([[0.92387953, 0.38268343, 0., 0.],
+                                     [1., 2., -3., 0.5],
+                                     [-0.5, 0.1, 0.7, 2.]])
+        self.vectors = np.array([[0., 1., 2., 3.],
+                                 [0., -4., 0.5, 6.]])
+
+    @staticmethod
+    def chained_multiplication(q: np.ndarray, v: np.ndarray) -> np.ndarray:
+        return s.quaternion_multiplication(s.quaternion_multiplication(q, v), s.quaternion_inverse(q))
+
+    def test_one_quaternion(self) -> None:
+        expected = np.stack([self.chained_multiplication(self.quaternions[1], v) for v in self.vectors])
+        self.assertTrue(np.allclose(s.qvq_inverse(self.quaternions[1], self.vectors), expected))
+
+    def test_multiple_quaternions_shared_vectors(self) -> None:
+        expected = np.stack([np.stack([self.chained_multiplication(q, v) for v in self.vectors])
+                             for q in self.quaternions])
+        self.assertTrue(np.allclose(s.qvq_inverse(self.quaternions, self.vectors), expected))
+
+    def test_multiple_quaternions_multiple_vector_sets(self) -> None:
+        vector_sets = np.stack((self.vectors, -self.vectors, 2 * self.vectors))
+        expected = np.stack([np.stack([self.chained_multiplication(q, v) for v in vectors])
+                             for q, vectors in zip(self.quaternions, vector_sets)])
+        self.assertTrue(np.allclose(s.qvq_inverse(self.quaternions, vector_sets), expected))
+
+    def test_mismatched_number_of_vector_sets(self) -> None:
+        with self.assertRaises(AssertionError):
+            s.qvq_inverse(self.quaternions, np.stack((self.vectors, self.vectors)))
+
+
+class RotationMatrix(unittest.TestCase):
+    def test_quarter_turn_about_z(self) -> None:
+        matrix = s.rotation_matrix(s.rotation_quaternion(np.pi / 2, np.array([0., 0., 1.])))
+        self.assertTrue(np.allclose(np.array([1., 0., 0.]) @ matrix, np.array([0., -1., 0.])))
+
+    def test_stacked(self) -> None:
+        quaternions = np.array([[1., 0., 0., 0.],
+                                [2., 0., 0., 0.],
+                                [0., 1., 0., 0.]])
+        expected = np.array([np.eye(3),
+                             np.eye(3),
+                             np.diag([1., -1., -1.])])
+        self.assertTrue(np.allclose(s.rotation_matrix(quaternions), expected))
+
+    def test_assume_unit(self) -> None:
+        quaternions = s.rotation_quaternion(np.array([0.3, 2., -1.]), np.array([[1., 2., 3.],
+                                                                                [0., 1., 0.],
+                                                                                [-1., 0., 5.]]))
+        self.assertTrue(np.allclose(s.rotation_matrix(quaternions, assume_unit=True),
+                                    s.rotation_matrix(quaternions)))
+
+
+class QuaternionLogExp(unittest.TestCase):
+    def test_round_trip(self) -> None:
+        quaternions = np.array([[1., 0., 0., 0.],
+                                [0.5, 0.5, 0.5, 0.5],
+                                [0.92387953, 0.38268343, 0., 0.]])
+        self.assertTrue(np.allclose(s.quaternion_exp(s.quaternion_log(quaternions)), quaternions))
+
+    def test_log_is_half_angle_axis(self) -> None:
+        quaternion = s.rotation_quaternion(1.2, np.array([0., 0., 1.]))
+        self.assertTrue(np.allclose(s.quaternion_log(quaternion), np.array([0., 0., 0., -0.6])))
+
+
+class Float32(unittest.TestCase):
+    def setUp(self) -> None:
+        self.q = np.array([0.5, -1.5, 2., 3.], dtype=np.float32)
+        self.p = np.array([[-2., 1., 0.5, -1.],
+                           [1., 0., 0., 0.]], dtype=np.float32)
+
+    def test_dtype_preserved(self) -> None:
+        self.assertEqual(s.quaternion_multiplication(self.q, self.p).dtype, np.float32)
+        self.assertEqual(s.quaternion_inverse(self.p).dtype, np.float32)
+        self.assertEqual(s.rotation_matrix(self.p).dtype, np.float32)
+        self.assertEqual(s.qvq_inverse(self.q, self.p).dtype, np.float32)
+        self.assertEqual(s.vector_to_quaternion(self.p[:, 1:]).dtype, np.float32)
+
+    def test_matches_float64(self) -> None:
+        self.assertTrue(np.allclose(s.quaternion_multiplication(self.q, self.p),
+                                    s.quaternion_multiplication(self.q.astype(np.float64), self.p.astype(np.float64)),
+                                    rtol=1e-6))
+
+    def test_mixed_precision(self) -> None:
+        with self.assertRaises(AssertionError):
+            s.quaternion_multiplication(self.q, self.p.astype(np.float64))
+
+
 if __name__ == '__main__':
     unittest.main()
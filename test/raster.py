@@ -0,0 +1,130 @@
+import unittest
+from unittest import mock
+import numpy as np
+import pygame
+import src.culling as c
+import src.kernels as k
+import src.raster as r
+import src.simulation as sim
+from src.camera import Camera
+
+
+class Triangulate(unittest.TestCase):
+    def test_quads(self) -> None:
+        triangles, triangle_faces = r.triangulate(np.array([[0, 1, 2, 3], [4, 5, 6, 7]]))
+
+        self.assertEqual(triangles.tolist(), [[0, 1, 2], [0, 2, 3], [4, 5, 6], [4, 6, 7]])
+        self.assertEqual(triangle_faces.tolist(), [0, 0, 1, 1])
+
+    def test_padded_faces(self) -> None:
+        triangles, triangle_faces = r.triangulate(np.array([[0, 1, 2, 2], [3, 4, 5, 6]]))
+
+        self.assertEqual(triangles.tolist(), [[0, 1, 2], [3, 4, 5], [3, 5, 6]])
+        self.assertEqual(triangle_faces.tolist(), [0, 1, 1])
+
+
+class RasterizerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.surface = pygame.Surface((40, 30), depth=32)
+        self.camera = Camera(np.array([20., 15., -100.]), 1, 30, np.float64)
+        # Two squares facing the camera, the second nearer and overlapping the first's bottom right quarter.
+        self.vertices = np.array([[10., 5., 5.], [20., 5., 5.], [20., 15., 5.], [10., 15., 5.],
+                                  [15., 0., 1.], [25., 0., 1.], [25., 10., 1.], [15., 10., 1.]])
+        self.faces = np.array([[0, 1, 2, 3], [4, 5, 6, 7]])
+
+    def draw(self, faces: np.ndarray, visible=None) -> pygame.Rect:
+        rasterizer = r.Rasterizer(faces, 40, 30)
+        return rasterizer.draw(self.surface, self.vertices, self.camera.project(self.vertices), self.camera, visible)
+
+    def colors(self) -> np.ndarray:
+        return pygame.surfarray.array3d(self.surface)
+
+    def test_coverage(self) -> None:
+        rect = self.draw(self.faces[:1])
+        covered = np.any(self.colors() != r.BACKGROUND_COLOR, axis=-1)
+
+        # y = 5 to 15 in world frame is rows 15 to 25 on the screen.
+        expected = np.zeros((40, 30), dtype=bool)
+        expected[10:20, 15:25] = True
+        self.assertTrue(np.array_equal(covered, expected))
+        self.assertEqual(rect, pygame.Rect(10, 15, 10, 10))
+        self.assertTrue(np.all(self.colors()[expected] == r.FACE_COLOR))
+
+    def test_depth_order(self) -> None:
+        nearest = []
+        for z in (1., 9.):
+            self.vertices[4:, 2] = z
+            for faces in (self.faces, self.faces[::-1]):
+                rasterizer = r.Rasterizer(faces, 40, 30)
+                # Squares told apart by color: the first one dark, the second one light.
+                rasterizer.shades = lambda vertices, camera: np.where((faces[:, :1] == 0), 10, 250).repeat(3, axis=1)
+                rasterizer.draw(self.surface, self.vertices, self.camera.project(self.vertices), self.camera)
+                nearest.append(self.colors()[17, 22].tolist())
+
+        # The overlap shows the nearer square whichever order the faces are in.
+        self.assertEqual(nearest, [[250, 250, 250]] * 2 + [[10, 10, 10]] * 2)
+
+    def test_culled_faces_are_not_drawn(self) -> None:
+        self.draw(self.faces, np.array([True, False]))
+        covered = np.any(self.colors() != r.BACKGROUND_COLOR, axis=-1)
+
+        self.assertEqual(covered.sum(), 100)
+
+    def test_off_screen(self) -> None:
+        self.vertices[:, 0] += 1000.
+
+        self.assertEqual(self.draw(self.faces), pygame.Rect(0, 0, 0, 0))
+        self.assertTrue(np.all(self.colors() == r.BACKGROUND_COLOR))
+
+    def test_back_faces_are_hidden(self) -> None:
+        vertices, faces = sim.init_cuboid(np.array([300., 300., 300.]), 50, 50, 50)
+        camera = Camera(np.array([400., 400., -100.]), 0, 800, np.float64)
+        surface = pygame.Surface((800, 800), depth=32)
+        rasterizer = r.Rasterizer(faces, 800, 800)
+        points = camera.project(vertices)
+
+        rasterizer.draw(surface, vertices, points, camera)
+        everything = pygame.surfarray.array3d(surface)
+
+        culler = c.Culler(faces, [], np.full(6, c.outward_sign(vertices, faces)), 800, 800)
+        rasterizer.draw(surface, vertices, points, camera, culler.visible_faces(vertices, points, camera))
+
+        # Back faces only tie with front faces along their shared edges, where either may be drawn.
+        covered = np.any(everything != r.BACKGROUND_COLOR, axis=-1)
+        differences = np.any(pygame.surfarray.array3d(surface) != everything, axis=-1)
+        self.assertLess(differences.sum(), 0.01 * covered.sum())
+        self.assertGreater(np.unique(everything[covered], axis=0).shape[0], 1)
+
+    def test_hidden_triangles_are_skipped(self) -> None:
+        # A square at depth 5 covering the whole screen.
+        vertices = np.array([[-5., -5., 5.], [45., -5., 5.], [45., 35., 5.], [-5., 35., 5.]])
+        rasterizer = r.Rasterizer(self.faces[:1], 40, 30)
+        rasterizer.draw(self.surface, vertices, self.camera.project(vertices), self.camera)
+
+        # Triangles behind the square and in front of it, and one whose bounding box spans three tiles.
+        hidden = rasterizer._hidden(np.array([6., 4., 6.], dtype=np.float32), np.array([16, 16, 0]),
+                                    np.array([23, 23, 7]), np.array([11, 11, 0]), np.array([18, 18, 20]))
+        self.assertEqual(hidden.tolist(), [True, False, False])
+
+    def test_backends_agree(self) -> None:
+        vertices, faces = sim.init_cuboid(np.array([300., 300., 300.]), 50, 50, 50)
+        vertices = np.concatenate((vertices, vertices + np.array([30., 20., 40.])))
+        faces = np.concatenate((faces, faces + 8))
+        surface = pygame.Surface((800, 800), depth=32)
+
+        images = []
+        for projection_method in (0, 1):
+            camera = Camera(np.array([380., 360., -100.]), projection_method, 800, np.float64)
+            for backend in (k.BACKEND, "numpy"):
+                with mock.patch.object(k, "BACKEND", backend):
+                    rect = r.Rasterizer(faces, 800, 800).draw(surface, vertices, camera.project(vertices), camera)
+                images.append((rect, pygame.surfarray.array3d(surface)))
+
+        for (rect, image), (numpy_rect, numpy_image) in (images[:2], images[2:]):
+            self.assertEqual(rect, numpy_rect)
+            # Pixels on the edges shared by faces may go to either face.
+            self.assertLess(np.any(image != numpy_image, axis=-1).sum(), 0.01 * rect.width * rect.height)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import src.quaternion as q
+import src.simulation as sim
+from src.camera import Camera
+from src.raster import Rasterizer
+from src.recording import HEADER_SIZE, TrackReader, TrackRecorder, record_dtype
+from src.track import AnimationTrack
+
+
+class RecordingTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'poses.track')
+
+        rng = np.random.default_rng(0)
+        self.times = np.cumsum(rng.uniform(0.01, 0.05, 50))
+        self.orientations = q.normalize(rng.normal(size=(50, 4)) * 0.1 + np.array([1., 0., 0., 0.]))
+        self.centers = rng.normal(size=(50, 3))
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def record(self, **kwargs) -> None:
+        with TrackRecorder(self.path, np.float64, **kwargs) as recorder:
+            for time, orientation, center in zip(self.times, self.orientations, self.centers):
+                recorder.record(time, orientation, center)
+
+    def test_round_trip(self) -> None:
+        self.record(buffer_size=7)
+        reader = TrackReader(self.path)
+
+        self.assertEqual(len(reader), 50)
+        self.assertEqual(os.path.getsize(self.path), HEADER_SIZE + 50 * record_dtype(np.float64).itemsize)
+        self.assertTrue(np.array_equal(reader.records['time'], self.times))
+        self.assertTrue(np.array_equal(reader.records['orientation'], self.orientations))
+        self.assertTrue(np.array_equal(reader.records['center'], self.centers))
+
+    def test_idle_runs_keep_their_ends(self) -> None:
+        with TrackRecorder(self.path, np.float64) as recorder:
+            for time in range(10):
+                recorder.record(float(time), self.orientations[0], self.centers[0])
+            recorder.record(10., self.orientations[1], self.centers[1])
+            recorder.record(10., self.orientations[2], self.centers[2])
+
+        self.assertTrue(np.array_equal(TrackReader(self.path).records['time'], [0., 9., 10.]))
+
+    def test_append(self) -> None:
+        self.record()
+        with open(self.path, 'ab') as file:
+            file.write(b'\x00' * 5)
+
+        with TrackRecorder(self.path, np.float64) as recorder:
+            recorder.record(self.times[-1], self.orientations[0], self.centers[0])
+            recorder.record(self.times[-1] + 1., self.orientations[0], self.centers[0])
+
+        self.assertEqual(len(TrackReader(self.path)), 51)
+
+    def test_streamed_evaluation_matches_whole_track(self) -> None:
+        self.record()
+        reader = TrackReader(self.path)
+        track = AnimationTrack(self.times, self.orientations, self.centers)
+        sample_times = np.linspace(self.times[0] - 1., self.times[-1] + 1., 200)
+
+        for chunk in np.array_split(sample_times, 17):
+            orientations, centers = reader.evaluate(chunk)
+            expected_orientations, expected_centers = track.evaluate(chunk)
+
+            self.assertTrue(np.allclose(np.abs(np.sum(orientations * expected_orientations, axis=-1)), 1.))
+            self.assertTrue(np.allclose(centers, expected_centers))
+
+    def test_play_recording_script(self) -> None:
+        self.times = self.times[:5] - self.times[0]
+        self.record()
+        vertices, faces = sim.init_cuboid(np.zeros(3), 5, 5, 5)
+        camera = Camera(np.array([0., 0., -100.]), 1, 100, np.float64)
+
+        with TrackRecorder(self.path, np.float64) as recorder, \
+                mock.patch.object(sim, "render") as render, \
+                mock.patch("pygame.event.get", return_value=[]):
+            sim.play_recording_script(None, recorder, vertices, faces, camera, 1000)
+
+        self.assertEqual(render.call_count, np.arange(0., self.times[-1], 1e-3).shape[0])
+
+    def test_play_recording_script_filled(self) -> None:
+        self.times = self.times[:5] - self.times[0]
+        self.record()
+        vertices, faces = sim.init_cuboid(np.zeros(3), 5, 5, 5)
+        camera = Camera(np.array([0., 0., -100.]), 1, 100, np.float64)
+        rasterizer = Rasterizer(faces, 100, 100)
+
+        with TrackRecorder(self.path, np.float64) as recorder, \
+                mock.patch.object(sim, "render") as render, \
+                mock.patch.object(sim, "render_filled") as render_filled, \
+                mock.patch("pygame.event.get", return_value=[]):
+            sim.play_recording_script(None, recorder, vertices, faces, camera, 1000, rasterizer)
+
+        render.assert_not_called()
+        self.assertEqual(render_filled.call_count, np.arange(0., self.times[-1], 1e-3).shape[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
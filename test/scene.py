@@ -0,0 +1,162 @@
+import unittest
+import numpy as np
+import src.quaternion as q
+import src.transformations as t
+from src.camera import Camera
+from src.scene import Scene, SceneObject
+
+
+class SceneObjectTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.reference_vertices = np.array([[1., 0., 0.],
+                                            [0., 2., 0.],
+                                            [1., 2., 3.]])
+        self.orientation = q.rotation_quaternion(0.7, np.array([1., 1., 0.]))
+        self.center = np.array([10., 20., 30.])
+        self.scene_object = SceneObject(self.reference_vertices, self.orientation, self.center)
+
+    def test_world_vertices(self) -> None:
+        expected = t.quaternion_rotation(self.orientation, self.reference_vertices) + self.center
+        self.assertTrue(np.allclose(self.scene_object.world_vertices(), expected))
+
+    def test_recomputed_only_when_pose_changes(self) -> None:
+        first = self.scene_object.world_vertices().copy()
+        self.assertFalse(self.scene_object.pose_changed())
+        self.scene_object.world_vertices()
+        self.assertEqual(self.scene_object.cache.misses, 1)
+        self.assertEqual(self.scene_object.cache.hits, 0)
+
+        self.center[1] += 5.
+        self.assertTrue(self.scene_object.pose_changed())
+        self.assertTrue(np.allclose(self.scene_object.world_vertices(), first + np.array([0., 5., 0.])))
+        self.assertEqual(self.scene_object.cache.hits, 1)
+
+    def test_orientation_mutated_in_place(self) -> None:
+        self.scene_object.world_vertices()
+        self.orientation[:] = np.array([1., 0., 0., 0.])
+
+        self.assertTrue(np.allclose(self.scene_object.world_vertices(), self.reference_vertices + self.center))
+
+    def test_buffers_allocated_on_first_use(self) -> None:
+        self.assertIsNone(self.scene_object._world_vertices)
+        self.assertIsNone(self.scene_object._points)
+
+        Scene(np.float64).add(self.scene_object, np.array([[0, 1, 2]]))
+        self.assertIsNone(self.scene_object._world_vertices)
+        self.assertIsNone(self.scene_object._points)
+
+    def test_project(self) -> None:
+        camera = Camera(np.array([1., 2., -50.]), 0, 600, np.float64)
+        expected = camera.project(self.scene_object.world_vertices()).copy()
+
+        self.assertTrue(np.allclose(self.scene_object.project(camera), expected))
+
+
+class SceneTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.parent_orientation = q.rotation_quaternion(0.7, np.array([1., 1., 0.]))
+        self.parent_center = np.array([10., 20., 30.])
+        self.child_orientation = q.rotation_quaternion(-1.2, np.array([0., 1., 2.]))
+        self.child_center = np.array([5., 0., 0.])
+        self.parent_vertices = np.array([[1., 0., 0.],
+                                         [0., 2., 0.],
+                                         [1., 2., 3.]])
+        self.child_vertices = np.array([[0., 0., 1.],
+                                        [1., 1., 1.]])
+
+        self.scene = Scene(np.float64)
+        parent = self.scene.add(SceneObject(self.parent_vertices, self.parent_orientation, self.parent_center),
+                                np.array([[0, 1, 2]]))
+        self.scene.add(SceneObject(self.child_vertices, self.child_orientation, self.child_center),
+                       np.array([[0, 1]]),
+                       parent)
+
+    def expected_child_vertices(self) -> np.ndarray:
+        in_parent_frame = t.quaternion_rotation(self.child_orientation, self.child_vertices) + self.child_center
+        return t.quaternion_rotation(self.parent_orientation, in_parent_frame) + self.parent_center
+
+    def test_world_vertices(self) -> None:
+        vertices = self.scene.world_vertices()
+
+        self.assertEqual(vertices.shape, (5, 3))
+        self.assertTrue(np.allclose(vertices[:3], t.quaternion_rotation(self.parent_orientation, self.parent_vertices)
+                                    + self.parent_center))
+        self.assertTrue(np.allclose(vertices[3:], self.expected_child_vertices()))
+
+    def test_world_pose(self) -> None:
+        orientation, center = self.scene.world_pose(1)
+        expected = t.quaternion_rotation(orientation, self.child_vertices) + center
+
+        self.assertTrue(np.allclose(expected, self.expected_child_vertices()))
+
+    def test_only_dirty_subtree_updated(self) -> None:
+        self.assertTrue(np.array_equal(self.scene.update(), [True, True]))
+        self.assertTrue(np.array_equal(self.scene.update(), [False, False]))
+
+        self.child_center[0] += 1.
+        self.assertTrue(np.array_equal(self.scene.update(), [False, True]))
+
+        self.parent_orientation[:] = q.rotation_quaternion(0.2, np.array([0., 0., 1.]))
+        self.assertTrue(np.array_equal(self.scene.update(), [True, True]))
+        self.assertTrue(np.allclose(self.scene.world_vertices()[3:], self.expected_child_vertices()))
+
+    def test_grandchild_follows_root(self) -> None:
+        grandchild_orientation = q.rotation_quaternion(0.4, np.array([1., 0., 0.]))
+        grandchild_center = np.array([0., 3., 0.])
+        self.scene.add(SceneObject(self.child_vertices, grandchild_orientation, grandchild_center),
+                       np.array([[0, 1]]),
+                       1)
+        self.scene.update()
+
+        self.parent_orientation[:] = q.rotation_quaternion(-0.5, np.array([0., 1., 0.]))
+        self.assertTrue(np.array_equal(self.scene.update(), [True, True, True]))
+
+        child_orientation, child_center = self.scene.world_pose(1)
+        in_child_frame = t.quaternion_rotation(grandchild_orientation, self.child_vertices) + grandchild_center
+        expected = t.quaternion_rotation(child_orientation, in_child_frame) + child_center
+        self.assertTrue(np.allclose(self.scene.world_vertices()[5:], expected))
+
+    def test_batched_strips(self) -> None:
+        self.assertTrue(np.array_equal(np.sort(np.concatenate(self.scene.strips)), [0, 0, 1, 2, 3, 4]))
+        self.assertTrue(np.array_equal(self.scene.offsets, [0, 3, 5]))
+
+    def test_many_objects(self) -> None:
+        centers = np.arange(300.).reshape(100, 3)
+        for center in centers:
+            self.scene.add(SceneObject(self.child_vertices, np.array([1., 0., 0., 0.]), center), np.array([[0, 1]]))
+
+        self.assertEqual(len(self.scene), 102)
+        self.assertTrue(np.array_equal(self.scene.offsets, np.r_[0, 3:206:2]))
+        vertices = self.scene.world_vertices()
+        self.assertEqual(vertices.shape, (205, 3))
+        self.assertTrue(np.allclose(vertices[3:5], self.expected_child_vertices()))
+        self.assertTrue(np.allclose(vertices[5:].reshape(100, 2, 3), self.child_vertices + centers[:, None]))
+
+    def test_project(self) -> None:
+        camera = Camera(np.array([1., 2., -50.]), 0, 600, np.float64)
+        points = self.scene.project(camera).copy()
+
+        self.assertTrue(np.allclose(points, camera.project(self.scene.world_vertices())))
+
+    def test_project_after_move(self) -> None:
+        camera = Camera(np.array([1., 2., -50.]), 1, 600, np.float64)
+        self.scene.project(camera)
+        self.child_center[0] += 1.
+
+        self.assertTrue(np.allclose(self.scene.project(camera)[3:], camera.project(self.expected_child_vertices())))
+        self.assertTrue(np.allclose(self.scene.world_vertices()[3:], self.expected_child_vertices()))
+
+    def test_matrices_from_object_caches(self) -> None:
+        parent, child = self.scene.objects
+        self.scene.update()
+        self.assertEqual((parent.cache.misses, child.cache.misses), (1, 1))
+
+        # The child's matrix is cached by its world orientation, which a translation does not change.
+        self.parent_center[0] += 1.
+        self.scene.update()
+        self.assertEqual((parent.cache.hits, child.cache.hits), (1, 1))
+        self.assertTrue(np.allclose(self.scene.world_vertices()[3:], self.expected_child_vertices()))
+
+
+if __name__ == '__main__':
+    unittest.main()
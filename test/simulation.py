@@ -1,5 +1,12 @@
+import collections
 import unittest
+from unittest import mock
+import pygame
+import src.config as config
 import src.simulation as sim
+import src.transformations as t
+from src.raster import Rasterizer
+from src.scene import SceneObject
 import numpy as np
 
 
@@ -74,5 +81,168 @@ class RecordKeyframes(unittest.TestCase):
         self.assertTrue(np.array_equal(self.orientation2, expected_original_orientation))  # add assertion here
 
 
+class Control(unittest.TestCase):
+    def setUp(self) -> None:
+        self.calls = []
+        self.key_to_action = {pygame.K_a: (self.calls.append, ("a",)),
+                              pygame.K_d: (self.calls.append, ("d",))}
+
+    def test_pressed_key(self) -> None:
+        pressed = collections.defaultdict(bool, {pygame.K_d: True})
+        with mock.patch("pygame.key.get_pressed", return_value=pressed):
+            self.assertTrue(sim.control(self.key_to_action))
+        self.assertEqual(self.calls, ["d"])
+
+    def test_no_pressed_key(self) -> None:
+        with mock.patch("pygame.key.get_pressed", return_value=collections.defaultdict(bool)):
+            self.assertFalse(sim.control(self.key_to_action))
+        self.assertEqual(self.calls, [])
+
+    def test_action_that_changed_nothing(self) -> None:
+        pressed = collections.defaultdict(bool, {pygame.K_p: True})
+        with mock.patch("pygame.key.get_pressed", return_value=pressed):
+            self.assertFalse(sim.control({pygame.K_p: (lambda: False, ())}))
+
+
+class BoundingRect(unittest.TestCase):
+    def setUp(self) -> None:
+        self.surface = pygame.Surface((100, 80))
+
+    def test_inside_surface(self) -> None:
+        points = np.array([[10.2, 20.7],
+                           [30.5, 5.],
+                           [np.nan, 0.]])
+        self.assertEqual(sim.bounding_rect(self.surface, points), pygame.Rect(9, 4, 24, 19))
+
+    def test_clipped_to_surface(self) -> None:
+        points = np.array([[-10., 50.],
+                           [500., 60.]])
+        self.assertEqual(sim.bounding_rect(self.surface, points), pygame.Rect(0, 49, 100, 13))
+
+
+class Present(unittest.TestCase):
+    def setUp(self) -> None:
+        self.screen = pygame.Surface((100, 80))
+
+    def test_union_with_previous_rect(self) -> None:
+        with mock.patch("pygame.display.update") as update:
+            sim.present(self.screen, pygame.Rect(50, 40, 10, 10), pygame.Rect(30, 20, 10, 10))
+        update.assert_called_once_with(pygame.Rect(30, 20, 30, 30))
+
+    def test_empty_rect_skipped(self) -> None:
+        with mock.patch("pygame.display.update") as update:
+            sim.present(self.screen, pygame.Rect(0, 0, 0, 0), pygame.Rect(30, 20, 10, 10))
+        update.assert_called_once_with(pygame.Rect(30, 20, 10, 10))
+
+    def test_both_rects_empty(self) -> None:
+        with mock.patch("pygame.display.update") as update:
+            sim.present(self.screen, pygame.Rect(0, 0, 0, 0), pygame.Rect(0, 0, 0, 0))
+        update.assert_not_called()
+
+
+class Scripts(unittest.TestCase):
+    def setUp(self) -> None:
+        self.center = np.array([300., 300., 300.])
+        self.vertices, _ = sim.init_cuboid(self.center, 50, 40, 30)
+        self.orientation = np.array([1., 0., 0., 0.])
+        self.scene_object = SceneObject(self.vertices - self.center, self.orientation, self.center)
+
+    def test_rotation_matches_rotating_vertices(self) -> None:
+        vertices = self.vertices.copy()
+        center = self.center.copy()
+        for speed, axis, rotation in ((0.3, 0, t.rotation_about_x),
+                                      (-0.2, 1, t.rotation_about_y),
+                                      (0.5, 2, t.rotation_about_z)):
+            sim.rotation_script(speed, self.orientation, axis)
+            rotation(center, vertices, speed)
+
+        self.assertTrue(np.allclose(self.scene_object.world_vertices(), vertices))
+
+    def test_translation(self) -> None:
+        sim.translation_script(self.center, -5., 1)
+
+        self.assertTrue(np.array_equal(self.center, np.array([300., 295., 300.])))
+        self.assertTrue(np.allclose(self.scene_object.world_vertices(), self.vertices + np.array([0., -5., 0.])))
+
+    def test_keyframe_animation_filled(self) -> None:
+        _, faces = sim.init_cuboid(self.center, 50, 40, 30)
+        screen = pygame.Surface((800, 800))
+        orientation_keyframes = np.array([[1., 0., 0., 0.], [0., 1., 0., 0.]])
+        center_keyframes = np.array([self.center, self.center + 10.])
+        rasterizer = Rasterizer(faces, 800, 800)
+
+        with mock.patch.object(sim, "render") as render, \
+                mock.patch.object(sim, "render_filled") as render_filled, \
+                mock.patch("pygame.time.Clock"):
+            self.assertTrue(sim.play_keyframe_animation_script(screen, np.array([400., 400., -100.]), 1,
+                                                               orientation_keyframes, center_keyframes,
+                                                               self.vertices - self.center, faces, 30, 5,
+                                                               rasterizer=rasterizer))
+
+        render.assert_not_called()
+        self.assertEqual(render_filled.call_count, 5)
+        self.assertIs(render_filled.call_args.args[1], rasterizer)
+
+
+    def test_keyframe_animation_keeps_outer_frame(self) -> None:
+        _, faces = sim.init_cuboid(self.center, 50, 40, 30)
+        settings = sim.load_settings()
+        timer, playback_timer = settings["timer"], settings["playback_timer"]
+        timer.enabled = playback_timer.enabled = True
+        orientation_keyframes = np.array([[1., 0., 0., 0.], [0., 1., 0., 0.]])
+        center_keyframes = np.array([self.center, self.center + 10.])
+
+        timer.start_frame()
+        timer.mark("control")
+        control = timer._row[timer._indices["control"]]
+        with mock.patch.object(sim, "render"), mock.patch("pygame.time.Clock"):
+            sim.play_keyframe_animation_script(pygame.Surface((800, 800)), np.array([400., 400., -100.]), 1,
+                                               orientation_keyframes, center_keyframes,
+                                               self.vertices - self.center, faces, 30, 5, playback_timer)
+        timer.end_frame()
+
+        self.assertIsNot(timer, playback_timer)
+        self.assertEqual(timer.frames, 1)
+        self.assertEqual(playback_timer.frames, 5)
+        self.assertEqual(timer._times[0, timer._indices["control"]], control)
+
+
+class Float32Settings(unittest.TestCase):
+    def test_settings_and_scripts(self) -> None:
+        config.set_dtype(np.float32)
+        try:
+            settings = sim.load_settings()
+        finally:
+            config.set_dtype(np.float64)
+
+        sim.rotation_script(0.1, settings["orientation"], 1, settings["drift_monitor"])
+        sim.translation_script(settings["center"], 5., 0)
+
+        self.assertEqual(settings["orientation"].dtype, np.float32)
+        self.assertEqual(settings["object"].world_vertices().dtype, np.float32)
+        self.assertEqual(settings["camera"].project(settings["object"].world_vertices()).dtype, np.float32)
+        self.assertEqual(settings["scene"].project(settings["camera"]).dtype, np.float32)
+
+
+class Satellite(unittest.TestCase):
+    def test_satellite_follows_object(self) -> None:
+        settings = sim.load_settings()
+        scene = settings["scene"]
+        # A smaller cuboid attached to the side of the object.
+        satellite_vertices, satellite_faces = sim.init_cuboid(np.zeros(3), 15, 15, 15)
+        satellite = scene.add(SceneObject(satellite_vertices, np.array([1., 0., 0., 0.]), np.array([100., 0., 0.])),
+                              satellite_faces,
+                              0)
+        before = scene.world_vertices()[scene.offsets[satellite]:].copy()
+
+        sim.rotation_script(np.pi / 2, settings["orientation"], 1)
+        sim.translation_script(settings["center"], 5., 0)
+        vertices = scene.world_vertices()[scene.offsets[satellite]:]
+
+        # A quarter turn about the y-axis takes the satellite from the object's side to its front or back.
+        self.assertTrue(np.allclose(np.abs(vertices.mean(axis=0) - settings["center"]), [0., 0., 100.]))
+        self.assertTrue(np.allclose(np.ptp(vertices, axis=0), np.ptp(before, axis=0)))
+
+
 if __name__ == '__main__':
     unittest.main()
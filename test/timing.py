@@ -0,0 +1,71 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+import pygame
+from src.timing import FrameTimer
+
+
+class FrameTimerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.clock = [0.]
+        patcher = mock.patch("time.perf_counter", side_effect=lambda: self.clock[0])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def frame(self, timer: FrameTimer, control: float, draw: float) -> None:
+        timer.start_frame()
+        self.clock[0] += control
+        timer.mark("control")
+        self.clock[0] += draw
+        timer.mark("draw")
+        timer.end_frame()
+
+    def test_percentiles(self) -> None:
+        timer = FrameTimer(stages=("control", "draw"), window=100)
+        for i in range(150):
+            self.frame(timer, 0.001, 0.002 if i < 50 else 0.004)
+
+        percentiles = timer.percentiles()
+
+        self.assertEqual(timer.frames, 150)
+        self.assertAlmostEqual(percentiles["control"][50], 1.)
+        self.assertAlmostEqual(percentiles["draw"][99], 4.)
+        self.assertAlmostEqual(percentiles["frame"][95], 5.)
+
+    def test_disabled(self) -> None:
+        timer = FrameTimer(enabled=False)
+        self.frame(timer, 0.001, 0.002)
+
+        self.assertEqual(timer.frames, 0)
+        self.assertEqual(timer.percentiles(), {})
+
+    def test_logs(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            for name in ("timing.csv", "timing.json"):
+                path = os.path.join(directory, name)
+                timer = FrameTimer(stages=("control", "draw"), log_path=path, log_interval=1.)
+                for _ in range(30):
+                    self.frame(timer, 0.05, 0.05)
+
+                with open(path) as file:
+                    lines = file.read().splitlines()
+
+                if name.endswith(".csv"):
+                    self.assertEqual(lines[0], "time,frames,stage,p50,p95,p99")
+                    self.assertEqual(len(lines), 1 + 2 * 3)
+                else:
+                    self.assertEqual(len(lines), 2)
+                    self.assertAlmostEqual(json.loads(lines[-1])["milliseconds"]["frame"]["50"], 100.)
+
+    def test_overlay(self) -> None:
+        timer = FrameTimer(stages=("control", "draw"))
+        self.frame(timer, 0.001, 0.002)
+        surface = pygame.Surface((300, 200))
+
+        self.assertGreater(timer.draw_overlay(surface).height, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+import numpy as np
+import src.interpolation as i
+import src.quaternion as q
+from src.track import AnimationTrack
+
+
+class AnimationTrackTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.times = np.array([0., 1., 3., 4.])
+        self.orientations = q.rotation_quaternion(np.array([0., 0.5, 1.5, 1.]),
+                                                  np.array([[0., 0., 1.],
+                                                            [1., 0., 0.],
+                                                            [0., 1., 1.],
+                                                            [1., 1., 0.]]))
+        self.centers = np.array([[0., 0., 0.],
+                                 [10., 0., 0.],
+                                 [10., 20., 0.],
+                                 [0., 20., 5.]])
+        self.track = AnimationTrack(self.times, self.orientations, self.centers)
+
+    def test_passes_through_keyframes(self) -> None:
+        orientations, centers = self.track.evaluate(self.times)
+
+        self.assertTrue(np.allclose(orientations, self.orientations))
+        self.assertTrue(np.allclose(centers, self.centers))
+
+    def test_unit_orientations(self) -> None:
+        orientations, _ = self.track.evaluate(np.linspace(0., 4., 101))
+        self.assertTrue(np.allclose(np.linalg.norm(orientations, axis=-1), 1.))
+
+    def test_clamped_to_ends(self) -> None:
+        orientations, centers = self.track.evaluate(np.array([-1., 5.]))
+
+        self.assertTrue(np.allclose(orientations, self.orientations[[0, -1]]))
+        self.assertTrue(np.allclose(centers, self.centers[[0, -1]]))
+
+    def test_segments(self) -> None:
+        indices, t = self.track.segments(np.array([0., 0.5, 1., 2., 4.]))
+
+        self.assertTrue(np.array_equal(indices, np.array([0, 0, 1, 1, 2])))
+        self.assertTrue(np.allclose(t, np.array([0., 0.5, 0., 0.5, 1.])))
+
+    def test_two_keyframes_match_slerp_and_lerp(self) -> None:
+        track = AnimationTrack(np.array([0., 2.]), self.orientations[1:3], self.centers[1:3])
+        orientations, centers = track.evaluate(np.linspace(0., 2., 9))
+
+        self.assertTrue(np.allclose(orientations, i.slerp(self.orientations[1], self.orientations[2],
+                                                          np.linspace(0., 1., 9))))
+        self.assertTrue(np.allclose(centers, i.linear_interpolation(self.centers[1:3], 9)))
+
+    def test_shortest_path(self) -> None:
+        orientations = self.orientations.copy()
+        orientations[2] *= -1
+        flipped, _ = AnimationTrack(self.times, orientations, self.centers).evaluate(np.linspace(0., 4., 17))
+        expected, _ = self.track.evaluate(np.linspace(0., 4., 17))
+
+        self.assertTrue(np.allclose(np.abs(np.sum(flipped * expected, axis=-1)), 1.))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+import numpy as np
+import src.transformations as t
+import src.quaternion as q
+from src.cache import RotationMatrixCache
+
+
+class QuaternionRotation(unittest.TestCase):
+    def setUp(self) -> None:
+        self.quaternions = q.rotation_quaternion(np.array([np.pi / 2, np.pi, 0.3]),
+                                                 np.array([[0., 0., 1.],
+                                                           [1., 0., 0.],
+                                                           [1., 1., 1.]]))
+        self.vertices = np.array([[1., 0., 0.],
+                                  [0., 1., 0.],
+                                  [1., 2., 3.]])
+
+    def test_one_rotation(self) -> None:
+        expected = np.array([[0., -1., 0.],
+                             [1., 0., 0.],
+                             [2., -1., 3.]])
+        self.assertTrue(np.allclose(t.quaternion_rotation(self.quaternions[0], self.vertices), expected))
+
+    def test_multiple_rotations_shared_vertices(self) -> None:
+        expected = np.stack([t.quaternion_rotation(quaternion, self.vertices) for quaternion in self.quaternions])
+        actual = t.quaternion_rotation(self.quaternions, self.vertices)
+
+        self.assertEqual(actual.shape, (3, 3, 3))
+        self.assertTrue(np.allclose(actual, expected))
+
+    def test_multiple_rotations_multiple_vertex_sets(self) -> None:
+        vertex_sets = np.stack((self.vertices, 2 * self.vertices, self.vertices[::-1]))
+        expected = np.stack([t.quaternion_rotation(quaternion, vertices)
+                             for quaternion, vertices in zip(self.quaternions, vertex_sets)])
+        self.assertTrue(np.allclose(t.quaternion_rotation(self.quaternions, vertex_sets), expected))
+
+    def test_mismatched_number_of_vertex_sets(self) -> None:
+        with self.assertRaises(AssertionError):
+            t.quaternion_rotation(self.quaternions[0], np.stack((self.vertices, self.vertices)))
+
+    def test_cached_rotation(self) -> None:
+        cache = RotationMatrixCache()
+        expected = t.quaternion_rotation(self.quaternions[2], self.vertices)
+
+        self.assertTrue(np.allclose(t.quaternion_rotation(self.quaternions[2], self.vertices, cache), expected))
+        self.assertTrue(np.allclose(t.quaternion_rotation(self.quaternions[2], self.vertices, cache), expected))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_assume_unit(self) -> None:
+        self.assertTrue(np.allclose(t.quaternion_rotation(self.quaternions, self.vertices, assume_unit=True),
+                                    t.quaternion_rotation(self.quaternions, self.vertices)))
+
+    def test_matches_chained_multiplication(self) -> None:
+        expected = q.quaternion_to_vector(q.qvq_inverse(self.quaternions[2], q.vector_to_quaternion(self.vertices)))
+        self.assertTrue(np.allclose(t.quaternion_rotation(self.quaternions[2], self.vertices), expected))
+
+    def test_out(self) -> None:
+        out = np.full((3, 3, 3), np.nan)
+        expected = t.quaternion_rotation(self.quaternions, self.vertices)
+
+        self.assertIs(t.quaternion_rotation(self.quaternions, self.vertices, out=out), out)
+        self.assertTrue(np.allclose(out, expected))
+
+    def test_in_place(self) -> None:
+        vertices = np.random.default_rng(0).normal(size=(t.IN_PLACE_BLOCK_SIZE * 2 + 5, 3))
+        expected = t.quaternion_rotation(self.quaternions[2], vertices)
+
+        self.assertIs(t.quaternion_rotation(self.quaternions[2], vertices, out=vertices), vertices)
+        self.assertTrue(np.allclose(vertices, expected))
+
+    def test_in_place_multiple_vertex_sets(self) -> None:
+        vertex_sets = np.stack((self.vertices, 2 * self.vertices, self.vertices[::-1]))
+        expected = t.quaternion_rotation(self.quaternions, vertex_sets)
+        t.quaternion_rotation(self.quaternions, vertex_sets, out=vertex_sets)
+
+        self.assertTrue(np.allclose(vertex_sets, expected))
+
+    def test_out_of_wrong_shape(self) -> None:
+        with self.assertRaises(AssertionError):
+            t.quaternion_rotation(self.quaternions, self.vertices, out=np.empty((3, 3)))
+
+
+class Float32QuaternionRotation(unittest.TestCase):
+    def test_dtype_preserved(self) -> None:
+        quaternions = q.rotation_quaternion(np.array([0.4, -1.2]), np.array([[1., 2., 3.],
+                                                                             [0., 0., 1.]]))
+        vertices = np.random.default_rng(1).normal(size=(10, 3))
+        expected = t.quaternion_rotation(quaternions, vertices)
+        actual = t.quaternion_rotation(quaternions.astype(np.float32), vertices.astype(np.float32), assume_unit=True)
+
+        self.assertEqual(actual.dtype, np.float32)
+        self.assertTrue(np.allclose(actual, expected, atol=1e-5))
+
+
+if __name__ == '__main__':
+    unittest.main()
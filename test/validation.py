@@ -0,0 +1,62 @@
+import os
+import subprocess
+import sys
+import unittest
+
+import numpy as np
+
+import src.config as config
+import src.quaternion as q
+from src.validation import validated
+
+
+def _check_positive(x: float) -> None:
+    assert 0 < x
+
+
+class Validated(unittest.TestCase):
+    def tearDown(self) -> None:
+        config.set_validation(True)
+
+    def test_checks_arguments(self) -> None:
+        square = validated(_check_positive)(lambda x: x * x)
+
+        self.assertEqual(4, square(2))
+        with self.assertRaises(AssertionError):
+            square(-2)
+
+    def test_skips_checks_when_turned_off(self) -> None:
+        square = validated(_check_positive)(lambda x: x * x)
+        config.set_validation(False)
+
+        self.assertEqual(4, square(-2))
+
+    def test_returns_function_unwrapped_when_off(self) -> None:
+        def square(x: float) -> float:
+            return x * x
+
+        config.set_validation(False)
+
+        self.assertIs(square, validated(_check_positive)(square))
+
+    def test_hot_functions_check_arguments(self) -> None:
+        with self.assertRaises(AssertionError):
+            q.quaternion_multiplication(np.zeros(3), np.zeros(4))
+        with self.assertRaises(AssertionError):
+            q.quaternion_to_vector(np.ones(4))
+
+    def test_checks_are_off_by_default(self) -> None:
+        code = ("import numpy as np, src.quaternion as q;"
+                "assert not hasattr(q.quaternion_multiplication, 'unchecked');"
+                "q.quaternion_to_vector(np.ones(4))")
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        environment = {name: value for name, value in os.environ.items() if name != "QUATERNION_VALIDATE"}
+        environment["PYTHONPATH"] = os.pathsep.join([root] + [path for path in [os.environ.get("PYTHONPATH")] if path])
+
+        result = subprocess.run([sys.executable, "-c", code], cwd=root, env=environment, capture_output=True)
+
+        self.assertEqual(0, result.returncode, result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()